@@ -1,15 +1,45 @@
 """API endpoints for the voice bot."""
 
+import asyncio
+import base64
+import json
+import time
 import uuid
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Response
-from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    UploadFile,
+    File,
+    Form,
+    Header,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import PlainTextResponse, StreamingResponse
 import io
 
-from app.api.schemas import ChatRequest, ChatResponse, AudioResponse, ErrorResponse
+from app.api.schemas import (
+    ChatRequest,
+    ChatResponse,
+    AudioResponse,
+    ErrorResponse,
+    BatchChatRequest,
+    BatchChatResponse,
+    BatchChatResult,
+)
 from app.services.chat_service import ChatService
 from app.services.voice_service import VoiceService
 from app.core.config import settings
+from app.core.executor import ExecutorSaturated
+from app.core.metrics import REGISTRY, CallbackMetric
+from app.core.tracing import SLOW_TRACES, record_stage
+from app.core.stt import get_stt_backend
+from app.core.tts import get_tts_backend
+from app.core.vad import VoiceActivityDetector
+from app.core.voice import AUDIO_FORMATS, negotiate_audio_format, pcm_to_wav
 
 # Creating the API router
 router = APIRouter()
@@ -19,6 +49,189 @@ chat_service = ChatService()
 voice_service = VoiceService()
 
 
+def _register_metrics() -> None:
+    """Expose the services' own counters as metrics, read at scrape time."""
+
+    def cache_counts(field: str):
+        tts = voice_service.tts_cache.stats()
+        return [
+            (["response"], chat_service.response_cache.stats()[field]),
+            (["tts_memory"], tts["memory"][field]),
+            (["tts_disk"], tts["disk"][field]),
+        ]
+
+    def executor_value(field: str):
+        return lambda: [([], voice_service.executor.stats()[field])]
+
+    for metric in (
+        CallbackMetric(
+            "voicebot_cache_hits_total",
+            "Cache lookups that found an entry",
+            "counter",
+            lambda: cache_counts("hits"),
+            ["cache"],
+        ),
+        CallbackMetric(
+            "voicebot_cache_misses_total",
+            "Cache lookups that found no entry",
+            "counter",
+            lambda: cache_counts("misses"),
+            ["cache"],
+        ),
+        CallbackMetric(
+            "voicebot_coalesced_requests_total",
+            "First turns that joined an identical provider call in flight",
+            "counter",
+            lambda: [([], chat_service.in_flight.coalesced)],
+        ),
+        CallbackMetric(
+            "voicebot_conversations",
+            "Conversations held in memory",
+            "gauge",
+            lambda: [([], chat_service.conversations.stats()["conversations"])],
+        ),
+        CallbackMetric(
+            "voicebot_conversation_bytes",
+            "Approximate size of the conversations held in memory",
+            "gauge",
+            lambda: [([], chat_service.conversations.stats()["bytes"])],
+        ),
+        CallbackMetric(
+            "voicebot_voice_executor_queue_depth",
+            "Voice jobs waiting for a worker",
+            "gauge",
+            executor_value("queue_depth"),
+        ),
+        CallbackMetric(
+            "voicebot_voice_executor_running",
+            "Voice jobs running on a worker",
+            "gauge",
+            executor_value("running"),
+        ),
+        CallbackMetric(
+            "voicebot_voice_executor_rejected_total",
+            "Voice jobs rejected because the pool was full",
+            "counter",
+            executor_value("rejected"),
+        ),
+        CallbackMetric(
+            "voicebot_provider_circuit_open",
+            "Whether a provider's circuit breaker is open (1) or not (0)",
+            "gauge",
+            lambda: [
+                ([name], float(breaker.state == breaker.OPEN))
+                for name, breaker in chat_service.breakers.items()
+            ],
+            ["provider"],
+        ),
+    ):
+        REGISTRY.register(metric)
+
+
+_register_metrics()
+
+
+def _sse_event(data: dict, event: Optional[str] = None) -> str:
+    """
+    Format a Server-Sent Event.
+
+    Args:
+        data (dict): The JSON payload of the event
+        event (str, optional): The event name
+
+    Returns:
+        str: The encoded event
+    """
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def _stream_chat(deltas: AsyncIterator[str], conversation_id: str) -> StreamingResponse:
+    """
+    Wrap a stream of response deltas in a Server-Sent Events response.
+
+    Args:
+        deltas (AsyncIterator[str]): The response text deltas
+        conversation_id (str): The conversation ID
+
+    Returns:
+        StreamingResponse: The event stream
+    """
+
+    async def events():
+        parts = []
+        async for delta in deltas:
+            parts.append(delta)
+            yield _sse_event({"delta": delta})
+
+        # Sending the full response once the provider is done
+        yield _sse_event(
+            {"response": "".join(parts), "conversation_id": conversation_id},
+            event="done",
+        )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Conversation-ID": conversation_id},
+    )
+
+
+def _stream_voice(
+    segments, conversation_id: str, media_type: str = "audio/wav"
+) -> StreamingResponse:
+    """
+    Wrap a stream of synthesized sentences in a chunked NDJSON response.
+
+    Args:
+        segments (AsyncIterator[Tuple[str, bytes]]): Sentences and their audio
+        conversation_id (str): The conversation ID
+        media_type (str): The content type of the audio segments
+
+    Returns:
+        StreamingResponse: One JSON line per audio segment, then a final summary line
+    """
+
+    async def lines():
+        sentences = []
+        try:
+            async for sentence, audio_data in segments:
+                started = time.perf_counter()
+                line = (
+                    json.dumps(
+                        {
+                            "index": len(sentences),
+                            "text": sentence,
+                            "media_type": media_type,
+                            "audio": base64.b64encode(audio_data).decode("ascii"),
+                        }
+                    )
+                    + "\n"
+                )
+                record_stage("encode", time.perf_counter() - started)
+                yield line
+                sentences.append(sentence)
+        except Exception as e:
+            # Headers are already sent, so report the failure in the stream
+            yield json.dumps({"error": str(e)}) + "\n"
+            return
+
+        # Sending the full response once every segment is out
+        yield json.dumps(
+            {
+                "done": True,
+                "response": " ".join(sentences),
+                "conversation_id": conversation_id,
+            }
+        ) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Conversation-ID": conversation_id, "Vary": "Accept"},
+    )
+
+
 @router.post(
     "/chat", response_model=ChatResponse, responses={400: {"model": ErrorResponse}}
 )
@@ -30,12 +243,19 @@ async def chat(request: ChatRequest):
         request (ChatRequest): The chat request containing the user's message
 
     Returns:
-        ChatResponse: The assistant's response
+        ChatResponse: The assistant's response, or an event stream if requested
     """
     try:
         # Generating conversation ID if not provided
         conversation_id = request.conversation_id or str(uuid.uuid4())
 
+        # Streaming the response if requested
+        if request.stream:
+            return _stream_chat(
+                chat_service.stream_response(request.message, conversation_id),
+                conversation_id,
+            )
+
         # Processing the request
         response_text = await chat_service.generate_response(
             request.message, conversation_id
@@ -48,22 +268,39 @@ async def chat(request: ChatRequest):
 
 
 @router.post(
-    "/voice", response_model=AudioResponse, responses={400: {"model": ErrorResponse}}
+    "/voice",
+    response_model=AudioResponse,
+    responses={400: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
 )
 async def voice(
-    audio: UploadFile = File(...), conversation_id: Optional[str] = Form(None)
+    audio: UploadFile = File(...),
+    conversation_id: Optional[str] = Form(None),
+    stream: bool = Form(False),
+    audio_format: Optional[str] = Form(None),
+    accept: Optional[str] = Header(None),
 ):
     """
     Process a voice request and return a voice response.
 
+    The reply is WAV unless the client asks for MP3 or Opus, with the
+    audio_format field or the Accept header. A format the TTS engine
+    produces itself is passed through without transcoding.
+
     Args:
         audio (UploadFile): The audio file containing the user's speech
         conversation_id (str, optional): The conversation ID for continuing conversations
+        stream (bool): Stream the reply sentence by sentence as NDJSON audio segments
+        audio_format (str, optional): The reply format, one of wav, mp3 or opus
+        accept (str, optional): The Accept header, used if no format is given
 
     Returns:
         StreamingResponse: The audio response as a streaming response
     """
     try:
+        # Choosing the reply format before doing any work
+        audio_format = negotiate_audio_format(accept, audio_format)
+        media_type = AUDIO_FORMATS[audio_format][0]
+
         # Reading the audio file
         audio_content = await audio.read()
 
@@ -73,25 +310,261 @@ async def voice(
         # Processing the audio to text
         text = await voice_service.speech_to_text(audio_content)
 
+        # Pipelining the response through TTS sentence by sentence if requested
+        if stream:
+            return _stream_voice(
+                voice_service.stream_text_to_speech(
+                    chat_service.stream_response(text, conversation_id),
+                    audio_format=audio_format,
+                ),
+                conversation_id,
+                media_type,
+            )
+
         # Generating a response
         response_text = await chat_service.generate_response(text, conversation_id)
 
         # Converting the response to speech
-        audio_response = await voice_service.text_to_speech(response_text)
+        audio_response = await voice_service.text_to_speech(
+            response_text, audio_format=audio_format
+        )
 
         # Returning the response
         return StreamingResponse(
             io.BytesIO(audio_response),
-            media_type="audio/wav",
+            media_type=media_type,
             headers={
                 "X-Conversation-ID": conversation_id,
                 "X-Response-Text": response_text,
+                "Vary": "Accept",
             },
         )
+    except ExecutorSaturated:
+        # Shedding load quickly instead of queueing behind a full pool
+        raise HTTPException(
+            status_code=503,
+            detail="Voice processing is at capacity, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.websocket("/voice/ws")
+async def voice_ws(websocket: WebSocket):
+    """
+    Hold a full-duplex voice conversation over a WebSocket.
+
+    The client opens the session with a JSON ``start`` message and streams
+    the user's speech as binary frames of 16-bit little-endian mono PCM.
+    Frames go through the voice activity detector as they arrive: a
+    ``partial`` transcript is pushed every VOICE_WS_PARTIAL_INTERVAL
+    seconds of speech, and an utterance ends after VAD_HANGOVER_MS of
+    silence, or when the client sends ``end``. For each utterance the server
+    sends the final ``transcript``, then each reply sentence as a JSON
+    ``sentence`` message followed by its audio in a binary frame, WAV
+    unless the start message names another ``audio_format``, and a
+    ``done`` message. The user may keep talking while a reply streams;
+    ``stop`` closes the socket once replies are finished.
+
+    Args:
+        websocket (WebSocket): The client connection
+    """
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    interval = settings.VOICE_WS_PARTIAL_INTERVAL
+
+    async def send_json(data: dict) -> None:
+        async with send_lock:
+            await websocket.send_json(data)
+
+    async def send_partial(audio_data: bytes) -> None:
+        try:
+            text = await voice_service.speech_to_text(audio_data)
+        except ExecutorSaturated:
+            # Skipping a partial rather than queueing behind a full pool
+            return
+        await send_json({"type": "partial", "text": text})
+
+    async def answer(speech: bytes, session: dict, previous) -> None:
+        # Answering utterances in the order they were spoken
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+
+        try:
+            text = await voice_service.speech_to_text(
+                pcm_to_wav(speech, session["sample_rate"])
+            )
+            await send_json({"type": "transcript", "text": text})
+
+            stream = (
+                chat_service.stream_response_groq
+                if session["provider"] == "groq"
+                else chat_service.stream_response
+            )
+            sentences = []
+            async for sentence, audio_data in voice_service.stream_text_to_speech(
+                stream(text, session["conversation_id"]),
+                audio_format=session["audio_format"],
+            ):
+                # Keeping each sentence next to its audio frame
+                async with send_lock:
+                    await websocket.send_json(
+                        {
+                            "type": "sentence",
+                            "index": len(sentences),
+                            "text": sentence,
+                            "media_type": AUDIO_FORMATS[session["audio_format"]][0],
+                        }
+                    )
+                    await websocket.send_bytes(audio_data)
+                sentences.append(sentence)
+
+            await send_json(
+                {
+                    "type": "done",
+                    "response": " ".join(sentences),
+                    "conversation_id": session["conversation_id"],
+                }
+            )
+        except ExecutorSaturated:
+            await send_json(
+                {
+                    "type": "error",
+                    "detail": "Voice processing is at capacity, please retry shortly",
+                }
+            )
+        except Exception as e:
+            await send_json({"type": "error", "detail": str(e)})
+
+    session = None
+    detector = None
+    next_partial = interval
+    partial = None
+    reply = None
+    heard = False
+
+    def reply_to(speech: bytes) -> None:
+        nonlocal next_partial, partial, reply, heard
+        heard = True
+        if partial is not None:
+            partial.cancel()
+            partial = None
+        next_partial = interval
+        reply = asyncio.ensure_future(answer(speech, session, reply))
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            # Endpointing speech frames as they arrive
+            if message.get("bytes") is not None:
+                if detector is None:
+                    await send_json(
+                        {"type": "error", "detail": "Send a start message first"}
+                    )
+                    continue
+                for speech in detector.feed(message["bytes"]):
+                    reply_to(speech)
+                if (
+                    interval > 0
+                    and detector.duration >= next_partial
+                    and (partial is None or partial.done())
+                ):
+                    next_partial = detector.duration + interval
+                    partial = asyncio.ensure_future(
+                        send_partial(
+                            pcm_to_wav(detector.speech(), detector.sample_rate)
+                        )
+                    )
+                continue
+
+            try:
+                data = json.loads(message.get("text") or "")
+            except ValueError:
+                data = None
+            kind = data.get("type") if isinstance(data, dict) else None
+
+            if kind == "start":
+                encoding = data.get("encoding", "pcm_s16le")
+                if encoding != "pcm_s16le":
+                    await send_json(
+                        {
+                            "type": "error",
+                            "detail": f"Unsupported encoding {encoding!r}, "
+                            "send pcm_s16le",
+                        }
+                    )
+                    continue
+                try:
+                    sample_rate = int(
+                        data.get("sample_rate", settings.VOICE_WS_SAMPLE_RATE)
+                    )
+                except (TypeError, ValueError):
+                    sample_rate = 0
+                if sample_rate <= 0:
+                    await send_json(
+                        {
+                            "type": "error",
+                            "detail": "sample_rate must be a positive integer",
+                        }
+                    )
+                    continue
+                try:
+                    audio_format = negotiate_audio_format(
+                        requested=data.get("audio_format")
+                    )
+                except ValueError as e:
+                    await send_json({"type": "error", "detail": str(e)})
+                    continue
+                session = {
+                    "sample_rate": sample_rate,
+                    "conversation_id": data.get("conversation_id")
+                    or (session or {}).get("conversation_id")
+                    or str(uuid.uuid4()),
+                    "provider": data.get("provider", "openai"),
+                    "audio_format": audio_format,
+                }
+                detector = VoiceActivityDetector(
+                    session["sample_rate"], max_seconds=settings.VOICE_WS_MAX_SECONDS
+                )
+                next_partial = interval
+                await send_json(
+                    {"type": "ready", "conversation_id": session["conversation_id"]}
+                )
+            elif kind == "end":
+                if detector is None:
+                    await send_json(
+                        {"type": "error", "detail": "Send a start message first"}
+                    )
+                    continue
+
+                # Ending the utterance without waiting out the hangover
+                speech = detector.flush()
+                if speech:
+                    reply_to(speech)
+                elif not heard:
+                    await send_json(
+                        {"type": "error", "detail": "No speech was detected"}
+                    )
+                heard = False
+            elif kind == "stop":
+                if reply is not None:
+                    await reply
+                await websocket.close()
+                break
+            else:
+                await send_json({"type": "error", "detail": "Unknown message"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in (partial, reply):
+            if task is not None:
+                task.cancel()
+
+
 @router.post(
     "/chat-groq", response_model=ChatResponse, responses={400: {"model": ErrorResponse}}
 )
@@ -103,12 +576,19 @@ async def chat_groq(request: ChatRequest):
         request (ChatRequest): The chat request containing the user's message
 
     Returns:
-        ChatResponse: The assistant's response
+        ChatResponse: The assistant's response, or an event stream if requested
     """
     try:
         # Generating conversation ID if not provided
         conversation_id = request.conversation_id or str(uuid.uuid4())
 
+        # Streaming the response if requested
+        if request.stream:
+            return _stream_chat(
+                chat_service.stream_response_groq(request.message, conversation_id),
+                conversation_id,
+            )
+
         # Processing the request with Groq
         response_text = await chat_service.generate_response_groq(
             request.message, conversation_id
@@ -120,6 +600,145 @@ async def chat_groq(request: ChatRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post(
+    "/chat/batch",
+    response_model=BatchChatResponse,
+    responses={400: {"model": ErrorResponse}},
+)
+async def chat_batch(request: BatchChatRequest):
+    """
+    Answer a batch of text messages concurrently.
+
+    Messages are processed with bounded concurrency and results come back
+    in request order. Messages sharing a conversation ID are answered one
+    after another, in order.
+
+    Args:
+        request (BatchChatRequest): The messages and processing options
+
+    Returns:
+        BatchChatResponse: One result or error per message
+    """
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can hold at most {settings.BATCH_MAX_ITEMS} messages",
+        )
+
+    # Groq conversations are stored under their own keys, as in /chat/groq
+    key_prefix = "groq_" if request.provider == "groq" else ""
+    semaphore = asyncio.Semaphore(
+        min(
+            request.concurrency or settings.BATCH_CONCURRENCY,
+            settings.BATCH_CONCURRENCY,
+        )
+    )
+    conversation_locks = {}
+
+    async def answer(index, item):
+        conversation_id = item.conversation_id or str(uuid.uuid4())
+        lock = conversation_locks.setdefault(conversation_id, asyncio.Lock())
+        try:
+            # Taking the conversation lock first keeps turns in request order
+            async with lock, semaphore:
+                # Generating without the apology fallback so failures are reported
+                response_text = await chat_service._generate(
+                    request.provider, key_prefix + conversation_id, item.message
+                )
+            return BatchChatResult(
+                index=index, conversation_id=conversation_id, response=response_text
+            )
+        except Exception as e:
+            return BatchChatResult(
+                index=index, conversation_id=conversation_id, error=str(e)
+            )
+
+    results = await asyncio.gather(
+        *[answer(index, item) for index, item in enumerate(request.items)]
+    )
+    return BatchChatResponse(results=results)
+
+
+@router.get("/stats")
+async def stats():
+    """
+    Live size and eviction stats of the in-memory stores and the voice pool.
+
+    Returns:
+        dict: Conversation store, cache, coalescing, routing, voice executor
+            and speech engine counters
+    """
+    return {
+        "conversations": chat_service.conversations.stats(),
+        "response_cache": chat_service.response_cache.stats(),
+        "coalescing": chat_service.in_flight.stats(),
+        "routing": {
+            name: router.stats() for name, router in chat_service.routers.items()
+        },
+        "tts_cache": voice_service.tts_cache.stats(),
+        "voice_executor": voice_service.executor.stats(),
+        "stt": get_stt_backend().stats(),
+        "tts": get_tts_backend().stats(),
+    }
+
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Metrics in Prometheus text format.
+
+    Returns:
+        PlainTextResponse: Stage latency histograms, in-flight gauges, queue
+            depth, store size and cache counters
+    """
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get("/debug/traces")
+async def debug_traces(limit: int = 20, trace_id: Optional[str] = None):
+    """
+    Stage breakdowns of the most recent slow requests.
+
+    Args:
+        limit (int): Maximum number of traces to return
+        trace_id (str, optional): Only return the trace with this ID
+
+    Returns:
+        dict: The slow-request threshold and the traces, newest first
+    """
+    if not settings.DEBUG:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {
+        "threshold_ms": SLOW_TRACES.threshold * 1000,
+        "traces": SLOW_TRACES.list(limit=limit, trace_id=trace_id),
+    }
+
+
+@router.get("/providers")
+async def providers():
+    """
+    Circuit breaker state of each LLM provider, showing why traffic shifted.
+
+    Returns:
+        dict: Breaker state, EWMA latency and error rate per provider, and
+            how often each route failed over
+    """
+    return {
+        "providers": {
+            name: {
+                "model": chat_service.providers[name].model,
+                **breaker.stats(),
+            }
+            for name, breaker in chat_service.breakers.items()
+        },
+        "failovers": {
+            name: router.failovers for name, router in chat_service.routers.items()
+        },
+    }
+
+
 @router.get("/health")
 async def health_check():
     """
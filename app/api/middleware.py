@@ -0,0 +1,94 @@
+"""ASGI middleware for the API."""
+
+import time
+
+from app.core.metrics import REQUEST_SECONDS, REQUESTS_IN_FLIGHT
+from app.core.tracing import SLOW_TRACES, start_trace
+
+# Paths whose request time is measured, kept fixed to bound label cardinality
+MEASURED_PATHS = ("/api/chat", "/api/chat-groq", "/api/voice", "/api/chat/batch")
+
+# Paths whose responses carry a Server-Timing stage breakdown
+TRACED_PATHS = ("/api/chat", "/api/chat-groq", "/api/voice")
+
+
+class MetricsMiddleware:
+    """Records in-flight requests and total request time, streamed bodies included."""
+
+    def __init__(self, app):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The ASGI application to wrap
+        """
+        self.app = app
+
+        # Binding the per-path metrics once, off the hot path
+        self.metrics = {
+            path: (REQUEST_SECONDS.labels(path), REQUESTS_IN_FLIGHT.labels(path))
+            for path in MEASURED_PATHS
+        }
+
+    async def __call__(self, scope, receive, send):
+        """Serve a request, timing it if its path is measured."""
+        metrics = self.metrics.get(scope["path"]) if scope["type"] == "http" else None
+        if metrics is None:
+            await self.app(scope, receive, send)
+            return
+
+        duration, in_flight = metrics
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            in_flight.dec()
+            duration.observe(time.perf_counter() - started)
+
+
+class TracingMiddleware:
+    """
+    Times the stages of a request and reports them in a Server-Timing header.
+
+    The trace ID comes from the X-Trace-ID request header, or is generated,
+    and is echoed back. The header holds the stages finished before the
+    response started; streamed responses are fully timed in the slow trace
+    buffer once they finish.
+    """
+
+    def __init__(self, app):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The ASGI application to wrap
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        """Serve a request, tracing it if its path is traced."""
+        if scope["type"] != "http" or scope["path"] not in TRACED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-trace-id":
+                trace_id = value.decode("latin-1")
+                break
+        trace = start_trace(scope["path"], trace_id)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode()))
+                headers.append((b"x-trace-id", trace.trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            trace.finish()
+            SLOW_TRACES.add(trace)
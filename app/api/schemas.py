@@ -1,6 +1,6 @@
 """Pydantic models for API requests and responses."""
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from pydantic import BaseModel, Field
 
 
@@ -20,6 +20,10 @@ class ChatRequest(BaseModel):
     conversation_id: Optional[str] = Field(
         None, description="Optional conversation ID for continuing conversations"
     )
+    stream: bool = Field(
+        False,
+        description="Stream the response as Server-Sent Events instead of a single JSON body",
+    )
 
 
 class ChatResponse(BaseModel):
@@ -29,6 +33,46 @@ class ChatResponse(BaseModel):
     conversation_id: str = Field(..., description="Conversation ID for future messages")
 
 
+class BatchChatItem(BaseModel):
+    """A single message in a batch chat request."""
+
+    message: str = Field(..., description="The user's message")
+    conversation_id: Optional[str] = Field(
+        None, description="Optional conversation ID for continuing conversations"
+    )
+
+
+class BatchChatRequest(BaseModel):
+    """Batch chat request model for sending many messages in one call."""
+
+    items: List[BatchChatItem] = Field(
+        ..., min_length=1, description="The messages to answer"
+    )
+    provider: Literal["openai", "groq"] = Field(
+        "openai", description="The provider to answer with"
+    )
+    concurrency: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Optional limit on messages processed at once, capped by the server",
+    )
+
+
+class BatchChatResult(BaseModel):
+    """The outcome of a single message in a batch."""
+
+    index: int = Field(..., description="Position of the message in the request")
+    conversation_id: str = Field(..., description="Conversation ID for future messages")
+    response: Optional[str] = Field(None, description="The assistant's response")
+    error: Optional[str] = Field(None, description="Error message if the item failed")
+
+
+class BatchChatResponse(BaseModel):
+    """Batch chat response model, with results in request order."""
+
+    results: List[BatchChatResult] = Field(..., description="One result per message")
+
+
 class AudioRequest(BaseModel):
     """Request model containing audio data."""
 
@@ -0,0 +1,278 @@
+"""In-memory caches for the voice bot."""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries also expire after a fixed time.
+
+    Reads refresh an entry's recency but not its expiry. A cache with a
+    maximum size of 0 stores nothing.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize (int): Maximum number of entries
+            ttl (float, optional): Seconds an entry stays valid, or None to never expire
+            clock (Callable[[], float]): Monotonic clock used for expiry
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        """Return the number of entries, including any not yet purged as expired."""
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Look up an entry, counting the hit or miss.
+
+        Args:
+            key (Hashable): The cache key
+            default (Any): Value returned on a miss
+
+        Returns:
+            Any: The cached value, or default
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at is None or expires_at > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+            # Dropping the expired entry
+            del self._entries[key]
+            self.expirations += 1
+
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store an entry, evicting the least recently used ones if the cache is full.
+
+        Args:
+            key (Hashable): The cache key
+            value (Any): The value to cache
+        """
+        if self.maxsize <= 0:
+            return
+
+        expires_at = None if self.ttl is None else self.clock() + self.ttl
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry, keeping the counters."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, int]: Size, bounds, hits, misses, evictions and expirations
+        """
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class AudioCache:
+    """
+    Content-addressed cache for synthesized audio.
+
+    Entries live in an in-memory LRU tier and, when a directory is given, in
+    an on-disk tier capped at a total byte size. Disk entries survive
+    restarts and the least recently used ones are deleted once the cap is
+    exceeded. The cache is safe to use from executor threads.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        directory: Optional[str] = None,
+        max_bytes: int = 0,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize (int): Maximum number of entries kept in memory
+            directory (str, optional): Directory for the on-disk tier, or None to disable it
+            max_bytes (int): Maximum total size of the on-disk tier in bytes
+        """
+        self.memory = TTLCache(maxsize=maxsize)
+        self.directory = directory or None
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        # Disk counters
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.disk_evictions = 0
+
+        # Indexing the existing disk entries, least recently used first
+        self._disk_entries: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+            for _, name, size in sorted(entries):
+                self._disk_entries[name] = size
+                self._disk_bytes += size
+            self._evict_disk()
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """
+        Build a content address from everything that determines the audio.
+
+        Args:
+            *parts (Any): Text, voice and format parameters
+
+        Returns:
+            str: Hex digest identifying the audio
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(repr(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up audio in the memory tier. Never blocks on I/O.
+
+        Args:
+            key (str): The content address
+
+        Returns:
+            Optional[bytes]: The cached audio, or None on a miss
+        """
+        with self._lock:
+            return self.memory.get(key)
+
+    def load(self, key: str) -> Optional[bytes]:
+        """
+        Look up audio in the disk tier, promoting hits into memory.
+
+        Args:
+            key (str): The content address
+
+        Returns:
+            Optional[bytes]: The cached audio, or None on a miss or if the tier is disabled
+        """
+        if not self.directory:
+            return None
+
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.disk_misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            if key in self._disk_entries:
+                self._disk_entries.move_to_end(key)
+            self.memory.set(key, data)
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        """
+        Store audio in memory and, if enabled, on disk.
+
+        Args:
+            key (str): The content address
+            data (bytes): The audio data
+        """
+        with self._lock:
+            self.memory.set(key, data)
+        if not self.directory or len(data) > self.max_bytes:
+            return
+
+        # Writing atomically so readers never see a partial file
+        path = os.path.join(self.directory, key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._disk_bytes += len(data) - self._disk_entries.pop(key, 0)
+            self._disk_entries[key] = len(data)
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Delete the least recently used disk entries until the tier fits its cap."""
+        while self._disk_bytes > self.max_bytes and self._disk_entries:
+            name, size = self._disk_entries.popitem(last=False)
+            self._disk_bytes -= size
+            self.disk_evictions += 1
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the counters of both tiers.
+
+        Returns:
+            Dict[str, Any]: Memory tier stats and disk tier size and counters
+        """
+        with self._lock:
+            return {
+                "memory": self.memory.stats(),
+                "disk": {
+                    "enabled": bool(self.directory),
+                    "entries": len(self._disk_entries),
+                    "bytes": self._disk_bytes,
+                    "max_bytes": self.max_bytes,
+                    "hits": self.disk_hits,
+                    "misses": self.disk_misses,
+                    "evictions": self.disk_evictions,
+                },
+            }
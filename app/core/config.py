@@ -1,4 +1,6 @@
+import json
 import os
+from typing import Dict
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -27,19 +29,121 @@ class Settings(BaseSettings):
     # OpenAI settings
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")
 
     # Groq settings
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     GROQ_MODEL: str = os.getenv("GROQ_MODEL", "llama3-70b-8192")
+    GROQ_BASE_URL: str = os.getenv("GROQ_BASE_URL", "")
+
+    # Provider HTTP settings: pooled keep-alive connections, opened at startup
+    # (HTTP/2 also needs the h2 package)
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE: int = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "120"))
+    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "30"))
+    HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP2: bool = os.getenv("HTTP2", "True") == "True"
+    HTTP_WARM_UP: bool = os.getenv("HTTP_WARM_UP", "True") == "True"
+    HTTP_WARM_CONNECTIONS: int = int(os.getenv("HTTP_WARM_CONNECTIONS", "2"))
 
     # Model Settings
     CURRENT_MODEL: str = OPENAI_MODEL
 
+    # History token budgets on top of the system prompt, with per-model overrides
+    # as a JSON object
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "128"))
+    PROMPT_TOKEN_BUDGETS: Dict[str, int] = json.loads(
+        os.getenv("PROMPT_TOKEN_BUDGETS", "{}")
+    )
+
+    # Batch chat settings
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "16"))
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+
+    # Conversation store settings
+    CONVERSATION_MAX_COUNT: int = int(os.getenv("CONVERSATION_MAX_COUNT", "10000"))
+    CONVERSATION_MAX_BYTES: int = int(
+        os.getenv("CONVERSATION_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+    CONVERSATION_IDLE_TTL: float = float(os.getenv("CONVERSATION_IDLE_TTL", "1800"))
+    CONVERSATION_SWEEP_INTERVAL: float = float(
+        os.getenv("CONVERSATION_SWEEP_INTERVAL", "60")
+    )
+
+    # Response cache settings (first turns only, size 0 disables the cache)
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+    RESPONSE_CACHE_TTL: float = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+
+    # Hedging settings: a request the primary provider has not answered within
+    # the HEDGE_QUANTILE of its recent latencies is also sent to the other one
+    HEDGE_ENABLED: bool = os.getenv("HEDGE_ENABLED", "False") == "True"
+    HEDGE_QUANTILE: float = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+    HEDGE_MIN_DELAY: float = float(os.getenv("HEDGE_MIN_DELAY", "0.05"))
+    HEDGE_INITIAL_DELAY: float = float(os.getenv("HEDGE_INITIAL_DELAY", "1.0"))
+
+    # Circuit breaker settings: a provider whose EWMA error rate or latency
+    # crosses its threshold gets no traffic for BREAKER_OPEN_SECONDS
+    BREAKER_ERROR_RATE: float = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+    BREAKER_LATENCY: float = float(os.getenv("BREAKER_LATENCY", "10.0"))
+    BREAKER_MIN_REQUESTS: int = int(os.getenv("BREAKER_MIN_REQUESTS", "5"))
+    BREAKER_OPEN_SECONDS: float = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+    BREAKER_EWMA_ALPHA: float = float(os.getenv("BREAKER_EWMA_ALPHA", "0.2"))
+
+    # Tracing settings: traces of requests slower than TRACE_SLOW_THRESHOLD
+    # seconds are kept for /api/debug/traces (0 keeps every request)
+    TRACE_BUFFER_SIZE: int = int(os.getenv("TRACE_BUFFER_SIZE", "100"))
+    TRACE_SLOW_THRESHOLD: float = float(os.getenv("TRACE_SLOW_THRESHOLD", "1.0"))
+
     # Voice settings
     TTS_LANGUAGE: str = os.getenv("TTS_LANGUAGE", "en")
     TTS_SPEED: float = float(os.getenv("TTS_SPEED", "1.0"))
     STT_LANGUAGE: str = os.getenv("STT_LANGUAGE", "en-US")
 
+    # Speech-to-text backend: "google" (web API) or "sphinx" (offline,
+    # needs the pocketsphinx package), loaded once per worker at startup
+    STT_BACKEND: str = os.getenv("STT_BACKEND", "google")
+
+    # Silence detection settings: audio quieter than SILENCE_THRESHOLD dBFS
+    # (or the adaptive noise floor plus VAD_NOISE_MARGIN dB) is silence, and
+    # VAD_HANGOVER_MS of it ends an utterance
+    SILENCE_THRESHOLD: float = float(os.getenv("SILENCE_THRESHOLD", "-50.0"))
+    SILENCE_CHUNK_MS: int = int(os.getenv("SILENCE_CHUNK_MS", "10"))
+    VAD_HANGOVER_MS: int = int(os.getenv("VAD_HANGOVER_MS", "300"))
+    VAD_NOISE_MARGIN: float = float(os.getenv("VAD_NOISE_MARGIN", "10.0"))
+
+    # Voice WebSocket settings: partial transcripts are sent every
+    # VOICE_WS_PARTIAL_INTERVAL seconds of speech (0 disables them)
+    VOICE_WS_SAMPLE_RATE: int = int(os.getenv("VOICE_WS_SAMPLE_RATE", "16000"))
+    VOICE_WS_PARTIAL_INTERVAL: float = float(
+        os.getenv("VOICE_WS_PARTIAL_INTERVAL", "1.0")
+    )
+    VOICE_WS_MAX_SECONDS: float = float(os.getenv("VOICE_WS_MAX_SECONDS", "60"))
+
+    # Voice executor settings (requests beyond workers + queue get a 503)
+    VOICE_WORKERS: int = int(os.getenv("VOICE_WORKERS", "4"))
+    VOICE_QUEUE_SIZE: int = int(os.getenv("VOICE_QUEUE_SIZE", "16"))
+
+    # Text-to-speech backend: "gtts" (web API) or "espeak" (offline, needs
+    # espeak-ng), with TTS_ENGINES espeak-ng processes kept ready per worker
+    TTS_BACKEND: str = os.getenv("TTS_BACKEND", "gtts")
+    TTS_ENGINES: int = int(os.getenv("TTS_ENGINES", str(VOICE_WORKERS)))
+    TTS_ESPEAK_COMMAND: str = os.getenv("TTS_ESPEAK_COMMAND", "")
+    TTS_ESPEAK_RATE: int = int(os.getenv("TTS_ESPEAK_RATE", "175"))
+    TTS_TIMEOUT: float = float(os.getenv("TTS_TIMEOUT", "30"))
+
+    # DSP settings: "thread" runs audio processing on the voice executor,
+    # "process" hands samples to a process pool through shared memory
+    DSP_MODE: str = os.getenv("DSP_MODE", "thread")
+    DSP_PROCESSES: int = int(os.getenv("DSP_PROCESSES", str(os.cpu_count() or 1)))
+
+    # TTS cache settings (an empty directory disables the disk tier)
+    TTS_CACHE_SIZE: int = int(os.getenv("TTS_CACHE_SIZE", "128"))
+    TTS_CACHE_DIR: str = os.getenv("TTS_CACHE_DIR", "")
+    TTS_CACHE_MAX_BYTES: int = int(
+        os.getenv("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+    )
+
     class Config:
         case_sensitive = True
 
@@ -0,0 +1,325 @@
+"""Bounded in-memory storage for chat conversations."""
+
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from app.core.tokens import message_tokens, window_messages
+
+Message = Dict[str, str]
+
+
+def message_size(message: Message) -> int:
+    """
+    Estimate the memory held by a message.
+
+    Args:
+        message (Message): The message
+
+    Returns:
+        int: Size of the message dict and its content string in bytes
+    """
+    return sys.getsizeof(message) + sys.getsizeof(message["content"])
+
+
+class _Entry:
+    """A stored conversation and its bookkeeping."""
+
+    __slots__ = ("messages", "tokens", "nbytes", "last_access")
+
+    def __init__(self, messages: List[Message], tokens: List[int], last_access: float):
+        self.messages = messages
+        self.tokens = tokens
+        self.nbytes = sum(message_size(message) for message in messages)
+        self.last_access = last_access
+
+
+class ConversationStore:
+    """
+    Conversation histories keyed by conversation ID.
+
+    Conversations expire after sitting idle for a while, and the least
+    recently used ones are evicted once either the number of conversations
+    or their total estimated size goes over its cap. Expired conversations
+    are dropped when looked up and by a background sweeper thread.
+
+    The token count of every message is computed once when it is stored,
+    so prompt windows can be sized without re-tokenizing the history.
+
+    Message lists returned by the store must not be mutated directly; use
+    append, trim or assign a new list so the accounting stays correct.
+    """
+
+    def __init__(
+        self,
+        max_conversations: int,
+        max_bytes: int,
+        idle_ttl: float,
+        sweep_interval: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+        token_counter: Callable[[Message], int] = message_tokens,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            max_conversations (int): Maximum number of conversations kept
+            max_bytes (int): Maximum estimated size of all conversations in bytes
+            idle_ttl (float): Seconds a conversation may sit unused before it expires
+            sweep_interval (float): Seconds between background sweeps, or 0 to disable them
+            clock (Callable[[], float]): Monotonic clock used for expiry
+            token_counter (Callable[[Message], int]): Counts the prompt tokens of a message
+        """
+        self.max_conversations = max_conversations
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self.token_counter = token_counter
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.RLock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # Counters
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored conversations."""
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        """Check whether a live conversation is stored under a key."""
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def __getitem__(self, key: str) -> List[Message]:
+        """
+        Get a conversation's messages, marking it as recently used.
+
+        Args:
+            key (str): The conversation key
+
+        Returns:
+            List[Message]: The conversation's messages
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                raise KeyError(key)
+            return entry.messages
+
+    def __setitem__(self, key: str, messages: List[Message]) -> None:
+        """
+        Store a conversation, replacing any existing one.
+
+        Args:
+            key (str): The conversation key
+            messages (List[Message]): The conversation's messages
+        """
+        with self._lock:
+            tokens = [self.token_counter(message) for message in messages]
+            entry = _Entry(messages, tokens, self.clock())
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+            self._entries[key] = entry
+            self._nbytes += entry.nbytes
+            self._enforce_limits(key)
+
+        self._ensure_sweeper()
+
+    def __delitem__(self, key: str) -> None:
+        """Remove a conversation."""
+        with self._lock:
+            entry = self._entries.pop(key)
+            self._nbytes -= entry.nbytes
+
+    def get(self, key: str, default=None):
+        """
+        Get a conversation's messages if it is stored.
+
+        Args:
+            key (str): The conversation key
+            default: Value returned if there is no such conversation
+
+        Returns:
+            The conversation's messages, or default
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            return default if entry is None else entry.messages
+
+    def append(self, key: str, message: Message) -> None:
+        """
+        Append a message to a stored conversation.
+
+        Args:
+            key (str): The conversation key
+            message (Message): The message to append
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                raise KeyError(key)
+            size = message_size(message)
+            entry.messages.append(message)
+            entry.tokens.append(self.token_counter(message))
+            entry.nbytes += size
+            self._nbytes += size
+            self._enforce_limits(key)
+
+    def window(self, key: str, budget: int) -> List[Message]:
+        """
+        Get the system message plus the newest turns that fit a token budget.
+
+        Args:
+            key (str): The conversation key
+            budget (int): Maximum history tokens on top of the system message
+
+        Returns:
+            List[Message]: The messages to send as the prompt
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                raise KeyError(key)
+            start = window_messages(entry.messages, entry.tokens, budget)
+            return entry.messages[:1] + entry.messages[start:]
+
+    def trim(self, key: str, budget: int) -> None:
+        """
+        Drop the whole turns that no longer fit a conversation's token budget.
+
+        Args:
+            key (str): The conversation key
+            budget (int): Maximum history tokens on top of the system message
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                raise KeyError(key)
+            start = window_messages(entry.messages, entry.tokens, budget)
+            if start <= 1:
+                return
+
+            dropped = entry.messages[1:start]
+            size = sum(message_size(message) for message in dropped)
+            entry.messages[1:start] = []
+            entry.tokens[1:start] = []
+            entry.nbytes -= size
+            self._nbytes -= size
+
+    def sweep(self) -> int:
+        """
+        Remove every conversation that has been idle for longer than the TTL.
+
+        Returns:
+            int: Number of conversations removed
+        """
+        removed = 0
+        with self._lock:
+            deadline = self.clock() - self.idle_ttl
+            # Entries are in access order, so expired ones are at the front
+            while self._entries:
+                key, entry = next(iter(self._entries.items()))
+                if entry.last_access > deadline:
+                    break
+                self._remove(key)
+                self.expirations += 1
+                removed += 1
+        return removed
+
+    def stop_sweeper(self) -> None:
+        """Stop the background sweeper thread if it is running."""
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+            self._sweeper = None
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the live size and eviction counters.
+
+        Returns:
+            Dict[str, float]: Current size, limits and eviction counters
+        """
+        with self._lock:
+            return {
+                "conversations": len(self._entries),
+                "bytes": self._nbytes,
+                "max_conversations": self.max_conversations,
+                "max_bytes": self.max_bytes,
+                "idle_ttl": self.idle_ttl,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _lookup(self, key: str) -> Optional[_Entry]:
+        """Find a live entry and mark it as recently used. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        now = self.clock()
+        if now - entry.last_access >= self.idle_ttl:
+            self._remove(key)
+            self.expirations += 1
+            return None
+
+        entry.last_access = now
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry. Caller holds the lock."""
+        entry = self._entries.pop(key)
+        self._nbytes -= entry.nbytes
+
+    def _enforce_limits(self, keep: str) -> None:
+        """Evict least recently used entries other than keep. Caller holds the lock."""
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_conversations or self._nbytes > self.max_bytes
+        ):
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            self._remove(key)
+            self.evictions += 1
+
+    def _ensure_sweeper(self) -> None:
+        """Start the background sweeper on first use."""
+        if self.sweep_interval <= 0 or self._sweeper is not None:
+            return
+
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._stop.clear()
+            self._sweeper = threading.Thread(
+                target=_sweep_forever,
+                args=(weakref.ref(self), self.sweep_interval, self._stop),
+                name="conversation-sweeper",
+                daemon=True,
+            )
+            self._sweeper.start()
+
+
+def _sweep_forever(
+    store_ref: "weakref.ref[ConversationStore]",
+    interval: float,
+    stop: threading.Event,
+) -> None:
+    """Sweep a store periodically until it is stopped or garbage collected."""
+    while not stop.wait(interval):
+        store = store_ref()
+        if store is None:
+            return
+        store.sweep()
+        del store
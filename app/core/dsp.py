@@ -0,0 +1,225 @@
+"""NumPy signal processing for the voice pipeline and its process-pool mode."""
+
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.vad import speech_segments
+
+# NumPy sample types for each supported sample width in bytes
+SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def chunk_dbfs(squares, frame_rate, channels, boundaries_ms, max_amplitude):
+    """
+    Compute the loudness of consecutive chunks of audio.
+
+    Matches AudioSegment.dBFS on the equivalent slices: the RMS is taken
+    over all interleaved samples and truncated to an integer, and silent
+    chunks are -inf.
+
+    Args:
+        squares (np.ndarray): Squared interleaved samples
+        frame_rate (int): Sample rate in Hz
+        channels (int): Number of interleaved channels
+        boundaries_ms (np.ndarray): Ascending chunk boundaries in milliseconds
+        max_amplitude (float): Maximum possible sample amplitude
+
+    Returns:
+        np.ndarray: Loudness of each chunk in dBFS
+    """
+    # Mapping millisecond boundaries to sample offsets the way pydub slices
+    frames = (boundaries_ms * (frame_rate / 1000.0)).astype(np.int64)
+    starts = frames[:-1] * channels
+    counts = np.diff(frames) * channels
+
+    # Summing the energy of every chunk in one pass
+    sums = np.zeros(len(counts))
+    in_range = starts < len(squares)
+    if in_range.any():
+        sums[in_range] = np.add.reduceat(squares, starts[in_range])
+    sums[counts <= 0] = 0.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rms = np.floor(np.sqrt(np.where(counts > 0, sums / counts, 0.0)))
+        return np.where(rms > 0, 20 * np.log10(rms / max_amplitude), -np.inf)
+
+
+def silence_bounds(
+    samples,
+    frame_rate,
+    channels,
+    duration_ms,
+    max_amplitude,
+    silence_threshold=-50.0,
+    chunk_size=10,
+):
+    """
+    Find where the sound starts and ends in a sample array.
+
+    Leading chunks are laid out from the start of the audio and trailing
+    chunks from its end, exactly as a chunk-by-chunk scan would walk them.
+
+    Args:
+        samples (np.ndarray): Interleaved samples
+        frame_rate (int): Sample rate in Hz
+        channels (int): Number of interleaved channels
+        duration_ms (int): Length of the audio in milliseconds
+        max_amplitude (float): Maximum possible sample amplitude
+        silence_threshold (float): Silence threshold in dB
+        chunk_size (int): Chunk size in milliseconds
+
+    Returns:
+        Optional[Tuple[int, int]]: Start and end of the sound in milliseconds,
+            or None if the audio is entirely silent
+    """
+    if duration_ms == 0:
+        return None
+
+    squares = np.square(samples, dtype=np.float64)
+
+    def chunk_is_loud(boundaries_ms):
+        dbfs = chunk_dbfs(squares, frame_rate, channels, boundaries_ms, max_amplitude)
+        return dbfs >= silence_threshold
+
+    # Detecting leading silence
+    leading = np.append(np.arange(0, duration_ms, chunk_size), duration_ms)
+    loud = chunk_is_loud(leading)
+    if not loud.any():
+        return None
+    start_ms = int(leading[np.argmax(loud)])
+
+    # Detecting trailing silence
+    trailing = np.arange(duration_ms, 0, -chunk_size)[::-1]
+    trailing = np.insert(trailing, 0, max(trailing[0] - chunk_size, 0))
+    loud = chunk_is_loud(trailing)
+    end_ms = int(trailing[len(loud) - np.argmax(loud[::-1])])
+
+    return start_ms, end_ms
+
+
+def normalize_samples(samples, max_amplitude, headroom=0.1):
+    """
+    Scale samples in place so the peak sits just below full scale.
+
+    Matches AudioSegment.normalize, including its truncation and clipping.
+
+    Args:
+        samples (np.ndarray): Interleaved integer samples, modified in place
+        max_amplitude (float): Maximum possible sample amplitude
+        headroom (float): Distance of the peak below full scale in dB
+    """
+    if len(samples) == 0:
+        return
+
+    info = np.iinfo(samples.dtype)
+    peak = max(abs(int(samples.max())), abs(int(samples.min())))
+    if peak == 0:
+        return
+
+    # Going through decibels like pydub does, so the factor is bit-identical
+    target_peak = max_amplitude * 10 ** (-headroom / 20)
+    gain = 10 ** ((20 * math.log10(target_peak / peak)) / 20)
+
+    scaled = samples * gain
+    np.clip(scaled, info.min, info.max, out=scaled)
+    np.floor(scaled, out=scaled)
+    samples[:] = scaled
+
+
+def get_process_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Get the shared DSP process pool, starting it on first use.
+
+    Args:
+        workers (int, optional): Number of processes, defaults to the CPU count
+
+    Returns:
+        ProcessPoolExecutor: The pool
+    """
+    global _process_pool
+
+    if _process_pool is None:
+        with _process_pool_lock:
+            # Checking again in case another thread started the pool first
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=workers or os.cpu_count()
+                )
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Stop the DSP process pool if it is running."""
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown()
+            _process_pool = None
+
+
+def normalize_and_segment_shared(
+    raw_data, sample_width, frame_rate, channels, workers=None
+) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Normalize audio and find its utterances in a worker process.
+
+    The samples travel to the worker through shared memory rather than
+    being pickled, and the worker normalizes them in place.
+
+    Args:
+        raw_data (bytes): Interleaved samples
+        sample_width (int): Bytes per sample, one of SAMPLE_DTYPES
+        frame_rate (int): Sample rate in Hz
+        channels (int): Number of interleaved channels
+        workers (int, optional): Size of the process pool if it is not running yet
+
+    Returns:
+        Tuple[bytes, List[Tuple[int, int]]]: Normalized samples and the start
+            and end of each utterance in sample frames
+    """
+    size = len(raw_data)
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        shm.buf[:size] = raw_data
+        segments = (
+            get_process_pool(workers)
+            .submit(
+                _normalize_and_segment_worker,
+                shm.name,
+                size,
+                sample_width,
+                frame_rate,
+                channels,
+            )
+            .result()
+        )
+        return bytes(shm.buf[:size]), segments
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _normalize_and_segment_worker(name, size, sample_width, frame_rate, channels):
+    """Normalize shared samples in place and return their utterances."""
+    shm = shared_memory.SharedMemory(name=name)
+    samples = None
+    try:
+        samples = np.ndarray(
+            (size // sample_width,), dtype=SAMPLE_DTYPES[sample_width], buffer=shm.buf
+        )
+        normalize_samples(samples, float(2 ** (sample_width * 8 - 1)))
+        return speech_segments(samples, frame_rate, channels)
+    finally:
+        # Releasing the view before the buffer is closed
+        samples = None
+        shm.close()
@@ -0,0 +1,105 @@
+"""Pools of preloaded speech engines shared by the voice worker threads."""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+
+class EnginePool:
+    """
+    A fixed-size pool of engines that are expensive to load and not thread-safe.
+
+    Each engine is used by one thread at a time. Engines are created on
+    fill() or on demand up to the pool size, and a thread that finds every
+    engine busy waits for one to come back rather than loading another.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int):
+        """
+        Initialize the pool.
+
+        Args:
+            factory (Callable[[], Any]): Loads one engine
+            size (int): Maximum number of engines
+        """
+        self.size = max(1, size)
+        self._factory = factory
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.created = 0
+        self.load_seconds = 0.0
+        self.waits = 0
+
+    def _create(self) -> Any:
+        """Load an engine, counting the time it took."""
+        started = time.perf_counter()
+        engine = self._factory()
+        with self._lock:
+            self.load_seconds += time.perf_counter() - started
+        return engine
+
+    def _reserve(self) -> bool:
+        """Claim a slot for a new engine if the pool is not full."""
+        with self._lock:
+            if self.created >= self.size:
+                return False
+            self.created += 1
+            return True
+
+    def fill(self) -> None:
+        """Load engines until the pool is full."""
+        while self._reserve():
+            try:
+                self._idle.put(self._create())
+            except BaseException:
+                with self._lock:
+                    self.created -= 1
+                raise
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """
+        Borrow an engine for the duration of a with block.
+
+        Yields:
+            The engine
+        """
+        try:
+            engine = self._idle.get_nowait()
+        except queue.Empty:
+            if self._reserve():
+                try:
+                    engine = self._create()
+                except BaseException:
+                    with self._lock:
+                        self.created -= 1
+                    raise
+            else:
+                with self._lock:
+                    self.waits += 1
+                engine = self._idle.get()
+
+        try:
+            yield engine
+        finally:
+            self._idle.put(engine)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the size and usage of the pool.
+
+        Returns:
+            Dict[str, Any]: Size, engines loaded and idle, total load time and
+                how often a thread had to wait for an engine
+        """
+        return {
+            "size": self.size,
+            "created": self.created,
+            "idle": self._idle.qsize(),
+            "load_seconds": round(self.load_seconds, 3),
+            "waits": self.waits,
+        }
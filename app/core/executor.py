@@ -0,0 +1,127 @@
+"""Bounded thread pool for offloading blocking work from the event loop."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class ExecutorSaturated(Exception):
+    """Raised when a bounded executor has no room left for more work."""
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a bounded backlog and queue instrumentation.
+
+    At most max_workers jobs run at once and at most max_queue more wait for
+    a worker. Work submitted beyond that is rejected immediately with
+    ExecutorSaturated, so callers can shed load instead of letting latency
+    pile up behind a long queue.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, name: str = "executor"):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers (int): Number of worker threads
+            max_queue (int): Number of jobs allowed to wait for a worker
+            name (str): Prefix for the worker thread names
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._lock = threading.Lock()
+
+        # Gauges
+        self._pending = 0
+        self._running = 0
+
+        # Counters
+        self.completed = 0
+        self.rejected = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._pending - self._running
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking function on the pool.
+
+        Args:
+            func (Callable[..., Any]): The function to run
+            *args (Any): Arguments for the function
+
+        Returns:
+            Any: The function's result
+
+        Raises:
+            ExecutorSaturated: If every worker is busy and the queue is full
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(
+                    f"{self._pending} jobs already running or queued"
+                )
+            self._pending += 1
+
+        submitted_at = time.perf_counter()
+        started = False
+
+        def job():
+            nonlocal started
+            waited = time.perf_counter() - submitted_at
+            with self._lock:
+                started = True
+                self._running += 1
+                self.wait_time_total += waited
+                self.wait_time_max = max(self.wait_time_max, waited)
+            return func(*args)
+
+        def done(_):
+            with self._lock:
+                self._pending -= 1
+                if started:
+                    self._running -= 1
+                    self.completed += 1
+
+        # Releasing the slot when the job finishes, even if the caller gave up;
+        # jobs cancelled before they start release it straight away
+        future = self._pool.submit(job)
+        future.add_done_callback(done)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the queue depth, wait time and rejection counters.
+
+        Returns:
+            Dict[str, float]: Current gauges and cumulative counters
+        """
+        with self._lock:
+            started = self.completed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": self._pending - self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_time_mean_ms": (
+                    self.wait_time_total / started * 1000 if started else 0.0
+                ),
+                "wait_time_max_ms": self.wait_time_max * 1000,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads."""
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,72 @@
+"""Pooled HTTP transports for the LLM provider clients."""
+
+import asyncio
+from typing import Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401 - only needed for HTTP/2 support in httpx
+except ImportError:  # pragma: no cover - depends on the environment
+    h2 = None
+
+from app.core.config import settings
+
+
+def build_http_client(verify=True) -> httpx.AsyncClient:
+    """
+    Build a pooled HTTP client for a provider.
+
+    Connections are kept alive between requests and HTTP/2 is used when
+    enabled and the h2 package is installed.
+
+    Args:
+        verify: TLS verification, passed through to httpx
+
+    Returns:
+        httpx.AsyncClient: The client
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT
+        ),
+        http2=settings.HTTP2 and h2 is not None,
+        verify=verify,
+    )
+
+
+async def warm_up(
+    client: httpx.AsyncClient, url: str, connections: Optional[int] = None
+) -> int:
+    """
+    Open connections to a host ahead of the first real request.
+
+    Sends concurrent HEAD requests so DNS, TCP and TLS setup are paid at
+    startup and the connections stay in the pool. Any HTTP response counts,
+    since only the connection matters.
+
+    Args:
+        client (httpx.AsyncClient): The pooled client
+        url (str): A URL on the provider's host
+        connections (int, optional): Number of connections to open
+
+    Returns:
+        int: Number of warm-up requests that got a response
+    """
+    connections = connections or settings.HTTP_WARM_CONNECTIONS
+
+    async def touch() -> bool:
+        try:
+            await client.head(url, timeout=settings.HTTP_CONNECT_TIMEOUT)
+            return True
+        except httpx.HTTPError as e:
+            print(f"Warm-up request to {url} failed: {str(e)}")
+            return False
+
+    results = await asyncio.gather(*[touch() for _ in range(connections)])
+    return sum(results)
@@ -0,0 +1,107 @@
+"""Multi-keyword matching for routing questions to response contexts."""
+
+from collections import deque
+from typing import Dict, Generic, List, Mapping, Optional, TypeVar
+
+V = TypeVar("V")
+
+# Priority of nodes that do not complete any keyword
+NO_MATCH = -1
+
+
+class KeywordMatcher(Generic[V]):
+    """
+    Aho-Corasick automaton over a set of keywords.
+
+    The automaton is built once and then finds every keyword occurring in a
+    text in a single pass. When several keywords occur, the one that comes
+    first in the mapping wins, so matching is deterministic regardless of
+    where in the text each keyword appears.
+    """
+
+    def __init__(self, mappings: Mapping[str, V]):
+        """
+        Build the automaton.
+
+        Args:
+            mappings (Mapping[str, V]): Keywords and the value each one maps to,
+                in priority order
+        """
+        self.values: List[V] = list(mappings.values())
+
+        # Goto transitions, failure links and the best keyword ending at each node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[int] = [NO_MATCH]
+
+        # Building the keyword trie
+        for priority, keyword in enumerate(mappings):
+            node = 0
+            for char in keyword.lower():
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(NO_MATCH)
+                    self._goto[node][char] = next_node
+                node = next_node
+            if self._best[node] == NO_MATCH:
+                self._best[node] = priority
+
+        # Linking failure transitions breadth first, folding in the best
+        # keyword reachable through each node's suffixes
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail if fail != child else 0
+                self._best[child] = _min_priority(
+                    self._best[child], self._best[self._fail[child]]
+                )
+                queue.append(child)
+
+    def __len__(self) -> int:
+        """Return the number of keywords."""
+        return len(self.values)
+
+    def match(self, text: str) -> Optional[V]:
+        """
+        Find the highest priority keyword occurring in a text.
+
+        Args:
+            text (str): Text to search, already lowercased
+
+        Returns:
+            Optional[V]: The value of the matching keyword, or None if no keyword occurs
+        """
+        goto, fail, best_at = self._goto, self._fail, self._best
+        best = NO_MATCH
+        node = 0
+
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            found = best_at[node]
+            if found != NO_MATCH and (best == NO_MATCH or found < best):
+                best = found
+                # Nothing can beat the first keyword
+                if best == 0:
+                    break
+
+        return None if best == NO_MATCH else self.values[best]
+
+
+def _min_priority(a: int, b: int) -> int:
+    """Return the higher priority (lower index) of two, ignoring NO_MATCH."""
+    if a == NO_MATCH:
+        return b
+    if b == NO_MATCH:
+        return a
+    return min(a, b)
@@ -0,0 +1,370 @@
+"""Minimal Prometheus metrics: counters, gauges and histograms in text format.
+
+Metric updates are plain attribute arithmetic with no locks. They are made
+from the event loop thread only; work running in executor threads returns
+its timings to the caller, which records them.
+"""
+
+import bisect
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from fast cache hits to slow provider calls
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format a label set, escaping the values."""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    """Base for metrics with optional labels."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Initialize the metric.
+
+        Args:
+            name (str): The metric name
+            documentation (str): The help text
+            labelnames (Sequence[str]): Names of the labels, if any
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+        # Exporting unlabeled metrics as zero before their first update
+        if not self.labelnames:
+            self.labels()
+
+    def _new_child(self):
+        """Create the value holder for one label set."""
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """
+        Get the child for a label set, creating it on first use.
+
+        Callers on the hot path should keep the child rather than looking it
+        up on every request.
+
+        Args:
+            *values (str): The label values, in label name order
+
+        Returns:
+            The child metric
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _samples(self, child) -> Iterable[Tuple[str, List[str], List[str], float]]:
+        """Yield (suffix, extra label names, extra label values, value) for a child."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """
+        Render the metric in Prometheus text format.
+
+        Returns:
+            List[str]: The HELP, TYPE and sample lines
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for values, child in list(self._children.items()):
+            for suffix, names, extra, value in self._samples(child):
+                labels = _format_labels(
+                    self.labelnames + tuple(names), tuple(values) + tuple(extra)
+                )
+                lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class _Value:
+    """A single counter or gauge value."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the value."""
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrease the value."""
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        """Set the value."""
+        self.value = value
+
+
+class Counter(_Metric):
+    """A value that only goes up, named with the _total suffix."""
+
+    type = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase an unlabeled counter."""
+        self.labels().inc(amount)
+
+    def _samples(self, child):
+        yield "", [], [], child.value
+
+
+class Gauge(_Metric):
+    """A value that goes up and down."""
+
+    type = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase an unlabeled gauge."""
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrease an unlabeled gauge."""
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        """Set an unlabeled gauge."""
+        self.labels().set(value)
+
+    def _samples(self, child):
+        yield "", [], [], child.value
+
+
+class _HistogramValue:
+    """Bucket counts, sum and count of one histogram label set."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    """Counts observations into cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        """
+        Initialize the histogram.
+
+        Args:
+            name (str): The metric name
+            documentation (str): The help text
+            labelnames (Sequence[str]): Names of the labels, if any
+            buckets (Sequence[float]): Ascending upper bounds of the buckets
+        """
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record one observation on an unlabeled histogram."""
+        self.labels().observe(value)
+
+    def _samples(self, child):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), child.counts):
+            cumulative += count
+            yield "_bucket", ["le"], [_format_value(bound)], cumulative
+        yield "_sum", [], [], child.sum
+        yield "_count", [], [], child.count
+
+
+class CallbackMetric(_Metric):
+    """A counter or gauge whose samples are read from a callback at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        metric_type: str,
+        callback: Callable[[], Iterable[Tuple[Sequence[str], float]]],
+        labelnames: Sequence[str] = (),
+    ):
+        """
+        Initialize the metric.
+
+        Args:
+            name (str): The metric name, with the _total suffix for counters
+            documentation (str): The help text
+            metric_type (str): "counter" or "gauge"
+            callback: Returns (label values, value) pairs when scraped
+            labelnames (Sequence[str]): Names of the labels, if any
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.type = metric_type
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        """Render the samples the callback returns."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for values, value in self.callback():
+            labels = _format_labels(self.labelnames, tuple(values))
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    """A collection of metrics rendered together."""
+
+    def __init__(self):
+        """Initialize the registry."""
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        Add a metric, replacing any earlier one with the same name.
+
+        Args:
+            metric: The metric
+
+        Returns:
+            The metric
+        """
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Get a registered metric by name."""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Render every metric in Prometheus text format.
+
+        Returns:
+            str: The exposition text
+        """
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Stage latencies of a voice turn
+PREPROCESS_SECONDS = REGISTRY.register(
+    Histogram(
+        "voicebot_preprocess_duration_seconds",
+        "Time spent normalizing and trimming audio",
+    )
+)
+STT_SECONDS = REGISTRY.register(
+    Histogram("voicebot_stt_duration_seconds", "Time spent transcribing speech")
+)
+LLM_SECONDS = REGISTRY.register(
+    Histogram(
+        "voicebot_llm_duration_seconds",
+        "Time until a full chat completion arrived",
+        ["provider", "model"],
+    )
+)
+LLM_FIRST_TOKEN_SECONDS = REGISTRY.register(
+    Histogram(
+        "voicebot_llm_first_token_seconds",
+        "Time until the first token of a streamed chat completion arrived",
+        ["provider", "model"],
+    )
+)
+TTS_SECONDS = REGISTRY.register(
+    Histogram(
+        "voicebot_tts_duration_seconds",
+        "Time spent synthesizing speech, excluding cache hits",
+        ["backend"],
+    )
+)
+REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "voicebot_request_duration_seconds",
+        "Total time to serve an API request, including streamed bodies",
+        ["path"],
+    )
+)
+
+# Work in flight
+REQUESTS_IN_FLIGHT = REGISTRY.register(
+    Gauge("voicebot_requests_in_flight", "API requests being served", ["path"])
+)
+LLM_IN_FLIGHT = REGISTRY.register(
+    Gauge(
+        "voicebot_llm_in_flight", "Provider requests awaiting an answer", ["provider"]
+    )
+)
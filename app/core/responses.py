@@ -4,6 +4,8 @@ These responses will be used as context for the ChatGPT API to maintain
 consistent responses for personal questions.
 """
 
+from app.core.matcher import KeywordMatcher
+
 # Personal response templates that will be used to guide ChatGPT
 PERSONAL_INFO = {
     "life_story": """
@@ -47,6 +49,26 @@ QUESTION_MAPPINGS = {
     "take risks": "boundaries",
 }
 
+# Automaton matching every keyword in QUESTION_MAPPINGS in a single pass
+_matcher = KeywordMatcher(QUESTION_MAPPINGS)
+
+
+def reload_mappings(mappings=None):
+    """
+    Rebuild the keyword matcher after QUESTION_MAPPINGS changes.
+
+    Args:
+        mappings (dict, optional): Mappings to replace QUESTION_MAPPINGS with,
+            in priority order
+    """
+    global _matcher
+
+    if mappings is not None:
+        QUESTION_MAPPINGS.clear()
+        QUESTION_MAPPINGS.update(mappings)
+
+    _matcher = KeywordMatcher(QUESTION_MAPPINGS)
+
 
 def get_response_context(question):
     """
@@ -58,12 +80,10 @@ def get_response_context(question):
     Returns:
         str: The context to use for the response
     """
-    question_lower = question.lower()
-
     # Check if any of the mappings are in the question
-    for keyword, info_key in QUESTION_MAPPINGS.items():
-        if keyword in question_lower:
-            return PERSONAL_INFO[info_key]
+    info_key = _matcher.match(question.lower())
+    if info_key is not None:
+        return PERSONAL_INFO[info_key]
 
     # Default general context if no specific match
     return f"""
@@ -0,0 +1,71 @@
+"""Coalescing of identical concurrent async calls."""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time and shares its result.
+
+    Callers that arrive while a call for the same key is in flight wait for
+    that call instead of starting their own. A caller being cancelled never
+    cancels the shared call for the others.
+    """
+
+    def __init__(self):
+        """Initialize the coalescer."""
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+        # Counters
+        self.leaders = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        """Return the number of calls in flight."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a call, or join the identical one already in flight.
+
+        Args:
+            key (Hashable): Identifies identical calls
+            func (Callable[[], Awaitable[T]]): Starts the call if none is in flight
+
+        Returns:
+            T: The result of the shared call
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.leaders += 1
+        future = asyncio.ensure_future(func())
+        self._calls[key] = future
+        future.add_done_callback(lambda _: self._forget(key, future))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        """Drop a finished call, unless a newer one has taken its key."""
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # Marking the exception as retrieved if every caller went away
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the coalescing counters.
+
+        Returns:
+            Dict[str, int]: Calls in flight, calls started and callers coalesced
+        """
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,171 @@
+"""Speech-to-text backends, selected with the STT_BACKEND setting."""
+
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import speech_recognition as sr
+
+from app.core.config import settings
+from app.core.engines import EnginePool
+
+
+class STTBackend:
+    """A speech recognition engine."""
+
+    name = ""
+
+    def __init__(self):
+        """Initialize the backend."""
+        self.recognizer = sr.Recognizer()
+
+    def load(self) -> None:
+        """Load any models up front, so the first request does not pay for it."""
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        """
+        Transcribe recorded audio.
+
+        Args:
+            audio (sr.AudioData): The audio
+
+        Returns:
+            str: Transcribed text
+
+        Raises:
+            sr.UnknownValueError: If the speech is unintelligible
+            sr.RequestError: If the engine is unavailable
+        """
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the backend name and its engine pool usage, if any."""
+        return {"backend": self.name}
+
+
+class GoogleSTT(STTBackend):
+    """Google's web speech API, one HTTPS request per utterance."""
+
+    name = "google"
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        """Transcribe recorded audio with Google's speech recognition API."""
+        return self.recognizer.recognize_google(audio, language=settings.STT_LANGUAGE)
+
+
+class SphinxSTT(STTBackend):
+    """
+    CMU PocketSphinx, running fully offline.
+
+    Recognizer.recognize_sphinx loads the acoustic and language models on
+    every call, so the decoders are built once and pooled instead, one per
+    voice worker. Needs the optional pocketsphinx package.
+    """
+
+    name = "sphinx"
+
+    def __init__(self, language: Optional[str] = None, engines: Optional[int] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            language (str, optional): Model language, defaults to STT_LANGUAGE
+            engines (int, optional): Number of decoders, defaults to VOICE_WORKERS
+        """
+        super().__init__()
+        self.language = language or settings.STT_LANGUAGE
+        self.pool = EnginePool(self._decoder, engines or settings.VOICE_WORKERS)
+
+    def _decoder(self):
+        """Build a decoder with the models bundled with SpeechRecognition."""
+        try:
+            from pocketsphinx import pocketsphinx
+        except ImportError:
+            raise sr.RequestError(
+                "missing PocketSphinx module: install pocketsphinx "
+                "to use STT_BACKEND=sphinx"
+            )
+
+        directory = os.path.join(
+            os.path.dirname(os.path.realpath(sr.__file__)),
+            "pocketsphinx-data",
+            self.language,
+        )
+        if not os.path.isdir(directory):
+            raise sr.RequestError(f"missing PocketSphinx language data: {directory}")
+
+        config = pocketsphinx.Decoder.default_config()
+        config.set_string("-hmm", os.path.join(directory, "acoustic-model"))
+        config.set_string("-lm", os.path.join(directory, "language-model.lm.bin"))
+        config.set_string(
+            "-dict", os.path.join(directory, "pronounciation-dictionary.dict")
+        )
+        config.set_string("-logfn", os.devnull)
+        return pocketsphinx.Decoder(config)
+
+    def load(self) -> None:
+        """Build every decoder in the pool."""
+        self.pool.fill()
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        """Transcribe recorded audio with a pooled PocketSphinx decoder."""
+        # The bundled models expect 16-bit mono 16 kHz audio
+        raw_data = audio.get_raw_data(convert_rate=16000, convert_width=2)
+
+        with self.pool.acquire() as decoder:
+            decoder.start_utt()
+            decoder.process_raw(raw_data, False, True)
+            decoder.end_utt()
+            hypothesis = decoder.hyp()
+
+        if hypothesis is None:
+            raise sr.UnknownValueError()
+        return hypothesis.hypstr
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the backend name and its decoder pool usage."""
+        return {"backend": self.name, "engines": self.pool.stats()}
+
+
+# Available backends by STT_BACKEND value
+BACKENDS = {"google": GoogleSTT, "sphinx": SphinxSTT}
+
+_backend: Optional[STTBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_stt_backend() -> STTBackend:
+    """
+    Get the configured speech-to-text backend, creating it on first use.
+
+    Returns:
+        STTBackend: The backend
+
+    Raises:
+        ValueError: If STT_BACKEND names no known backend
+    """
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend = BACKENDS.get(settings.STT_BACKEND)
+                if backend is None:
+                    raise ValueError(
+                        f"Unknown STT_BACKEND {settings.STT_BACKEND!r}, "
+                        f"expected one of {', '.join(BACKENDS)}"
+                    )
+                _backend = backend()
+    return _backend
+
+
+def load_stt_backend() -> STTBackend:
+    """
+    Create the configured backend and load its models, once per worker process.
+
+    Returns:
+        STTBackend: The loaded backend
+    """
+    backend = get_stt_backend()
+    backend.load()
+    return backend
@@ -0,0 +1,89 @@
+"""Token counting for prompt budgeting."""
+
+from typing import Dict, List
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on the environment
+    tiktoken = None
+
+# Tokens the chat format adds around every message (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Rough characters per token for English text when no tokenizer is installed
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+if tiktoken is not None:
+    try:
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception:  # pragma: no cover - encoding files may be unavailable offline
+        _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a text.
+
+    Uses tiktoken when it is installed and falls back to a character-based
+    estimate otherwise.
+
+    Args:
+        text (str): The text
+
+    Returns:
+        int: Number of tokens
+    """
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    """
+    Count the prompt tokens a chat message costs.
+
+    Args:
+        message (Dict[str, str]): The message
+
+    Returns:
+        int: Number of tokens including the per-message overhead
+    """
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def window_messages(
+    messages: List[Dict[str, str]], token_counts: List[int], budget: int
+) -> int:
+    """
+    Find the oldest message of the history window that fits a token budget.
+
+    The history is split into turns that each start at a user message. The
+    system message is not counted against the budget, and the newest turn and
+    the one before it are always kept so the model sees its previous answer.
+    Older turns are added whole, from newest to oldest, until the next one
+    would go over the budget.
+
+    Args:
+        messages (List[Dict[str, str]]): The conversation, starting with the system message
+        token_counts (List[int]): Token count of each message
+        budget (int): Maximum history tokens on top of the system message
+
+    Returns:
+        int: Index of the oldest non-system message in the window
+    """
+    turns = [
+        i for i in range(1, len(messages)) if i == 1 or messages[i]["role"] == "user"
+    ]
+    if len(turns) <= 2:
+        return 1
+
+    first = len(turns) - 2
+    used = sum(token_counts[turns[first] :])
+    while first > 0:
+        cost = sum(token_counts[turns[first - 1] : turns[first]])
+        if used + cost > budget:
+            break
+        first -= 1
+        used += cost
+    return turns[first]
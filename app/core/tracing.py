@@ -0,0 +1,187 @@
+"""Per-request stage timing, Server-Timing headers and a buffer of slow traces."""
+
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+# Trace IDs accepted from clients; anything else gets a generated ID
+TRACE_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+
+
+class Trace:
+    """The stage timings of one request."""
+
+    __slots__ = ("trace_id", "path", "started_at", "started", "stages", "duration")
+
+    def __init__(self, path: str, trace_id: Optional[str] = None):
+        """
+        Initialize the trace.
+
+        Args:
+            path (str): The request path
+            trace_id (str, optional): A client-supplied trace ID, if valid
+        """
+        if not trace_id or not TRACE_ID_PATTERN.match(trace_id):
+            trace_id = uuid.uuid4().hex
+        self.trace_id = trace_id
+        self.path = path
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.duration: Optional[float] = None
+
+    def add(self, stage: str, seconds: float) -> None:
+        """
+        Add time to a stage, summing repeated stages such as per-sentence TTS.
+
+        Args:
+            stage (str): The stage name
+            seconds (float): Time spent in the stage
+        """
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def finish(self) -> float:
+        """
+        Mark the request as finished.
+
+        Returns:
+            float: Total request time in seconds
+        """
+        self.duration = time.perf_counter() - self.started
+        return self.duration
+
+    def server_timing(self) -> str:
+        """
+        Format the stages recorded so far as a Server-Timing header value.
+
+        Returns:
+            str: Header value with durations in milliseconds
+        """
+        metrics = [
+            f"{stage};dur={seconds * 1000:.1f}"
+            for stage, seconds in self.stages.items()
+        ]
+        metrics.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the trace as a JSON-friendly dictionary.
+
+        Returns:
+            Dict[str, Any]: Trace ID, path, start time, total and stage times in ms
+        """
+        return {
+            "trace_id": self.trace_id,
+            "path": self.path,
+            "started_at": self.started_at,
+            "total_ms": (
+                round(self.duration * 1000, 1) if self.duration is not None else None
+            ),
+            "stages_ms": {
+                stage: round(seconds * 1000, 1)
+                for stage, seconds in self.stages.items()
+            },
+        }
+
+
+def start_trace(path: str, trace_id: Optional[str] = None) -> Trace:
+    """
+    Start a trace for the current request context.
+
+    Tasks started from the request inherit the trace, so stages timed in
+    them are recorded on it too.
+
+    Args:
+        path (str): The request path
+        trace_id (str, optional): A client-supplied trace ID
+
+    Returns:
+        Trace: The new trace
+    """
+    trace = Trace(path, trace_id)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    """Get the trace of the current request, if any."""
+    return _current_trace.get()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """
+    Add time to a stage of the current request's trace, if it is traced.
+
+    Args:
+        stage (str): The stage name
+        seconds (float): Time spent in the stage
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(stage, seconds)
+
+
+class SlowTraceBuffer:
+    """Keeps the most recent traces of requests slower than a threshold."""
+
+    def __init__(self, maxlen: int = 100, threshold: float = 1.0):
+        """
+        Initialize the buffer.
+
+        Args:
+            maxlen (int): Number of traces to keep
+            threshold (float): Minimum request time to keep a trace, in seconds
+        """
+        self.threshold = threshold
+        self._traces: Deque[Trace] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace) -> bool:
+        """
+        Keep a finished trace if it was slow.
+
+        Args:
+            trace (Trace): The finished trace
+
+        Returns:
+            bool: True if the trace was kept
+        """
+        if trace.duration is None or trace.duration < self.threshold:
+            return False
+        with self._lock:
+            self._traces.append(trace)
+        return True
+
+    def list(
+        self, limit: Optional[int] = None, trace_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the kept traces, newest first.
+
+        Args:
+            limit (int, optional): Maximum number of traces to return
+            trace_id (str, optional): Only return the trace with this ID
+
+        Returns:
+            List[Dict[str, Any]]: The traces
+        """
+        with self._lock:
+            traces = list(reversed(self._traces))
+        if trace_id is not None:
+            traces = [trace for trace in traces if trace.trace_id == trace_id]
+        return [trace.to_dict() for trace in traces[:limit]]
+
+
+# Slow requests kept for the debug endpoint
+SLOW_TRACES = SlowTraceBuffer(
+    maxlen=settings.TRACE_BUFFER_SIZE, threshold=settings.TRACE_SLOW_THRESHOLD
+)
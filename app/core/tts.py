@@ -0,0 +1,295 @@
+"""Text-to-speech backends, selected with the TTS_BACKEND setting."""
+
+import io
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+from typing import Any, Dict, List, Optional
+
+from gtts import gTTS
+from pydub import AudioSegment
+
+from app.core.config import settings
+
+
+def _complete_wav_header(data: bytes) -> bytes:
+    """
+    Fill in the sizes a WAV header streamed to a pipe leaves unknown.
+
+    Args:
+        data (bytes): WAV data, possibly with 0xFFFFFFFF sizes
+
+    Returns:
+        bytes: WAV data with the RIFF and data chunk sizes set
+    """
+    position = data.find(b"data", 12)
+    if data[:4] != b"RIFF" or position < 0:
+        return data
+    header = bytearray(data[: position + 8])
+    struct.pack_into("<I", header, 4, len(data) - 8)
+    struct.pack_into("<I", header, position + 4, len(data) - position - 8)
+    return bytes(header) + data[position + 8 :]
+
+
+class TTSBackend:
+    """A speech synthesis engine rendering encoded audio."""
+
+    name = ""
+
+    # Whether the engine applies TTS_SPEED itself, without resampling
+    native_speed = False
+
+    # The encoding the engine produces, passed through as is when requested
+    native_format = "wav"
+
+    def load(self) -> None:
+        """Get the engine ready up front, so the first request does not pay for it."""
+
+    def close(self) -> None:
+        """Release the engine's resources."""
+
+    def render(self, text: str) -> bytes:
+        """
+        Render text as speech in the engine's native format.
+
+        Args:
+            text (str): Text to convert to speech
+
+        Returns:
+            bytes: The encoded speech
+
+        Raises:
+            RuntimeError: If the engine failed or is not installed
+        """
+        raise NotImplementedError
+
+    def synthesize(self, text: str) -> AudioSegment:
+        """
+        Render text as speech and decode it.
+
+        Args:
+            text (str): Text to convert to speech
+
+        Returns:
+            AudioSegment: The speech
+
+        Raises:
+            RuntimeError: If the engine failed or is not installed
+        """
+        return AudioSegment.from_file(
+            io.BytesIO(self.render(text)), format=self.native_format
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the backend name."""
+        return {"backend": self.name}
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate's speech API, with an HTTPS request per ~100 characters."""
+
+    name = "gtts"
+    native_format = "mp3"
+
+    def render(self, text: str) -> bytes:
+        """Render text as MP3 speech with gTTS."""
+        # Creating a gTTS object with the text and desired language
+        tts = gTTS(text=text, lang=settings.TTS_LANGUAGE, slow=False)
+
+        # Save to a BytesIO object
+        mp3_fp = io.BytesIO()
+        tts.write_to_fp(mp3_fp)
+        return mp3_fp.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """
+    eSpeak NG, running fully offline and writing WAV straight to a pipe.
+
+    Each espeak-ng process renders one text read from stdin. A pool of
+    processes is started ahead of time, already initialized with their
+    voice, and each one taken is replaced at once, so requests neither
+    share an engine nor wait for one to start. Speed is set in words per
+    minute rather than by resampling, which keeps the pitch.
+    """
+
+    name = "espeak"
+    native_speed = True
+
+    def __init__(
+        self,
+        command: Optional[str] = None,
+        voice: Optional[str] = None,
+        engines: Optional[int] = None,
+    ):
+        """
+        Initialize the backend.
+
+        Args:
+            command (str, optional): The espeak-ng executable, found on the
+                PATH by default
+            voice (str, optional): The voice, defaults to TTS_LANGUAGE
+            engines (int, optional): Processes kept ready, defaults to TTS_ENGINES
+        """
+        self.command = command or settings.TTS_ESPEAK_COMMAND
+        self.voice = voice or settings.TTS_LANGUAGE
+        self.engines = engines or settings.TTS_ENGINES
+        self._argv: Optional[List[str]] = None
+        self._idle: "queue.Queue[subprocess.Popen]" = queue.Queue()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.cold_starts = 0
+
+    def _spawn(self) -> subprocess.Popen:
+        """Start an engine, which initializes and then waits for text."""
+        return subprocess.Popen(
+            self._argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def _render(self, process: subprocess.Popen, text: str) -> bytes:
+        """Send text to an engine and read back its WAV output."""
+        try:
+            stdout, stderr = process.communicate(
+                text.encode("utf-8"), timeout=settings.TTS_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise RuntimeError("espeak-ng timed out")
+
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"espeak-ng failed: {stderr.decode(errors='replace').strip()}"
+            )
+        return _complete_wav_header(stdout)
+
+    def load(self) -> None:
+        """Find the executable, check the voice and start the engine pool."""
+        with self._lock:
+            if self._argv is not None:
+                return
+
+            command = (
+                self.command or shutil.which("espeak-ng") or shutil.which("espeak")
+            )
+            if not command or not shutil.which(command):
+                raise RuntimeError(
+                    "missing espeak-ng: install it to use TTS_BACKEND=espeak"
+                )
+            self._argv = [
+                command,
+                "--stdout",
+                "-b",
+                "1",
+                "-v",
+                self.voice,
+                "-s",
+                str(round(settings.TTS_ESPEAK_RATE * settings.TTS_SPEED)),
+            ]
+
+            # Checking the voice at startup rather than on the first request
+            try:
+                self._render(self._spawn(), "Ready.")
+            except Exception:
+                self._argv = None
+                raise
+
+            for _ in range(self.engines):
+                self._idle.put(self._spawn())
+
+    def render(self, text: str) -> bytes:
+        """Render text as WAV speech with a ready espeak-ng process."""
+        if self._argv is None:
+            self.load()
+
+        while True:
+            try:
+                process = self._idle.get_nowait()
+            except queue.Empty:
+                # Every engine is busy, so starting one on the spot
+                with self._lock:
+                    self.cold_starts += 1
+                process = self._spawn()
+                break
+
+            # Replacing the engine taken while this one renders
+            self._idle.put(self._spawn())
+            if process.poll() is None:
+                break
+
+        return self._render(process, text)
+
+    def close(self) -> None:
+        """Stop the idle engines."""
+        while True:
+            try:
+                process = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            process.kill()
+            process.communicate()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the backend name and its engine pool usage."""
+        return {
+            "backend": self.name,
+            "engines": self.engines,
+            "idle": self._idle.qsize(),
+            "cold_starts": self.cold_starts,
+        }
+
+
+# Available backends by TTS_BACKEND value
+BACKENDS = {"gtts": GTTSBackend, "espeak": EspeakBackend}
+
+_backend: Optional[TTSBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_tts_backend() -> TTSBackend:
+    """
+    Get the configured text-to-speech backend, creating it on first use.
+
+    Returns:
+        TTSBackend: The backend
+
+    Raises:
+        ValueError: If TTS_BACKEND names no known backend
+    """
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend = BACKENDS.get(settings.TTS_BACKEND)
+                if backend is None:
+                    raise ValueError(
+                        f"Unknown TTS_BACKEND {settings.TTS_BACKEND!r}, "
+                        f"expected one of {', '.join(BACKENDS)}"
+                    )
+                _backend = backend()
+    return _backend
+
+
+def load_tts_backend() -> TTSBackend:
+    """
+    Create the configured backend and get it ready, once per worker process.
+
+    Returns:
+        TTSBackend: The loaded backend
+    """
+    backend = get_tts_backend()
+    backend.load()
+    return backend
+
+
+def close_tts_backend() -> None:
+    """Release the backend's resources, if it was created."""
+    if _backend is not None:
+        _backend.close()
@@ -0,0 +1,298 @@
+"""Streaming voice activity detection and end-of-utterance detection."""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+
+def frame_levels(samples, frame_values, max_amplitude):
+    """
+    Compute the loudness of consecutive whole frames in one pass.
+
+    Like AudioSegment.dBFS, the RMS is taken over all interleaved samples
+    and truncated to an integer, and silent frames are -inf.
+
+    Args:
+        samples (np.ndarray): Interleaved samples
+        frame_values (int): Interleaved samples per frame
+        max_amplitude (float): Maximum possible sample amplitude
+
+    Returns:
+        np.ndarray: Loudness of each whole frame in dBFS
+    """
+    count = len(samples) // frame_values
+    frames = samples[: count * frame_values].reshape(count, frame_values)
+    power = np.square(frames, dtype=np.float64).mean(axis=1)
+    rms = np.floor(np.sqrt(power))
+    with np.errstate(divide="ignore"):
+        return np.where(rms > 0, 20 * np.log10(rms / max_amplitude), -np.inf)
+
+
+class VoiceActivityDetector:
+    """
+    Splits a stream of PCM audio into utterances as it arrives.
+
+    Audio is cut into short frames whose loudness is computed in one NumPy
+    pass per feed. A frame is speech when it is at least as loud as the
+    silence threshold and as the noise floor plus a margin. The noise floor
+    starts low enough that the silence threshold alone decides, and digital
+    silence counts as the quietest floor. It drops at once to a quieter frame
+    and rises slowly towards a louder one, but never past the loudest
+    background it accepts, so a long utterance is not worn away. An
+    utterance ends after ``hangover_ms`` without speech and is checked
+    against the floor learned by then: background noise the floor had not
+    caught up with yet is dropped, and the rest is returned trimmed to its
+    first and last frame that is still loud enough.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        sample_width: int = 2,
+        channels: int = 1,
+        silence_threshold: Optional[float] = None,
+        frame_ms: Optional[int] = None,
+        hangover_ms: Optional[int] = None,
+        noise_margin: Optional[float] = None,
+        noise_rise_seconds: float = 5.0,
+        max_noise_floor: Optional[float] = None,
+        max_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            sample_rate (int): Sample rate in Hz
+            sample_width (int): Bytes per sample, 1, 2 or 4
+            channels (int): Number of interleaved channels
+            silence_threshold (float, optional): Quietest speech in dBFS,
+                defaults to SILENCE_THRESHOLD
+            frame_ms (int, optional): Frame length, defaults to SILENCE_CHUNK_MS
+            hangover_ms (int, optional): Silence that ends an utterance,
+                defaults to VAD_HANGOVER_MS
+            noise_margin (float, optional): How far above the noise floor
+                speech must be in dB, defaults to VAD_NOISE_MARGIN
+            noise_rise_seconds (float): Time constant of the noise floor rising
+            max_noise_floor (float, optional): Loudest background noise in
+                dBFS, defaults to the silence threshold plus the margin
+            max_seconds (float, optional): Cut utterances at this length
+        """
+        if silence_threshold is None:
+            silence_threshold = settings.SILENCE_THRESHOLD
+        frame_ms = frame_ms or settings.SILENCE_CHUNK_MS
+        if hangover_ms is None:
+            hangover_ms = settings.VAD_HANGOVER_MS
+        if noise_margin is None:
+            noise_margin = settings.VAD_NOISE_MARGIN
+
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self.silence_threshold = silence_threshold
+        self.noise_margin = noise_margin
+        self.frame_ms = frame_ms
+
+        # Starting with the floor low enough that the silence threshold alone decides
+        if max_noise_floor is None:
+            max_noise_floor = silence_threshold + noise_margin
+        self.min_noise_floor = silence_threshold - noise_margin
+        self.max_noise_floor = max_noise_floor
+        self.noise_floor = self.min_noise_floor
+        self._noise_rise = min(1.0, frame_ms / 1000 / noise_rise_seconds)
+        self._hangover_frames = max(1, round(hangover_ms / frame_ms))
+        self._max_frames = int(max_seconds * 1000 / frame_ms) if max_seconds else None
+
+        self._dtype = np.dtype(f"<i{sample_width}")
+        self._max_amplitude = float(2 ** (sample_width * 8 - 1))
+        self._frame_values = max(1, int(sample_rate * frame_ms / 1000)) * channels
+        self._frame_bytes = self._frame_values * sample_width
+
+        # Frame counters are absolute, from the start of the stream
+        self._frames_seen = 0
+        self._start: Optional[int] = None
+        self._end = 0
+        self._levels: List[float] = []
+        self._audio = bytearray()
+        self._audio_start = 0
+        self._pending = b""
+
+    @property
+    def in_speech(self) -> bool:
+        """Whether an utterance has started and not yet ended."""
+        return self._start is not None
+
+    @property
+    def duration(self) -> float:
+        """Length of the current utterance so far in seconds."""
+        if self._start is None:
+            return 0.0
+        return (self._end - self._start) * self.frame_ms / 1000
+
+    def _gate(self) -> float:
+        """Get the quietest level that counts as speech right now."""
+        return max(self.silence_threshold, self.noise_floor + self.noise_margin)
+
+    def _confirm(self) -> Optional[Tuple[int, int]]:
+        """
+        Check the utterance in progress against the current noise floor.
+
+        Returns:
+            Optional[Tuple[int, int]]: Start and end frame of the loud part of
+                the utterance, or None if most of it was background noise
+        """
+        gate = self._gate()
+        levels = self._levels[: self._end - self._start]
+        loud = [i for i, level in enumerate(levels) if level >= gate]
+        if len(loud) * 2 <= len(levels):
+            return None
+        return self._start + loud[0], self._start + loud[-1] + 1
+
+    def _close(self, segments: List[Tuple[int, int]]) -> None:
+        """End the utterance in progress, keeping it if it was speech."""
+        segment = self._confirm()
+        if segment is not None:
+            segments.append(segment)
+        self._start = None
+        self._levels = []
+
+    def _advance(self, levels) -> List[Tuple[int, int]]:
+        """
+        Run the endpointing state machine over a run of frame levels.
+
+        Args:
+            levels (np.ndarray): Loudness of each new frame in dBFS
+
+        Returns:
+            List[Tuple[int, int]]: Start and end frame of each finished utterance
+        """
+        segments = []
+        for level in levels.tolist():
+            index = self._frames_seen
+            self._frames_seen += 1
+
+            speech = level >= self._gate()
+
+            # Tracking the noise floor: falling at once, rising slowly up to its cap
+            floor_level = max(level, self.min_noise_floor)
+            if floor_level < self.noise_floor:
+                self.noise_floor = floor_level
+            else:
+                self.noise_floor = min(
+                    self.max_noise_floor,
+                    self.noise_floor
+                    + self._noise_rise * (floor_level - self.noise_floor),
+                )
+
+            if speech:
+                if self._start is None:
+                    self._start = index
+                self._end = index + 1
+            if self._start is not None:
+                self._levels.append(level)
+
+            if (
+                not speech
+                and self._start is not None
+                and index + 1 - self._end >= self._hangover_frames
+            ):
+                self._close(segments)
+
+            # Cutting utterances that run past the length limit
+            if (
+                self._start is not None
+                and self._max_frames
+                and self._end - self._start >= self._max_frames
+            ):
+                self._close(segments)
+        return segments
+
+    def _slice(self, start: int, end: int) -> bytes:
+        """Get the audio of a frame range from the buffer."""
+        first = (start - self._audio_start) * self._frame_bytes
+        last = (end - self._audio_start) * self._frame_bytes
+        return bytes(self._audio[first:last])
+
+    def feed(self, pcm: bytes) -> List[bytes]:
+        """
+        Add audio and collect the utterances it completes.
+
+        Args:
+            pcm (bytes): Interleaved little-endian samples, split at any byte
+
+        Returns:
+            List[bytes]: Each utterance that ended, trimmed to its speech
+        """
+        # Holding back a partial frame until the rest of it arrives
+        data = self._pending + pcm
+        usable = len(data) - len(data) % self._frame_bytes
+        data, self._pending = data[:usable], data[usable:]
+        if not data:
+            return []
+
+        self._audio += data
+        levels = frame_levels(
+            np.frombuffer(data, dtype=self._dtype),
+            self._frame_values,
+            self._max_amplitude,
+        )
+        utterances = [self._slice(start, end) for start, end in self._advance(levels)]
+
+        # Dropping audio that no utterance can need any more
+        keep = self._start if self._start is not None else self._frames_seen
+        del self._audio[: (keep - self._audio_start) * self._frame_bytes]
+        self._audio_start = keep
+        return utterances
+
+    def speech(self) -> bytes:
+        """Get the current utterance so far, trimmed to its last speech frame."""
+        if self._start is None:
+            return b""
+        return self._slice(self._start, self._end)
+
+    def flush(self) -> Optional[bytes]:
+        """
+        End the stream, returning the utterance in progress if there is one.
+
+        Returns:
+            Optional[bytes]: The trimmed utterance, or None if there was no speech
+        """
+        segment = self._confirm() if self._start is not None else None
+        utterance = self._slice(*segment) if segment is not None else None
+        self._start = None
+        self._levels = []
+        self._audio = bytearray()
+        self._audio_start = self._frames_seen
+        self._pending = b""
+        return utterance
+
+
+def speech_segments(samples, sample_rate, channels=1, **options):
+    """
+    Find the utterances in a complete clip.
+
+    Args:
+        samples (np.ndarray): Interleaved integer samples
+        sample_rate (int): Sample rate in Hz
+        channels (int): Number of interleaved channels
+        **options: Detector settings, see VoiceActivityDetector
+
+    Returns:
+        List[Tuple[int, int]]: Start and end of each utterance in sample frames
+    """
+    detector = VoiceActivityDetector(
+        sample_rate, samples.dtype.itemsize, channels, **options
+    )
+    segments = detector._advance(
+        frame_levels(samples, detector._frame_values, detector._max_amplitude)
+    )
+    if detector.in_speech:
+        segment = detector._confirm()
+        if segment is not None:
+            segments.append(segment)
+
+    frames_per_chunk = detector._frame_values // channels
+    return [
+        (start * frames_per_chunk, end * frames_per_chunk) for start, end in segments
+    ]
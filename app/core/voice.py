@@ -1,19 +1,52 @@
 """Voice processing utilities for the voice bot."""
 
+import audioop
 import io
-import os
-import tempfile
+import re
 import numpy as np
 from pydub import AudioSegment
 import speech_recognition as sr
-from gtts import gTTS
 
+from app.core.cache import AudioCache
 from app.core.config import settings
+from app.core.dsp import (
+    SAMPLE_DTYPES,
+    normalize_and_segment_shared,
+    silence_bounds,
+)
+from app.core.stt import get_stt_backend
+from app.core.tts import get_tts_backend
+from app.core.vad import speech_segments
+
+# A sentence ends at terminal punctuation (optionally closed by a quote or
+# bracket) followed by whitespace, so decimals like "3.5" never split
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])[\"')\]]?\s+")
+
+# Reply audio formats: content type and pydub export arguments
+AUDIO_FORMATS = {
+    "wav": ("audio/wav", {"format": "wav"}),
+    "mp3": ("audio/mpeg", {"format": "mp3"}),
+    "opus": ("audio/ogg; codecs=opus", {"format": "ogg", "codec": "libopus"}),
+}
+
+# Accept header media types of each reply format
+ACCEPT_TYPES = {
+    "audio/wav": "wav",
+    "audio/wave": "wav",
+    "audio/x-wav": "wav",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/ogg": "opus",
+    "audio/opus": "opus",
+}
+
+# Silence left between utterances joined for recognition, so words stay apart
+UTTERANCE_GAP_MS = 100
 
 
 def speech_to_text(audio_data):
     """
-    Convert speech to text using speech recognition.
+    Convert speech to text with the configured STT backend.
 
     Args:
         audio_data (bytes): Raw audio data
@@ -21,54 +54,104 @@ def speech_to_text(audio_data):
     Returns:
         str: Transcribed text
     """
-    recognizer = sr.Recognizer()
-
-    # Creating a temporary file to store the audio
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
-        temp_audio.write(audio_data)
-        temp_audio_path = temp_audio.name
+    backend = get_stt_backend()
 
     try:
-        # Converting the audio to AudioData for the recognizer
-        with sr.AudioFile(temp_audio_path) as source:
-            audio = recognizer.record(source)
+        # Reading the WAV data straight from memory for the recognizer
+        with sr.AudioFile(io.BytesIO(audio_data)) as source:
+            audio = backend.recognizer.record(source)
 
-        # Using Google's speech recognition API
-        text = recognizer.recognize_google(audio, language=settings.STT_LANGUAGE)
-        return text
+        return backend.recognize(audio)
     except sr.UnknownValueError:
         return "Sorry, I could not understand the audio."
     except sr.RequestError as e:
         return f"Speech recognition service error: {e}"
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(temp_audio_path):
-            os.remove(temp_audio_path)
 
 
-def text_to_speech(text):
+def tts_cache_key(text, audio_format="wav"):
+    """
+    Build the content address of the speech synthesized for a text.
+
+    Args:
+        text (str): Text to convert to speech
+        audio_format (str): Output audio format
+
+    Returns:
+        str: Cache key covering the text, engine, voice settings and format
+    """
+    return AudioCache.key(
+        text,
+        settings.TTS_BACKEND,
+        settings.TTS_LANGUAGE,
+        settings.TTS_SPEED,
+        audio_format,
+    )
+
+
+def negotiate_audio_format(accept=None, requested=None):
     """
-    Convert text to speech using gTTS.
+    Pick the audio format of a spoken reply.
+
+    Args:
+        accept (str, optional): The Accept header of the request
+        requested (str, optional): A format named explicitly, which wins
+
+    Returns:
+        str: A key of AUDIO_FORMATS, WAV unless the client prefers another
+
+    Raises:
+        ValueError: If the requested format is not supported
+    """
+    if requested:
+        requested = requested.lower()
+        if requested not in AUDIO_FORMATS:
+            raise ValueError(
+                f"Unsupported audio format {requested!r}, "
+                f"expected one of {', '.join(AUDIO_FORMATS)}"
+            )
+        return requested
+
+    # Taking the supported type with the highest quality value, first listed on ties
+    best, best_quality = "wav", 0.0
+    for item in (accept or "").split(","):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        audio_format = ACCEPT_TYPES.get(media_type.lower())
+        if audio_format is None:
+            continue
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > best_quality:
+            best, best_quality = audio_format, quality
+    return best
+
+
+def text_to_speech(text, audio_format="wav"):
+    """
+    Convert text to speech with the configured TTS backend.
 
     Args:
         text (str): Text to convert to speech
+        audio_format (str): A key of AUDIO_FORMATS
 
     Returns:
         bytes: Audio data as bytes
     """
-    # Creating a gTTS object with the text and desired language
-    tts = gTTS(text=text, lang=settings.TTS_LANGUAGE, slow=False)
+    backend = get_tts_backend()
+    resample = settings.TTS_SPEED != 1.0 and not backend.native_speed
 
-    # Save to a BytesIO object
-    mp3_fp = io.BytesIO()
-    tts.write_to_fp(mp3_fp)
-    mp3_fp.seek(0)
+    # Passing the engine's own encoding through, skipping a decode and encode
+    if audio_format == backend.native_format and not resample:
+        return backend.render(text)
 
-    # Converting to WAV format for better compatibility
-    audio = AudioSegment.from_mp3(mp3_fp)
+    audio = backend.synthesize(text)
 
-    # Adjusting the speed if needed
-    if settings.TTS_SPEED != 1.0:
+    # Adjusting the speed if the engine did not
+    if resample:
         audio = audio._spawn(
             audio.raw_data,
             overrides={"frame_rate": int(audio.frame_rate * settings.TTS_SPEED)},
@@ -76,7 +159,7 @@ def text_to_speech(text):
 
     # Export to bytes
     buffer = io.BytesIO()
-    audio.export(buffer, format="wav")
+    audio.export(buffer, **AUDIO_FORMATS[audio_format][1])
 
     return buffer.getvalue()
 
@@ -85,39 +168,77 @@ def preprocess_audio(audio_data):
     """
     Preprocess audio data for better recognition.
 
+    The volume is normalized and only the utterances found by the voice
+    activity detector are kept, so silence before, between and after them
+    never reaches speech recognition.
+
     Args:
         audio_data (bytes): Raw audio data
 
     Returns:
         bytes: Processed audio data
     """
-    # Converting bytes to audio segment
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-        temp_file.write(audio_data)
-        temp_path = temp_file.name
-
-    try:
-        audio = AudioSegment.from_file(temp_path, format="wav")
+    # Converting bytes to audio segment without touching the disk
+    audio = AudioSegment.from_file(io.BytesIO(audio_data), format="wav")
 
+    if settings.DSP_MODE == "process" and audio.sample_width in SAMPLE_DTYPES:
+        # Normalizing and finding the speech in a worker process
+        raw_data, segments = normalize_and_segment_shared(
+            audio.raw_data,
+            audio.sample_width,
+            audio.frame_rate,
+            audio.channels,
+            workers=settings.DSP_PROCESSES,
+        )
+        audio = audio._spawn(raw_data)
+    else:
         # Normalizing the volume
         audio = audio.normalize()
 
-        # Removing the silence
-        audio = detect_leading_silence(audio)
+        # Finding the speech
+        samples, _ = _audio_samples(audio)
+        segments = speech_segments(samples, audio.frame_rate, audio.channels)
 
-        # Export to bytes
-        buffer = io.BytesIO()
-        audio.export(buffer, format="wav")
-        return buffer.getvalue()
-    finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+    # Keeping only the speech
+    audio = join_segments(audio, segments)
+
+    # Export to bytes
+    buffer = io.BytesIO()
+    audio.export(buffer, format="wav")
+    return buffer.getvalue()
+
+
+def join_segments(audio, segments, gap_ms=UTTERANCE_GAP_MS):
+    """
+    Join the utterances of a clip with a short silence between them.
+
+    Args:
+        audio (AudioSegment): The clip
+        segments (list): Start and end of each utterance in sample frames
+        gap_ms (int): Silence between utterances in milliseconds
+
+    Returns:
+        AudioSegment: The utterances alone
+    """
+    frame_width = audio.frame_width
+    gap = b"\0" * (int(audio.frame_rate * gap_ms / 1000) * frame_width)
+    return audio._spawn(
+        gap.join(
+            audio.raw_data[start * frame_width : end * frame_width]
+            for start, end in segments
+        )
+    )
 
 
 def detect_leading_silence(audio, silence_threshold=-50.0, chunk_size=10):
     """
     Detect and remove leading and trailing silence from audio.
 
+    Leading chunks are laid out from the start of the audio and trailing
+    chunks from its end, exactly as a chunk-by-chunk scan would walk them,
+    but the loudness of every chunk is computed in one vectorized pass over
+    the raw samples.
+
     Args:
         audio (AudioSegment): Audio to process
         silence_threshold (float): Silence threshold in dB
@@ -126,22 +247,86 @@ def detect_leading_silence(audio, silence_threshold=-50.0, chunk_size=10):
     Returns:
         AudioSegment: Audio without silence
     """
-    trim_ms = 0
-
-    # Detecting leading silence
-    while (
-        trim_ms < len(audio)
-        and audio[trim_ms : trim_ms + chunk_size].dBFS < silence_threshold
-    ):
-        trim_ms += chunk_size
-
-    # Detect trailing silence
-    end_trim_ms = len(audio)
-    while (
-        end_trim_ms > 0
-        and audio[end_trim_ms - chunk_size : end_trim_ms].dBFS < silence_threshold
-    ):
-        end_trim_ms -= chunk_size
+    if len(audio) == 0:
+        return audio
+
+    samples, max_amplitude = _audio_samples(audio)
+    bounds = silence_bounds(
+        samples,
+        audio.frame_rate,
+        audio.channels,
+        len(audio),
+        max_amplitude,
+        silence_threshold,
+        chunk_size,
+    )
+    if bounds is None:
+        return audio[0:0]
 
     # Returning the trimmed audio
+    trim_ms, end_trim_ms = bounds
     return audio[trim_ms:end_trim_ms]
+
+
+def _audio_samples(audio):
+    """
+    View the raw data of an audio segment as a NumPy sample array.
+
+    Args:
+        audio (AudioSegment): Audio to read
+
+    Returns:
+        tuple: Interleaved samples and the maximum possible amplitude
+    """
+    data = audio.raw_data
+    sample_width = audio.sample_width
+
+    # NumPy has no 24-bit integer type, so widen to 32 bits first
+    if sample_width == 3:
+        data = audioop.lin2lin(data, 3, 4)
+        sample_width = 4
+
+    samples = np.frombuffer(data, dtype=SAMPLE_DTYPES[sample_width])
+    return samples, float(2 ** (sample_width * 8 - 1))
+
+
+def pcm_to_wav(pcm, sample_rate, sample_width=2, channels=1):
+    """
+    Wrap raw PCM samples in a WAV container.
+
+    Args:
+        pcm (bytes): Interleaved little-endian samples
+        sample_rate (int): Sample rate in Hz
+        sample_width (int): Sample width in bytes
+        channels (int): Number of interleaved channels
+
+    Returns:
+        bytes: WAV data
+    """
+    audio = AudioSegment(
+        pcm, frame_rate=sample_rate, sample_width=sample_width, channels=channels
+    )
+    buffer = io.BytesIO()
+    audio.export(buffer, format="wav")
+    return buffer.getvalue()
+
+
+def split_sentences(text):
+    """
+    Split complete sentences off the front of a growing text buffer.
+
+    Args:
+        text (str): Text received so far
+
+    Returns:
+        tuple: List of complete sentences and the unfinished remainder
+    """
+    sentences = []
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        sentence = text[start : match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+
+    return sentences, text[start:]
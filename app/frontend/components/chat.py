@@ -37,6 +37,50 @@ def display_chat():
             if message["role"] == "assistant":
                 text_to_speech_button(message["content"], key=f"tts_{i}")
 
+    # Showing the server-side timings of the last request in debug mode
+    if settings.DEBUG and st.session_state.get("last_timings"):
+        debug_timings(st.session_state.last_timings)
+
+
+def parse_server_timing(header):
+    """
+    Parse a Server-Timing header into stage durations.
+
+    Args:
+        header (str): The header value, e.g. "stt;dur=120.5, llm;dur=830.0"
+
+    Returns:
+        dict: Stage names mapped to durations in milliseconds
+    """
+    timings = {}
+    for metric in header.split(","):
+        name, _, params = metric.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+def debug_timings(timings):
+    """
+    Display the stage timings of a request in a debug expander.
+
+    Args:
+        timings (dict): Trace ID and stage durations of the request
+    """
+    with st.expander("Debug: request timings"):
+        st.caption(f"Trace ID: {timings['trace_id']}")
+        st.table(
+            [
+                {"stage": stage, "ms": duration}
+                for stage, duration in timings["stages"].items()
+            ]
+        )
+
 
 def add_message(role, content):
     """
@@ -88,6 +132,12 @@ def send_text_to_api(
         # Checking for errors
         response.raise_for_status()
 
+        # Keeping the server-side stage timings for the debug view
+        st.session_state.last_timings = {
+            "trace_id": response.headers.get("X-Trace-ID"),
+            "stages": parse_server_timing(response.headers.get("Server-Timing", "")),
+        }
+
         # Parsing the response
         result = response.json()
 
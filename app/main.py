@@ -1,11 +1,33 @@
 """Main entry point for the FastAPI application."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
-from app.api.endpoints import router as api_router
+from app.api.endpoints import router as api_router, chat_service, voice_service
+from app.api.middleware import MetricsMiddleware, TracingMiddleware
 from app.core.config import settings
+from app.core.dsp import shutdown_process_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open provider connections at startup and release resources at shutdown."""
+    # Building pooled provider clients and warming up their connections
+    await chat_service.start()
+
+    # Loading the speech models before the first request needs them
+    await voice_service.start()
+
+    yield
+
+    # Closing connections and stopping background workers
+    await chat_service.close()
+    voice_service.close()
+    shutdown_process_pool()
+
 
 # Creating FastAPI app
 app = FastAPI(
@@ -14,6 +36,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    lifespan=lifespan,
 )
 
 # Adding CORS middleware
@@ -28,6 +51,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Adding request metrics and tracing middleware
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 # Including API router
 app.include_router(api_router, prefix="/api")
 
@@ -1,14 +1,30 @@
 """Service for handling ChatGPT interactions."""
 
 import asyncio
+import hashlib
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
+import httpx
 import openai
 from openai import AsyncOpenAI
 from groq import AsyncGroq  # You'll need to install the groq package
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.conversations import ConversationStore
+from app.core.http import build_http_client, warm_up
 from app.core.responses import get_response_context
+from app.core.singleflight import SingleFlight
+from app.services.providers import (
+    ChatProvider,
+    CircuitBreaker,
+    OpenAICompatibleProvider,
+    ProviderRouter,
+)
+
+# Generation parameters shared by every provider
+MAX_TOKENS = 150
+TEMPERATURE = 0.7
 
 
 class ChatService:
@@ -16,33 +32,198 @@ class ChatService:
 
     def __init__(self):
         """Initialize the ChatService."""
-        # Initialize OpenAI client
-        self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        # Initialize the OpenAI and Groq providers
+        self.providers = {
+            "openai": OpenAICompatibleProvider(
+                "openai", self._openai_client(), settings.OPENAI_MODEL
+            ),
+            "groq": OpenAICompatibleProvider(
+                "groq", self._groq_client(), settings.GROQ_MODEL
+            ),
+        }
+
+        # Pooled HTTP clients, built by start()
+        self.http_clients: Dict[str, httpx.AsyncClient] = {}
+
+        # Track each provider's health, shared by both routers
+        self.breakers = {
+            name: CircuitBreaker(
+                error_threshold=settings.BREAKER_ERROR_RATE,
+                latency_threshold=settings.BREAKER_LATENCY,
+                min_requests=settings.BREAKER_MIN_REQUESTS,
+                open_seconds=settings.BREAKER_OPEN_SECONDS,
+                alpha=settings.BREAKER_EWMA_ALPHA,
+            )
+            for name in self.providers
+        }
+
+        # Route each endpoint to its provider, hedging slow requests to the other
+        # and failing over to it while the provider's circuit is open
+        self.routers = {
+            "openai": self._router("openai", "groq"),
+            "groq": self._router("groq", "openai"),
+        }
+
+        # Store conversations by ID, evicting idle and least recently used ones
+        self.conversations = ConversationStore(
+            max_conversations=settings.CONVERSATION_MAX_COUNT,
+            max_bytes=settings.CONVERSATION_MAX_BYTES,
+            idle_ttl=settings.CONVERSATION_IDLE_TTL,
+            sweep_interval=settings.CONVERSATION_SWEEP_INTERVAL,
+        )
 
-        # Initialize Groq client
-        self.groq_client = AsyncGroq(api_key=settings.GROQ_API_KEY)
+        # Cache first-turn responses, which do not depend on any history
+        self.response_cache = TTLCache(
+            maxsize=settings.RESPONSE_CACHE_SIZE, ttl=settings.RESPONSE_CACHE_TTL
+        )
 
-        # Store conversations by ID
-        self.conversations: Dict[str, List[Dict[str, str]]] = {}
+        # Share in-flight provider calls between identical first turns
+        self.in_flight = SingleFlight()
+
+    @property
+    def openai_client(self):
+        """The OpenAI client."""
+        return self.providers["openai"].client
+
+    @openai_client.setter
+    def openai_client(self, client) -> None:
+        self.providers["openai"].client = client
+
+    @property
+    def groq_client(self):
+        """The Groq client."""
+        return self.providers["groq"].client
+
+    @groq_client.setter
+    def groq_client(self, client) -> None:
+        self.providers["groq"].client = client
+
+    def _openai_client(
+        self, http_client: Optional[httpx.AsyncClient] = None
+    ) -> AsyncOpenAI:
+        """Build an OpenAI client, on the SDK's own transport by default."""
+        return AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            http_client=http_client,
+        )
 
-    async def generate_response(self, user_message: str, conversation_id: str) -> str:
+    def _groq_client(
+        self, http_client: Optional[httpx.AsyncClient] = None
+    ) -> AsyncGroq:
+        """Build a Groq client, on the SDK's own transport by default."""
+        return AsyncGroq(
+            api_key=settings.GROQ_API_KEY,
+            base_url=settings.GROQ_BASE_URL or None,
+            http_client=http_client,
+        )
+
+    async def start(self) -> None:
         """
-        Generate a response using ChatGPT.
+        Move the provider clients onto pooled HTTP clients and open connections.
+
+        Called once at application startup, so the first requests do not pay
+        for DNS, TCP and TLS setup.
+        """
+        self.http_clients = {
+            "openai": build_http_client(),
+            "groq": build_http_client(),
+        }
+        self.openai_client = self._openai_client(self.http_clients["openai"])
+        self.groq_client = self._groq_client(self.http_clients["groq"])
+
+        if settings.HTTP_WARM_UP:
+            # Opening connections to every provider at once
+            await asyncio.gather(
+                *[
+                    warm_up(http_client, str(self.providers[name].client.base_url))
+                    for name, http_client in self.http_clients.items()
+                ]
+            )
+
+    async def close(self) -> None:
+        """Close the pooled HTTP clients and stop the conversation sweeper."""
+        for http_client in self.http_clients.values():
+            await http_client.aclose()
+        self.http_clients = {}
+        self.conversations.stop_sweeper()
+
+    def _router(self, primary: str, secondary: str) -> ProviderRouter:
+        """
+        Build the router for a provider.
 
         Args:
-            user_message (str): The user's message
-            conversation_id (str): The conversation ID
+            primary (str): The provider every request goes to first
+            secondary (str): The provider slow requests are hedged to
 
         Returns:
-            str: The generated response
+            ProviderRouter: The router
         """
-        # Initialize conversation if it doesn't exist
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = []
+        return ProviderRouter(
+            self.providers[primary],
+            self.providers[secondary],
+            hedge=settings.HEDGE_ENABLED,
+            hedge_quantile=settings.HEDGE_QUANTILE,
+            min_hedge_delay=settings.HEDGE_MIN_DELAY,
+            initial_hedge_delay=settings.HEDGE_INITIAL_DELAY,
+            breakers=self.breakers,
+        )
+
+    def _response_cache_key(
+        self, conversation_key: str, provider: str, model: str
+    ) -> Optional[tuple]:
+        """
+        Build the response cache key for a conversation's first turn.
+
+        Args:
+            conversation_key (str): The key the conversation is stored under
+            provider (str): The provider name
+            model (str): The model name
 
+        Returns:
+            Optional[tuple]: The cache key, or None if the conversation has prior history
+        """
+        messages = self.conversations[conversation_key]
+        if len(messages) != 2:
+            return None
+
+        system_prompt, user_message = messages[0]["content"], messages[1]["content"]
+        question = " ".join(user_message.lower().split()).rstrip("?!. ")
+        persona = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        return (provider, model, MAX_TOKENS, TEMPERATURE, persona, question)
+
+    def _cache_response(
+        self, cache_key: tuple, provider: ChatProvider, response_text: str
+    ) -> None:
+        """
+        Cache a first-turn response under the provider that actually answered it.
+
+        A hedge or failover may have been answered by another provider than
+        the one the cache key was built for, and its answer must not be
+        served later as the first provider's.
+
+        Args:
+            cache_key (tuple): The response cache key the request was made with
+            provider (ChatProvider): The provider that answered
+            response_text (str): The response text
+        """
+        self.response_cache.set(
+            (provider.name, provider.model) + cache_key[2:], response_text
+        )
+
+    def _add_user_message(self, conversation_key: str, user_message: str) -> None:
+        """
+        Append a user message, starting the conversation with a system prompt if needed.
+
+        Args:
+            conversation_key (str): The key the conversation is stored under
+            user_message (str): The user's message
+        """
+        # Initialize conversation if it doesn't exist
+        if conversation_key not in self.conversations:
             # Add system prompt with personal context
             personal_context = get_response_context(user_message)
-            self.conversations[conversation_id].append(
+            self.conversations[conversation_key] = [
                 {
                     "role": "system",
                     "content": (
@@ -53,40 +234,194 @@ class ChatService:
                         f"Keep responses concise and conversational, around 2-3 sentences."
                     ),
                 }
-            )
+            ]
 
-        # Add the user message to the conversation
-        self.conversations[conversation_id].append(
-            {"role": "user", "content": user_message}
+        self.conversations.append(
+            conversation_key, {"role": "user", "content": user_message}
         )
 
-        try:
-            # Generate a response using ChatGPT
-            response = await self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=self.conversations[conversation_id],
-                max_tokens=150,
-                temperature=0.7,
-            )
+    def _prompt_budget(self, model: str) -> int:
+        """
+        Get the prompt token budget for a model.
 
-            # Extract the response text
-            response_text = response.choices[0].message.content.strip()
+        Args:
+            model (str): The model name
 
-            # Add the assistant's response to the conversation
-            self.conversations[conversation_id].append(
-                {"role": "assistant", "content": response_text}
-            )
+        Returns:
+            int: Maximum prompt tokens
+        """
+        return settings.PROMPT_TOKEN_BUDGETS.get(model, settings.PROMPT_TOKEN_BUDGET)
+
+    def _prompt_messages(
+        self, conversation_key: str, model: str
+    ) -> List[Dict[str, str]]:
+        """
+        Get the messages to send, windowed to the model's prompt token budget.
+
+        Args:
+            conversation_key (str): The key the conversation is stored under
+            model (str): The model name
+
+        Returns:
+            List[Dict[str, str]]: The system message and the newest messages that fit
+        """
+        return self.conversations.window(conversation_key, self._prompt_budget(model))
+
+    def _add_assistant_message(
+        self, conversation_key: str, response_text: str, model: str
+    ) -> None:
+        """
+        Append an assistant message and trim the conversation history.
+
+        Args:
+            conversation_key (str): The key the conversation is stored under
+            response_text (str): The assistant's response
+            model (str): The model the conversation is sent to
+        """
+        # The conversation may have been evicted while the response was generated
+        if conversation_key not in self.conversations:
+            return
+
+        self.conversations.append(
+            conversation_key, {"role": "assistant", "content": response_text}
+        )
 
-            # Trim conversation history if it gets too long
-            if len(self.conversations[conversation_id]) > 10:
-                # Keep system message and last 9 messages
-                system_message = self.conversations[conversation_id][0]
-                self.conversations[conversation_id] = [
-                    system_message
-                ] + self.conversations[conversation_id][-9:]
+        # Dropping history that no longer fits the prompt token budget
+        self.conversations.trim(conversation_key, self._prompt_budget(model))
 
+    async def _complete(
+        self,
+        router: ProviderRouter,
+        conversation_key: str,
+        cache_key: Optional[tuple],
+    ) -> str:
+        """
+        Get a chat completion, coalescing identical first turns.
+
+        Concurrent first turns with the same cache key share one provider
+        call, and its result is cached for later ones.
+
+        Args:
+            router (ProviderRouter): The router to send the request through
+            conversation_key (str): The key the conversation is stored under
+            cache_key (tuple, optional): The response cache key for first turns
+
+        Returns:
+            str: The response text
+        """
+        messages = self._prompt_messages(conversation_key, router.primary.model)
+
+        async def call() -> str:
+            provider, response_text = await router.complete_with_provider(
+                messages, MAX_TOKENS, TEMPERATURE
+            )
+            if cache_key is not None:
+                self._cache_response(cache_key, provider, response_text)
             return response_text
 
+        if cache_key is None:
+            return await call()
+        return await self.in_flight.do(cache_key, call)
+
+    async def _generate(
+        self, provider: str, conversation_key: str, user_message: str
+    ) -> str:
+        """
+        Generate a response through a provider's router.
+
+        Args:
+            provider (str): The provider to route to first
+            conversation_key (str): The key the conversation is stored under
+            user_message (str): The user's message
+
+        Returns:
+            str: The generated response
+        """
+        router = self.routers[provider]
+        model = router.primary.model
+
+        # Add the user message to the conversation
+        self._add_user_message(conversation_key, user_message)
+
+        # Answering first turns from the cache when possible
+        cache_key = self._response_cache_key(conversation_key, provider, model)
+        if cache_key is not None:
+            cached_text = self.response_cache.get(cache_key)
+            if cached_text is not None:
+                self._add_assistant_message(conversation_key, cached_text, model)
+                return cached_text
+
+        response_text = await self._complete(router, conversation_key, cache_key)
+
+        # Add the assistant's response to the conversation
+        self._add_assistant_message(conversation_key, response_text, model)
+
+        return response_text
+
+    async def _stream(
+        self, provider: str, conversation_key: str, user_message: str
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response through a provider's router and record it once it finishes.
+
+        Args:
+            provider (str): The provider to route to first
+            conversation_key (str): The key the conversation is stored under
+            user_message (str): The user's message
+
+        Yields:
+            str: Response text deltas as they arrive from the provider
+        """
+        router = self.routers[provider]
+        model = router.primary.model
+
+        # Add the user message to the conversation
+        self._add_user_message(conversation_key, user_message)
+
+        # Answering first turns from the cache when possible
+        cache_key = self._response_cache_key(conversation_key, provider, model)
+        if cache_key is not None:
+            cached_text = self.response_cache.get(cache_key)
+            if cached_text is not None:
+                self._add_assistant_message(conversation_key, cached_text, model)
+                yield cached_text
+                return
+
+        # Forwarding the deltas while collecting the full response
+        parts: List[str] = []
+        answered, deltas = await router.stream_with_provider(
+            self._prompt_messages(conversation_key, model), MAX_TOKENS, TEMPERATURE
+        )
+        async for delta in deltas:
+            if not parts:
+                delta = delta.lstrip()
+                if not delta:
+                    continue
+            parts.append(delta)
+            yield delta
+
+        # Add the assistant's response to the conversation
+        response_text = "".join(parts).strip()
+        if response_text:
+            self._add_assistant_message(conversation_key, response_text, model)
+            if cache_key is not None:
+                self._cache_response(cache_key, answered, response_text)
+
+    async def generate_response(self, user_message: str, conversation_id: str) -> str:
+        """
+        Generate a response using ChatGPT.
+
+        Args:
+            user_message (str): The user's message
+            conversation_id (str): The conversation ID
+
+        Returns:
+            str: The generated response
+        """
+        try:
+            # Generate a response using ChatGPT
+            return await self._generate("openai", conversation_id, user_message)
+
         except openai.APIError as e:
             # Handle API errors
             error_message = f"OpenAI API Error: {str(e)}"
@@ -115,62 +450,74 @@ class ChatService:
         # Create a key for storing Groq conversations separate from OpenAI
         groq_conv_id = f"groq_{conversation_id}"
 
-        # Initialize conversation if it doesn't exist
-        if groq_conv_id not in self.conversations:
-            self.conversations[groq_conv_id] = []
+        try:
+            # Generate a response using Groq
+            return await self._generate("groq", groq_conv_id, user_message)
 
-            # Add system prompt with personal context
-            personal_context = get_response_context(user_message)
-            self.conversations[groq_conv_id].append(
-                {
-                    "role": "system",
-                    "content": (
-                        f"You are a personal voice assistant that responds as if you were the person "
-                        f"being asked about. Use the following context to guide your responses:\n\n"
-                        f"{personal_context}\n\n"
-                        f"Always respond in first person as if you are the person being asked about. "
-                        f"Keep responses concise and conversational, around 2-3 sentences."
-                    ),
-                }
-            )
+        except Exception as e:
+            # Handle API errors
+            error_message = f"Groq API Error: {str(e)}"
+            print(error_message)
+            return "I'm sorry, I'm having trouble responding right now. Please try again later."
 
-        # Add the user message to the conversation
-        self.conversations[groq_conv_id].append(
-            {"role": "user", "content": user_message}
-        )
+    async def stream_response(
+        self, user_message: str, conversation_id: str
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response using ChatGPT, token by token.
+
+        Args:
+            user_message (str): The user's message
+            conversation_id (str): The conversation ID
 
+        Yields:
+            str: Response text deltas as they arrive
+        """
+        emitted = False
         try:
-            # Generate a response using Groq
-            response = await self.groq_client.chat.completions.create(
-                model=settings.GROQ_MODEL,  # You'll need to add this to your settings
-                messages=self.conversations[groq_conv_id],
-                max_tokens=150,
-                temperature=0.7,
-            )
+            async for delta in self._stream("openai", conversation_id, user_message):
+                emitted = True
+                yield delta
 
-            # Extract the response text
-            response_text = response.choices[0].message.content.strip()
+        except openai.APIError as e:
+            # Handle API errors
+            print(f"OpenAI API Error: {str(e)}")
+            if not emitted:
+                yield "I'm sorry, I'm having trouble responding right now. Please try again later."
 
-            # Add the assistant's response to the conversation
-            self.conversations[groq_conv_id].append(
-                {"role": "assistant", "content": response_text}
-            )
+        except Exception as e:
+            # Handle other errors
+            print(f"Error generating response: {str(e)}")
+            if not emitted:
+                yield "I encountered an unexpected error. Please try again."
 
-            # Trim conversation history if it gets too long
-            if len(self.conversations[groq_conv_id]) > 10:
-                # Keep system message and last 9 messages
-                system_message = self.conversations[groq_conv_id][0]
-                self.conversations[groq_conv_id] = [
-                    system_message
-                ] + self.conversations[groq_conv_id][-9:]
+    async def stream_response_groq(
+        self, user_message: str, conversation_id: str
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response using Groq, token by token.
 
-            return response_text
+        Args:
+            user_message (str): The user's message
+            conversation_id (str): The conversation ID
+
+        Yields:
+            str: Response text deltas as they arrive
+        """
+        # Create a key for storing Groq conversations separate from OpenAI
+        groq_conv_id = f"groq_{conversation_id}"
+
+        emitted = False
+        try:
+            async for delta in self._stream("groq", groq_conv_id, user_message):
+                emitted = True
+                yield delta
 
         except Exception as e:
             # Handle API errors
-            error_message = f"Groq API Error: {str(e)}"
-            print(error_message)
-            return "I'm sorry, I'm having trouble responding right now. Please try again later."
+            print(f"Groq API Error: {str(e)}")
+            if not emitted:
+                yield "I'm sorry, I'm having trouble responding right now. Please try again later."
 
     def get_conversation_history(self, conversation_id: str) -> List[Dict[str, str]]:
         """
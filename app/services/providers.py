@@ -0,0 +1,766 @@
+"""Chat providers and a router that hedges slow requests across them."""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from app.core.metrics import LLM_FIRST_TOKEN_SECONDS, LLM_IN_FLIGHT, LLM_SECONDS
+from app.core.tracing import record_stage
+
+T = TypeVar("T")
+
+
+class ChatProvider:
+    """A chat completion backend the router can send requests to."""
+
+    def __init__(self, name: str, model: str):
+        """
+        Initialize the provider.
+
+        Args:
+            name (str): The provider name
+            model (str): The model requests are sent to
+        """
+        self.name = name
+        self.model = model
+
+    async def complete(
+        self, messages: List[Dict[str, str]], max_tokens: int, temperature: float
+    ) -> str:
+        """
+        Get a full chat completion.
+
+        Args:
+            messages (List[Dict[str, str]]): The prompt messages
+            max_tokens (int): Maximum tokens to generate
+            temperature (float): Sampling temperature
+
+        Returns:
+            str: The response text
+        """
+        raise NotImplementedError
+
+    def stream(
+        self, messages: List[Dict[str, str]], max_tokens: int, temperature: float
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion.
+
+        Args:
+            messages (List[Dict[str, str]]): The prompt messages
+            max_tokens (int): Maximum tokens to generate
+            temperature (float): Sampling temperature
+
+        Returns:
+            AsyncIterator[str]: Response text deltas as they arrive
+        """
+        raise NotImplementedError
+
+
+class OpenAICompatibleProvider(ChatProvider):
+    """A provider backed by an OpenAI-compatible async client (OpenAI, Groq)."""
+
+    def __init__(self, name: str, client: Any, model: str):
+        """
+        Initialize the provider.
+
+        Args:
+            name (str): The provider name
+            client: The async client exposing chat.completions.create
+            model (str): The model requests are sent to
+        """
+        super().__init__(name, model)
+        self.client = client
+
+    async def complete(
+        self, messages: List[Dict[str, str]], max_tokens: int, temperature: float
+    ) -> str:
+        """Get a full chat completion from the client."""
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        return response.choices[0].message.content.strip()
+
+    async def stream(
+        self, messages: List[Dict[str, str]], max_tokens: int, temperature: float
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion from the client."""
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+class FakeProvider(ChatProvider):
+    """
+    A local provider with configurable latency, for offline tests and benchmarks.
+
+    Latency is drawn per request from `latency`, which is either a fixed
+    number of seconds or a callable returning one.
+    """
+
+    def __init__(
+        self,
+        name: str = "fake",
+        model: str = "fake-model",
+        latency: Any = 0.0,
+        reply: str = "This is a test response.",
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the fake provider.
+
+        Args:
+            name (str): The provider name
+            model (str): The model name to report
+            latency: Seconds per request, or a callable returning them
+            reply (str): The response text
+            error_rate (float): Fraction of requests that fail
+            seed (int, optional): Seed for the error draws
+        """
+        super().__init__(name, model)
+        self.latency = latency if callable(latency) else (lambda: latency)
+        self.reply = reply
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+        # Counters
+        self.calls = 0
+        self.completed = 0
+        self.cancelled = 0
+
+    async def _wait(self) -> None:
+        """Sleep for one request's latency, failing some requests."""
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency())
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.random.random() < self.error_rate:
+            raise RuntimeError(f"{self.name} request failed")
+
+    async def complete(
+        self, messages: List[Dict[str, str]], max_tokens: int, temperature: float
+    ) -> str:
+        """Return the reply after the drawn latency."""
+        await self._wait()
+        self.completed += 1
+        return self.reply
+
+    async def stream(
+        self, messages: List[Dict[str, str]], max_tokens: int, temperature: float
+    ) -> AsyncIterator[str]:
+        """Stream the reply word by word after the drawn latency."""
+        await self._wait()
+        words = self.reply.split(" ")
+        for i, word in enumerate(words):
+            yield word if i == 0 else f" {word}"
+        self.completed += 1
+
+
+class LatencyTracker:
+    """Keeps a sliding window of latency samples."""
+
+    def __init__(self, window: int = 200):
+        """
+        Initialize the tracker.
+
+        Args:
+            window (int): Number of most recent samples to keep
+        """
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        """Return the number of samples kept."""
+        return len(self.samples)
+
+    def record(self, seconds: float) -> None:
+        """Record one latency sample."""
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Get a latency quantile.
+
+        Args:
+            q (float): The quantile, between 0 and 1
+
+        Returns:
+            Optional[float]: The quantile in seconds, or None without samples
+        """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """
+    Tracks a provider's health and stops sending it traffic while it is failing.
+
+    Latency and error rate are smoothed with an EWMA. Once enough requests
+    were seen and either crosses its threshold, the circuit opens and the
+    provider gets no traffic for `open_seconds`. It then goes half-open and
+    lets a single probe request through: success closes the circuit,
+    failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        error_threshold: float = 0.5,
+        latency_threshold: float = 10.0,
+        min_requests: int = 5,
+        open_seconds: float = 30.0,
+        alpha: float = 0.2,
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            error_threshold (float): EWMA error rate that opens the circuit
+            latency_threshold (float): EWMA latency that opens the circuit, in seconds
+            min_requests (int): Requests needed before the circuit can open
+            open_seconds (float): How long the circuit stays open before a probe
+            alpha (float): EWMA smoothing factor, the weight of the newest request
+        """
+        self.error_threshold = error_threshold
+        self.latency_threshold = latency_threshold
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.alpha = alpha
+
+        self.state = self.CLOSED
+        self.error_rate = 0.0
+        self.latency: Optional[float] = None
+        self.opened_at = 0.0
+        self.probing = False
+        self.reason: Optional[str] = None
+
+        # Counters
+        self.requests = 0
+        self.failures = 0
+        self.opened = 0
+
+    def allow(self) -> bool:
+        """
+        Check whether a request may be sent, claiming the probe when half-open.
+
+        Returns:
+            bool: True if the request may go to the provider
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                return False
+            self.state = self.HALF_OPEN
+            self.probing = False
+        if self.state == self.HALF_OPEN:
+            if self.probing:
+                return False
+            self.probing = True
+        return True
+
+    def available(self) -> bool:
+        """
+        Check whether a request may be sent, without claiming the probe.
+
+        Returns:
+            bool: True if allow() would let a request through
+        """
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.open_seconds
+        return not (self.state == self.HALF_OPEN and self.probing)
+
+    def _observe(self, latency: float, failed: bool) -> None:
+        """Fold one request into the EWMAs, seeding them with the first one."""
+        self.requests += 1
+        if self.requests == 1:
+            self.error_rate = float(failed)
+        else:
+            self.error_rate += self.alpha * (float(failed) - self.error_rate)
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.alpha * (latency - self.latency)
+
+    def _open(self, reason: str) -> None:
+        """Open the circuit."""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.probing = False
+        self.reason = reason
+        self.opened += 1
+
+    def _check(self) -> None:
+        """Open the circuit if a threshold is crossed."""
+        if self.requests < self.min_requests:
+            return
+        if self.error_rate >= self.error_threshold:
+            self._open(f"error rate {self.error_rate:.2f}")
+        elif self.latency >= self.latency_threshold:
+            self._open(f"latency {self.latency:.2f}s")
+
+    def record_success(self, latency: float) -> None:
+        """
+        Record a successful request.
+
+        Args:
+            latency (float): The request latency in seconds
+        """
+        self._observe(latency, failed=False)
+        if self.state == self.HALF_OPEN:
+            # Closing the circuit on a good probe, starting from a clean slate
+            self.state = self.CLOSED
+            self.probing = False
+            self.reason = None
+            self.error_rate = 0.0
+            self.latency = latency
+            return
+        self._check()
+
+    def record_failure(self, latency: float) -> None:
+        """
+        Record a failed request.
+
+        Args:
+            latency (float): Time until the request failed, in seconds
+        """
+        self.failures += 1
+        self._observe(latency, failed=True)
+        if self.state == self.HALF_OPEN:
+            self._open("probe failed")
+            return
+        self._check()
+
+    def record_cancel(self, latency: float) -> None:
+        """
+        Record a request cancelled before it finished, such as a hedge loser.
+
+        Its latency is a lower bound, so only the latency EWMA is updated.
+
+        Args:
+            latency (float): Time until the request was cancelled, in seconds
+        """
+        if self.latency is None:
+            self.latency = latency
+        elif latency > self.latency:
+            self.latency += self.alpha * (latency - self.latency)
+        if self.state == self.HALF_OPEN:
+            self.probing = False
+        elif self.state == self.CLOSED:
+            self._check()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get breaker state.
+
+        Returns:
+            Dict[str, Any]: State, the reason it opened, EWMAs and counters
+        """
+        retry_in = None
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "reason": self.reason,
+            "error_rate": round(self.error_rate, 3),
+            "latency_ms": (
+                round(self.latency * 1000, 1) if self.latency is not None else None
+            ),
+            "retry_in_seconds": round(retry_in, 1) if retry_in is not None else None,
+            "requests": self.requests,
+            "failures": self.failures,
+            "opened": self.opened,
+        }
+
+
+class ProviderRouter:
+    """
+    Sends requests to a primary provider and hedges slow ones to a secondary.
+
+    If the primary has not answered within the hedge delay, derived from a
+    quantile of its recent latencies, the same request is sent to the
+    secondary. The first successful answer wins and the other request is
+    cancelled. A primary that fails before the delay fires the hedge at once.
+
+    Each provider has a circuit breaker. While the primary's circuit is open,
+    requests go straight to the secondary instead.
+    """
+
+    def __init__(
+        self,
+        primary: ChatProvider,
+        secondary: Optional[ChatProvider] = None,
+        hedge: bool = True,
+        hedge_quantile: float = 0.95,
+        min_hedge_delay: float = 0.05,
+        initial_hedge_delay: float = 1.0,
+        min_samples: int = 20,
+        window: int = 200,
+        breakers: Optional[Dict[str, CircuitBreaker]] = None,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            primary (ChatProvider): The provider every request goes to first
+            secondary (ChatProvider, optional): The provider hedges go to
+            hedge (bool): Whether to hedge at all
+            hedge_quantile (float): Primary latency quantile used as the hedge delay
+            min_hedge_delay (float): Lower bound on the hedge delay, in seconds
+            initial_hedge_delay (float): Hedge delay until enough samples are kept
+            min_samples (int): Samples needed before the quantile is used
+            window (int): Number of latency samples kept per provider
+            breakers (Dict[str, CircuitBreaker], optional): Breakers by provider
+                name, shared with other routers over the same providers
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.hedge = hedge and secondary is not None
+        self.hedge_quantile = hedge_quantile
+        self.min_hedge_delay = min_hedge_delay
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_samples = min_samples
+        self.window = window
+
+        # Circuit breakers by provider name
+        self.breakers = breakers if breakers is not None else {}
+        for provider in (primary, secondary):
+            if provider is not None and provider.name not in self.breakers:
+                self.breakers[provider.name] = CircuitBreaker()
+
+        # Binding each provider's metrics once, off the hot path
+        self.metrics = {
+            provider.name: (
+                LLM_IN_FLIGHT.labels(provider.name),
+                LLM_SECONDS.labels(provider.name, provider.model),
+                LLM_FIRST_TOKEN_SECONDS.labels(provider.name, provider.model),
+            )
+            for provider in (primary, secondary)
+            if provider is not None
+        }
+
+        # Latency samples per (provider, "complete" | "first_token")
+        self.latencies: Dict[Tuple[str, str], LatencyTracker] = {}
+
+        # Counters
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def _tracker(self, provider: ChatProvider, kind: str) -> LatencyTracker:
+        """Get the latency tracker for a provider and request kind."""
+        key = (provider.name, kind)
+        if key not in self.latencies:
+            self.latencies[key] = LatencyTracker(self.window)
+        return self.latencies[key]
+
+    def hedge_delay(
+        self, kind: str = "complete", provider: Optional[ChatProvider] = None
+    ) -> float:
+        """
+        Get how long to wait on a provider before hedging.
+
+        Args:
+            kind (str): "complete" for full responses, "first_token" for streams
+            provider (ChatProvider, optional): The provider waited on, the primary by default
+
+        Returns:
+            float: The hedge delay in seconds
+        """
+        tracker = self._tracker(provider or self.primary, kind)
+        if len(tracker) < self.min_samples:
+            return self.initial_hedge_delay
+        return max(self.min_hedge_delay, tracker.quantile(self.hedge_quantile))
+
+    async def _timed(
+        self, provider: ChatProvider, kind: str, call: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Run a call, recording its latency and outcome."""
+        breaker = self.breakers[provider.name]
+        in_flight, complete_seconds, first_token_seconds = self.metrics[provider.name]
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            breaker.record_cancel(time.perf_counter() - started)
+            raise
+        except Exception:
+            breaker.record_failure(time.perf_counter() - started)
+            raise
+        finally:
+            in_flight.dec()
+        latency = time.perf_counter() - started
+        self._tracker(provider, kind).record(latency)
+        breaker.record_success(latency)
+        if kind == "complete":
+            complete_seconds.observe(latency)
+            record_stage("llm", latency)
+        else:
+            first_token_seconds.observe(latency)
+            record_stage("llm_first_token", latency)
+        return result
+
+    def _route(self) -> Tuple[ChatProvider, Optional[ChatProvider]]:
+        """
+        Pick the provider to send a request to and the one to hedge it to.
+
+        Returns:
+            Tuple[ChatProvider, Optional[ChatProvider]]: The first provider and
+                the hedge provider, if hedging is possible
+        """
+        primary, secondary = self.primary, self.secondary
+        if secondary is None:
+            return primary, None
+
+        # Failing over while the primary's circuit is open
+        if not self.breakers[primary.name].allow():
+            if self.breakers[secondary.name].allow():
+                self.failovers += 1
+                return secondary, None
+            # Both circuits are open, so the primary is tried anyway
+            return primary, None
+
+        if self.hedge and self.breakers[secondary.name].available():
+            return primary, secondary
+        return primary, None
+
+    async def _race(
+        self,
+        kind: str,
+        start: Callable[[ChatProvider], Awaitable[T]],
+        discard: Optional[Callable[[T], Awaitable[None]]] = None,
+    ) -> Tuple[ChatProvider, T]:
+        """
+        Run a call on the primary, hedging it to the secondary if it is slow.
+
+        Args:
+            kind (str): The latency tracker to use for the hedge delay
+            start (Callable[[ChatProvider], Awaitable[T]]): Starts the call on a provider
+            discard (Callable[[T], Awaitable[None]], optional): Releases the
+                result of a losing call, such as an open stream
+
+        Returns:
+            Tuple[ChatProvider, T]: The provider that answered first and its result
+
+        Raises:
+            Exception: The last error if every provider failed
+        """
+        self.requests += 1
+        first, hedge = self._route()
+        tasks: Dict[asyncio.Task, ChatProvider] = {
+            asyncio.ensure_future(self._timed(first, kind, lambda: start(first))): first
+        }
+        try:
+            if hedge is not None:
+                # Giving the first provider until the hedge delay on its own
+                done, _ = await asyncio.wait(
+                    tasks, timeout=self.hedge_delay(kind, first)
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return tasks.pop(task), task.result()
+
+                # The hedge may have been opened by the time the delay ran out
+                if self.breakers[hedge.name].allow():
+                    self.hedged += 1
+                    tasks[
+                        asyncio.ensure_future(
+                            self._timed(hedge, kind, lambda: start(hedge))
+                        )
+                    ] = hedge
+
+            # Taking the first successful answer
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        provider = tasks.pop(task)
+                        if provider is not first:
+                            self.hedge_wins += 1
+                        return provider, task.result()
+                    error = task.exception()
+            raise error
+
+        finally:
+            # Cancelling the losing request
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+            # Releasing losers, including one that finished alongside the winner
+            if discard is not None and tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+                for task in tasks:
+                    if not task.cancelled() and task.exception() is None:
+                        await discard(task.result())
+
+    async def complete_with_provider(
+        self, messages: List[Dict[str, str]], max_tokens: int, temperature: float
+    ) -> Tuple[ChatProvider, str]:
+        """
+        Get a full chat completion and the provider that answered it.
+
+        Args:
+            messages (List[Dict[str, str]]): The prompt messages
+            max_tokens (int): Maximum tokens to generate
+            temperature (float): Sampling temperature
+
+        Returns:
+            Tuple[ChatProvider, str]: The provider that answered and the response text
+        """
+        return await self._race(
+            "complete",
+            lambda provider: provider.complete(messages, max_tokens, temperature),
+        )
+
+    async def complete(
+        self, messages: List[Dict[str, str]], max_tokens: int, temperature: float
+    ) -> str:
+        """
+        Get a full chat completion, hedging it if the primary is slow.
+
+        Args:
+            messages (List[Dict[str, str]]): The prompt messages
+            max_tokens (int): Maximum tokens to generate
+            temperature (float): Sampling temperature
+
+        Returns:
+            str: The response text
+        """
+        _, response_text = await self.complete_with_provider(
+            messages, max_tokens, temperature
+        )
+        return response_text
+
+    async def stream_with_provider(
+        self, messages: List[Dict[str, str]], max_tokens: int, temperature: float
+    ) -> Tuple[ChatProvider, AsyncIterator[str]]:
+        """
+        Start a chat completion stream and get the provider that answered first.
+
+        The caller must consume or close the returned deltas, which hold the
+        provider's stream open.
+
+        Args:
+            messages (List[Dict[str, str]]): The prompt messages
+            max_tokens (int): Maximum tokens to generate
+            temperature (float): Sampling temperature
+
+        Returns:
+            Tuple[ChatProvider, AsyncIterator[str]]: The provider that answered
+                and its response text deltas
+        """
+
+        async def first_delta(provider: ChatProvider):
+            deltas = provider.stream(messages, max_tokens, temperature)
+            try:
+                return deltas, await deltas.__anext__()
+            except StopAsyncIteration:
+                return deltas, None
+            except BaseException:
+                await deltas.aclose()
+                raise
+
+        async def close(result) -> None:
+            await result[0].aclose()
+
+        async def forward(deltas: AsyncIterator[str], first: Optional[str]):
+            try:
+                if first is None:
+                    return
+                yield first
+                async for delta in deltas:
+                    yield delta
+            finally:
+                await deltas.aclose()
+
+        provider, (deltas, first) = await self._race(
+            "first_token", first_delta, discard=close
+        )
+        return provider, forward(deltas, first)
+
+    async def stream(
+        self, messages: List[Dict[str, str]], max_tokens: int, temperature: float
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, hedging it if the primary's first token is slow.
+
+        Args:
+            messages (List[Dict[str, str]]): The prompt messages
+            max_tokens (int): Maximum tokens to generate
+            temperature (float): Sampling temperature
+
+        Yields:
+            str: Response text deltas from whichever provider answered first
+        """
+        _, deltas = await self.stream_with_provider(messages, max_tokens, temperature)
+        try:
+            async for delta in deltas:
+                yield delta
+        finally:
+            await deltas.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get router statistics.
+
+        Returns:
+            Dict[str, Any]: Request, hedge and failover counts, hedge delay and latency quantiles
+        """
+        latency = {}
+        for (name, kind), tracker in self.latencies.items():
+            if not tracker.samples:
+                continue
+            latency.setdefault(name, {})[kind] = {
+                "p50_ms": round(tracker.quantile(0.5) * 1000, 1),
+                "p95_ms": round(tracker.quantile(0.95) * 1000, 1),
+                "samples": len(tracker),
+            }
+        return {
+            "primary": self.primary.name,
+            "secondary": self.secondary.name if self.secondary else None,
+            "hedge": self.hedge,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 1),
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "latency": latency,
+        }
@@ -1,50 +1,223 @@
 """Service for handling voice processing."""
 
 import asyncio
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
 
+from app.core.cache import AudioCache
 from app.core.config import settings
+from app.core.executor import BoundedExecutor
+from app.core.metrics import PREPROCESS_SECONDS, STT_SECONDS, TTS_SECONDS
+from app.core.stt import load_stt_backend
+from app.core.tts import close_tts_backend, load_tts_backend
+from app.core.tracing import record_stage
 from app.core.voice import (
     speech_to_text as stt,
     text_to_speech as tts,
     preprocess_audio,
+    split_sentences,
+    tts_cache_key,
 )
 
 
 class VoiceService:
     """Service for processing voice data."""
 
-    async def speech_to_text(self, audio_data: bytes) -> str:
+    def __init__(self):
+        """Initialize the VoiceService."""
+        # Cache synthesized speech by content
+        self.tts_cache = AudioCache(
+            maxsize=settings.TTS_CACHE_SIZE,
+            directory=settings.TTS_CACHE_DIR,
+            max_bytes=settings.TTS_CACHE_MAX_BYTES,
+        )
+
+        # Run blocking audio work on a dedicated, bounded pool
+        self.executor = BoundedExecutor(
+            max_workers=settings.VOICE_WORKERS,
+            max_queue=settings.VOICE_QUEUE_SIZE,
+            name="voice",
+        )
+
+        # Binding the configured engine's synthesis time metric once
+        self.tts_seconds = TTS_SECONDS.labels(settings.TTS_BACKEND)
+
+    async def start(self) -> None:
         """
-        Convert speech to text asynchronously.
+        Load the speech engines, once per worker at startup.
+
+        Raises:
+            speech_recognition.RequestError: If the STT engine is not installed
+            RuntimeError: If the TTS engine is not installed
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, load_stt_backend)
+        await loop.run_in_executor(None, load_tts_backend)
+
+    def close(self) -> None:
+        """Stop the voice workers and the speech engines."""
+        self.executor.shutdown()
+        close_tts_backend()
+
+    def _transcribe(self, audio_data: bytes) -> Tuple[str, float, float]:
+        """
+        Preprocess audio and convert it to text.
 
         Args:
             audio_data (bytes): Raw audio data
 
         Returns:
-            str: Transcribed text
+            Tuple[str, float, float]: Transcribed text, and the preprocessing
+                and transcription times in seconds
         """
-        # Preprocess the audio
+        started = time.perf_counter()
         processed_audio = preprocess_audio(audio_data)
+        preprocessed = time.perf_counter()
+        text = stt(processed_audio)
+        return text, preprocessed - started, time.perf_counter() - preprocessed
+
+    def _synthesize(
+        self, key: str, text: str, audio_format: str
+    ) -> Tuple[bytes, Optional[float]]:
+        """
+        Convert text to speech, going through the disk cache tier.
+
+        Args:
+            key (str): The content address of the speech
+            text (str): Text to convert to speech
+            audio_format (str): Output audio format
+
+        Returns:
+            Tuple[bytes, Optional[float]]: Audio data, and the synthesis time
+                in seconds unless it came from the disk cache
+        """
+        audio_data = self.tts_cache.load(key)
+        if audio_data is not None:
+            return audio_data, None
+
+        started = time.perf_counter()
+        audio_data = tts(text, audio_format)
+        elapsed = time.perf_counter() - started
+        self.tts_cache.set(key, audio_data)
+        return audio_data, elapsed
+
+    async def speech_to_text(self, audio_data: bytes) -> str:
+        """
+        Convert speech to text asynchronously.
 
-        # Run in a thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        text = await loop.run_in_executor(None, stt, processed_audio)
+        Args:
+            audio_data (bytes): Raw audio data
 
+        Returns:
+            str: Transcribed text
+
+        Raises:
+            ExecutorSaturated: If the voice pool is full
+        """
+        # Preprocess and transcribe off the event loop
+        text, preprocess_seconds, stt_seconds = await self.executor.run(
+            self._transcribe, audio_data
+        )
+        PREPROCESS_SECONDS.observe(preprocess_seconds)
+        STT_SECONDS.observe(stt_seconds)
+        record_stage("preprocess", preprocess_seconds)
+        record_stage("stt", stt_seconds)
         return text
 
-    async def text_to_speech(self, text: str) -> bytes:
+    async def text_to_speech(self, text: str, audio_format: str = "wav") -> bytes:
         """
         Convert text to speech asynchronously.
 
         Args:
             text (str): Text to convert to speech
+            audio_format (str): Output audio format, one of AUDIO_FORMATS
 
         Returns:
             bytes: Audio data
+
+        Raises:
+            ExecutorSaturated: If the voice pool is full
         """
-        # Run in a thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        audio_data = await loop.run_in_executor(None, tts, text)
+        # Answering from memory without leaving the event loop
+        key = tts_cache_key(text, audio_format)
+        audio_data = self.tts_cache.get(key)
+        if audio_data is not None:
+            return audio_data
 
+        # Run in the voice pool to avoid blocking
+        audio_data, tts_seconds = await self.executor.run(
+            self._synthesize, key, text, audio_format
+        )
+        if tts_seconds is not None:
+            self.tts_seconds.observe(tts_seconds)
+            record_stage("tts", tts_seconds)
         return audio_data
+
+    async def stream_text_to_speech(
+        self, deltas: AsyncIterator[str], audio_format: str = "wav"
+    ) -> AsyncIterator[Tuple[str, bytes]]:
+        """
+        Convert streamed text to speech one sentence at a time.
+
+        Synthesis of each sentence starts as soon as it is complete, while
+        later sentences are still being generated. Audio is yielded in
+        sentence order.
+
+        Args:
+            deltas (AsyncIterator[str]): Text deltas as they are generated
+            audio_format (str): Output audio format, one of AUDIO_FORMATS
+
+        Yields:
+            Tuple[str, bytes]: Each sentence and its audio data
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def produce():
+            buffer = ""
+            try:
+                async for delta in deltas:
+                    buffer += delta
+                    sentences, buffer = split_sentences(buffer)
+                    for sentence in sentences:
+                        queue.put_nowait(
+                            (
+                                sentence,
+                                asyncio.ensure_future(
+                                    self.text_to_speech(
+                                        sentence, audio_format=audio_format
+                                    )
+                                ),
+                            )
+                        )
+
+                # Flushing whatever is left once the text is complete
+                sentence = buffer.strip()
+                if sentence:
+                    queue.put_nowait(
+                        (
+                            sentence,
+                            asyncio.ensure_future(
+                                self.text_to_speech(sentence, audio_format=audio_format)
+                            ),
+                        )
+                    )
+            finally:
+                queue.put_nowait(None)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                sentence, synthesis = item
+                yield sentence, await synthesis
+
+            # Surfacing any error raised while generating the text
+            await producer
+        finally:
+            producer.cancel()
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item is not None:
+                    item[1].cancel()
@@ -0,0 +1,86 @@
+"""Measure preprocessing throughput of the thread and process DSP modes.
+
+Runs batches of concurrent preprocess_audio calls with a growing number of
+workers. In thread mode the normalize/trim work holds the GIL, so it stays
+near one core; in process mode it should scale with the worker count up to
+the number of CPUs. Run from the project root:
+
+    python -m scripts.bench.dsp
+"""
+
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from pydub import AudioSegment
+
+# Adding the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.config import settings
+from app.core.dsp import shutdown_process_pool
+from app.core.voice import preprocess_audio
+
+
+def make_upload(seconds, seed, frame_rate=16000):
+    """
+    Build a WAV upload with silence around quiet noise.
+
+    Args:
+        seconds (float): Clip length in seconds
+        seed (int): Random seed
+        frame_rate (int): Sample rate in Hz
+
+    Returns:
+        bytes: The WAV file
+    """
+    frames = int(seconds * frame_rate)
+    samples = np.zeros(frames, dtype=np.int16)
+    middle = slice(frames // 4, 3 * frames // 4)
+    samples[middle] = np.random.default_rng(seed).integers(
+        -3000, 3000, middle.stop - middle.start
+    )
+    buffer = io.BytesIO()
+    AudioSegment(
+        samples.tobytes(), frame_rate=frame_rate, sample_width=2, channels=1
+    ).export(buffer, format="wav")
+    return buffer.getvalue()
+
+
+def throughput(uploads, mode, workers):
+    """Return clips per second for one mode and worker count."""
+    settings.DSP_MODE = mode
+    settings.DSP_PROCESSES = workers
+    shutdown_process_pool()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Warming up the process pool outside the timed run
+        list(pool.map(preprocess_audio, uploads[:workers]))
+
+        start = time.perf_counter()
+        list(pool.map(preprocess_audio, uploads))
+        elapsed = time.perf_counter() - start
+
+    shutdown_process_pool()
+    return len(uploads) / elapsed
+
+
+def main():
+    """Run the benchmark and print a table of clips per second."""
+    uploads = [make_upload(30, seed) for seed in range(32)]
+    counts = sorted({1, 2, 4, os.cpu_count() or 1})
+
+    print(f"{len(uploads)} x 30 s clips, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'thread (clips/s)':>17} {'process (clips/s)':>18}")
+    for workers in counts:
+        print(
+            f"{workers:>8} {throughput(uploads, 'thread', workers):>17.1f} "
+            f"{throughput(uploads, 'process', workers):>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
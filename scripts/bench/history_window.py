@@ -0,0 +1,114 @@
+"""Compare prompt tokens of the fixed 10-message trim and token-budget windowing.
+
+Replays conversations stitched together from the recorded question/answer
+pairs in the fine-tuning dataset. Run from the project root:
+
+    python -m scripts.bench.history_window
+"""
+
+import json
+import os
+import random
+import sys
+
+# Adding the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.config import settings
+from app.core.tokens import message_tokens
+from app.services.chat_service import ChatService
+
+DATASET = os.path.join(
+    os.path.dirname(__file__),
+    "../../app/fine-tune/scripts/data/personal_responses.jsonl",
+)
+
+
+def load_conversations(count=200, seed=0):
+    """
+    Stitch recorded question/answer pairs into multi-turn conversations.
+
+    Args:
+        count (int): Number of conversations
+        seed (int): Random seed
+
+    Returns:
+        list: Conversations as lists of (question, answer) turns
+    """
+    with open(DATASET) as f:
+        records = [json.loads(line)["messages"] for line in f if line.strip()]
+    pairs = [
+        (record[1]["content"], record[2]["content"])
+        for record in records
+        if len(record) >= 3
+    ]
+
+    rng = random.Random(seed)
+    return [
+        [rng.choice(pairs) for _ in range(rng.randint(1, 20))] for _ in range(count)
+    ]
+
+
+def replay_fixed(chat_service, conversation):
+    """Replay a conversation with the original system + last 9 messages trim."""
+    chat_service._add_user_message("fixed", conversation[0][0])
+    history = list(chat_service.conversations["fixed"])
+    del chat_service.conversations["fixed"]
+
+    tokens = []
+    for i, (question, answer) in enumerate(conversation):
+        if i:
+            history.append({"role": "user", "content": question})
+        tokens.append((sum(message_tokens(m) for m in history), len(history)))
+        history.append({"role": "assistant", "content": answer})
+        if len(history) > 10:
+            history = [history[0]] + history[-9:]
+    return tokens
+
+
+def replay_budget(chat_service, conversation, model):
+    """Replay a conversation through ChatService's token-budget windowing."""
+    tokens = []
+    for question, answer in conversation:
+        chat_service._add_user_message("budget", question)
+        prompt = chat_service._prompt_messages("budget", model)
+        tokens.append((sum(message_tokens(m) for m in prompt), len(prompt)))
+        chat_service._add_assistant_message("budget", answer, model)
+    del chat_service.conversations["budget"]
+    return tokens
+
+
+def main():
+    """Run the comparison and print a table row per strategy."""
+    conversations = load_conversations()
+    chat_service = ChatService()
+    model = settings.OPENAI_MODEL
+
+    def report(label, turns):
+        tokens = [t for t, _ in turns]
+        messages = sum(m for _, m in turns) / len(turns)
+        saved = 1 - sum(tokens) / fixed_total
+        print(
+            f"{label:>16} {sum(tokens):>13} {sum(tokens) / len(tokens):>7.0f} "
+            f"{max(tokens):>6} {messages:>9.1f} {saved:>7.1%}"
+        )
+
+    fixed = [t for c in conversations for t in replay_fixed(chat_service, c)]
+    fixed_total = sum(t for t, _ in fixed)
+    print(f"{len(conversations)} conversations, {len(fixed)} turns")
+    print(
+        f"{'strategy':>16} {'total tokens':>13} {'mean':>7} {'max':>6} "
+        f"{'messages':>9} {'saved':>7}"
+    )
+    report("fixed 10 msgs", fixed)
+
+    for budget in [64, 128, 256, 512, 1024]:
+        settings.PROMPT_TOKEN_BUDGETS = {model: budget}
+        report(
+            f"budget {budget}",
+            [t for c in conversations for t in replay_budget(chat_service, c, model)],
+        )
+
+
+if __name__ == "__main__":
+    main()
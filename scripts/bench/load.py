@@ -0,0 +1,454 @@
+"""Load-test the API end to end against local fake providers.
+
+Starts an OpenAI/Groq-compatible stub server with lognormal latencies,
+points the app at it, replaces speech recognition and synthesis with fakes
+of configurable latency, and serves the app with uvicorn. It then drives
+/api/chat, /api/chat-groq and /api/voice either closed-loop at a fixed
+concurrency or open-loop at a target request rate, and prints latency
+percentiles, throughput and error rates as JSON so runs can be compared
+across commits. Canned apology replies count as errors, since the service
+answers them with a 200. Run from the project root:
+
+    python -m scripts.bench.load --concurrency 32 --duration 20
+    python -m scripts.bench.load --rps 50 --endpoints chat,voice --output run.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import wave
+
+import httpx
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Adding the project root directory to the Python path
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, ROOT)
+
+# Canned replies the chat service sends with a 200 when the provider failed
+FALLBACK_REPLIES = (
+    "I'm sorry, I'm having trouble responding right now.",
+    "I encountered an unexpected error.",
+)
+
+REPLY = (
+    "I love building things that make hard problems feel simple. "
+    "Most of my growth came from shipping early and listening closely."
+)
+
+
+def lognormal(median, sigma, rng):
+    """
+    Build a latency sampler.
+
+    Args:
+        median (float): Median latency in seconds
+        sigma (float): Log-space standard deviation, 0 for a fixed latency
+        rng (random.Random): Random source
+
+    Returns:
+        callable: Returns one latency in seconds per call
+    """
+    if sigma <= 0:
+        return lambda: median
+    return lambda: rng.lognormvariate(math.log(median), sigma)
+
+
+def parse_latency(value):
+    """Parse a MEDIAN[:SIGMA] latency argument in seconds."""
+    median, _, sigma = value.partition(":")
+    return float(median), float(sigma or 0)
+
+
+def stub_provider_app(latencies, error_rate, rng):
+    """
+    Build an OpenAI/Groq-compatible chat completions stub.
+
+    Args:
+        latencies (dict): Latency samplers by provider name
+        error_rate (float): Fraction of requests answered with a 500
+        rng (random.Random): Random source
+
+    Returns:
+        FastAPI: The stub app
+    """
+    stub = FastAPI()
+
+    async def complete(request: Request, provider: str):
+        body = await request.json()
+        await asyncio.sleep(latencies[provider]())
+        if rng.random() < error_rate:
+            return JSONResponse({"error": {"message": "stub failure"}}, 500)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": REPLY},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+
+        async def chunks():
+            for i, word in enumerate(REPLY.split(" ")):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "delta": {"content": word if i == 0 else f" {word}"},
+                            "finish_reason": None,
+                        }
+                    ],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(0.005)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    @stub.post("/v1/chat/completions")
+    async def openai_completions(request: Request):
+        return await complete(request, "openai")
+
+    @stub.post("/openai/v1/chat/completions")
+    async def groq_completions(request: Request):
+        return await complete(request, "groq")
+
+    return stub
+
+
+def make_wav(seconds, seed, frame_rate=16000, silent=False):
+    """
+    Build a mono 16-bit WAV clip of noise padded with silence.
+
+    Args:
+        seconds (float): Clip length in seconds
+        seed (int): Random seed
+        frame_rate (int): Sample rate in Hz
+        silent (bool): Return silence only
+
+    Returns:
+        bytes: The WAV file
+    """
+    frames = int(seconds * frame_rate)
+    samples = np.zeros(frames, dtype=np.int16)
+    if not silent:
+        middle = slice(frames // 5, 4 * frames // 5)
+        samples[middle] = np.random.default_rng(seed).integers(
+            -4000, 4000, middle.stop - middle.start
+        )
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(frame_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def free_port():
+    """Return a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(app, port):
+    """
+    Serve an ASGI app with uvicorn on a background thread.
+
+    Args:
+        app: The ASGI app
+        port (int): The port to listen on
+
+    Returns:
+        uvicorn.Server: The running server
+    """
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def percentile(values, q):
+    """Return the q-th percentile of a list, or None if it is empty."""
+    if not values:
+        return None
+    return float(np.percentile(values, q))
+
+
+class Recorder:
+    """Collects latencies and errors per endpoint."""
+
+    def __init__(self, endpoints):
+        self.latencies = {endpoint: [] for endpoint in endpoints}
+        self.errors = {endpoint: 0 for endpoint in endpoints}
+        self.status = {endpoint: {} for endpoint in endpoints}
+
+    def record(self, endpoint, seconds, status):
+        """Record one finished request."""
+        key = str(status)
+        self.status[endpoint][key] = self.status[endpoint].get(key, 0) + 1
+        if status == 200:
+            self.latencies[endpoint].append(seconds * 1000)
+        else:
+            self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        """Summarize the run per endpoint."""
+        report = {}
+        for endpoint, latencies in self.latencies.items():
+            total = len(latencies) + self.errors[endpoint]
+            report[endpoint] = {
+                "requests": total,
+                "errors": self.errors[endpoint],
+                "error_rate": self.errors[endpoint] / total if total else 0.0,
+                "throughput_rps": len(latencies) / elapsed,
+                "status": self.status[endpoint],
+                "p50_ms": percentile(latencies, 50),
+                "p95_ms": percentile(latencies, 95),
+                "p99_ms": percentile(latencies, 99),
+                "mean_ms": float(np.mean(latencies)) if latencies else None,
+            }
+        return report
+
+
+async def send(client, endpoint, n, uploads, recorder):
+    """Send one request to an endpoint and record the outcome."""
+    conversation_id = str(uuid.uuid4())
+    started = time.perf_counter()
+    try:
+        if endpoint == "voice":
+            response = await client.post(
+                "/api/voice",
+                data={"conversation_id": conversation_id},
+                files={"audio": ("turn.wav", uploads[n % len(uploads)], "audio/wav")},
+            )
+        else:
+            response = await client.post(
+                f"/api/{endpoint}",
+                json={
+                    "message": f"Question {n}: what drives you?",
+                    "conversation_id": conversation_id,
+                },
+            )
+        await response.aread()
+        status = response.status_code
+        if status == 200:
+            reply = (
+                response.headers.get("X-Response-Text", "")
+                if endpoint == "voice"
+                else response.json()["response"]
+            )
+            if reply.startswith(FALLBACK_REPLIES):
+                status = "fallback"
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    recorder.record(endpoint, time.perf_counter() - started, status)
+
+
+async def drive(base_url, endpoints, concurrency, rps, duration, uploads):
+    """
+    Drive the API for a fixed duration.
+
+    With a request rate, requests arrive as a Poisson process regardless of
+    how fast earlier ones finish (open loop). Otherwise `concurrency` workers
+    each send the next request as soon as the last one finished (closed loop).
+
+    Returns:
+        tuple: The recorder and the elapsed time in seconds
+    """
+    recorder = Recorder(endpoints)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    counter = iter(range(10**9))
+    rng = random.Random(0)
+
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=120, limits=limits
+    ) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+
+        if rps:
+            tasks = set()
+            next_arrival = started
+            while next_arrival < deadline:
+                await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+                n = next(counter)
+                task = asyncio.ensure_future(
+                    send(client, endpoints[n % len(endpoints)], n, uploads, recorder)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                next_arrival += rng.expovariate(rps)
+            if tasks:
+                await asyncio.wait(tasks)
+        else:
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    n = next(counter)
+                    await send(
+                        client, endpoints[n % len(endpoints)], n, uploads, recorder
+                    )
+
+            await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+        return recorder, time.perf_counter() - started
+
+
+def git_commit():
+    """Return the current git commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """Parse arguments, start the servers and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoints", default="chat,chat-groq,voice")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rps", type=float, default=0.0, help="open-loop rate")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument(
+        "--openai-latency", default="0.6:0.5", help="MEDIAN[:SIGMA] seconds"
+    )
+    parser.add_argument("--groq-latency", default="0.25:0.4")
+    parser.add_argument("--stt-latency", default="0.3:0.3")
+    parser.add_argument("--tts-latency", default="0.2:0.3")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--clip-seconds", type=float, default=3.0)
+    parser.add_argument(
+        "--cache", action="store_true", help="keep the response and TTS caches on"
+    )
+    parser.add_argument("--output", help="also write the JSON report to a file")
+    args = parser.parse_args()
+    endpoints = args.endpoints.split(",")
+    rng = random.Random(0)
+
+    # Starting the provider stub and pointing the app at it before importing it
+    stub_port = free_port()
+    latencies = {
+        "openai": lognormal(*parse_latency(args.openai_latency), rng),
+        "groq": lognormal(*parse_latency(args.groq_latency), rng),
+    }
+    stub_server = serve(stub_provider_app(latencies, args.error_rate, rng), stub_port)
+    os.environ.update(
+        {
+            "OPENAI_API_KEY": "bench",
+            "GROQ_API_KEY": "bench",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{stub_port}/v1",
+            "GROQ_BASE_URL": f"http://127.0.0.1:{stub_port}",
+            "DEBUG": "False",
+        }
+    )
+    if not args.cache:
+        os.environ.update({"RESPONSE_CACHE_SIZE": "0", "TTS_CACHE_SIZE": "0"})
+
+    import app.services.voice_service as voice_service_module
+    from app.main import app
+
+    # Replacing speech recognition and synthesis with local fakes
+    stt_latency = lognormal(*parse_latency(args.stt_latency), rng)
+    tts_latency = lognormal(*parse_latency(args.tts_latency), rng)
+    reply_audio = make_wav(1.0, 0, silent=True)
+
+    def fake_stt(audio_data):
+        time.sleep(stt_latency())
+        return "What drives you?"
+
+    def fake_tts(text, audio_format="wav"):
+        time.sleep(tts_latency())
+        return reply_audio
+
+    voice_service_module.stt = fake_stt
+    voice_service_module.tts = fake_tts
+
+    app_port = free_port()
+    app_server = serve(app, app_port)
+    base_url = f"http://127.0.0.1:{app_port}"
+    uploads = [make_wav(args.clip_seconds, seed) for seed in range(8)]
+
+    async def run():
+        if args.warmup > 0:
+            await drive(
+                base_url, endpoints, min(args.concurrency, 4), 0, args.warmup, uploads
+            )
+        return await drive(
+            base_url, endpoints, args.concurrency, args.rps, args.duration, uploads
+        )
+
+    # Keeping the app's own error prints out of the JSON report on stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        recorder, elapsed = asyncio.run(run())
+    report = {
+        "commit": git_commit(),
+        "config": {
+            key: getattr(args, key)
+            for key in (
+                "endpoints",
+                "concurrency",
+                "rps",
+                "duration",
+                "openai_latency",
+                "groq_latency",
+                "stt_latency",
+                "tts_latency",
+                "error_rate",
+                "clip_seconds",
+                "cache",
+            )
+        },
+        "elapsed_seconds": elapsed,
+        "endpoints": recorder.report(elapsed),
+    }
+
+    app_server.should_exit = True
+    stub_server.should_exit = True
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
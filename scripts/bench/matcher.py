@@ -0,0 +1,98 @@
+"""Benchmark the keyword automaton against a linear keyword scan.
+
+Run from the project root:
+
+    python -m scripts.bench.matcher
+"""
+
+import os
+import random
+import sys
+import time
+
+# Adding the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.matcher import KeywordMatcher
+from app.core.responses import QUESTION_MAPPINGS
+
+QUESTIONS = [
+    "What should we know about your life story in a few sentences?",
+    "What's your #1 superpower?",
+    "What are the top 3 areas you'd like to grow in?",
+    "What misconception do your coworkers have about you?",
+    "How do you push your boundaries and limits?",
+    "What's your favorite color and why do you like it so much?",
+]
+
+
+def make_mappings(size, seed=0):
+    """
+    Build a mapping of synthetic two-word keywords ending with the real ones.
+
+    Args:
+        size (int): Number of keywords
+        seed (int): Random seed
+
+    Returns:
+        dict: Keywords mapped to persona keys
+    """
+    rng = random.Random(seed)
+    words = [
+        "".join(
+            rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 8))
+        )
+        for _ in range(5000)
+    ]
+    mappings = {}
+    while len(mappings) < size - len(QUESTION_MAPPINGS):
+        mappings[f"{rng.choice(words)} {rng.choice(words)}"] = "life_story"
+    mappings.update(QUESTION_MAPPINGS)
+    return mappings
+
+
+def linear_match(mappings, text):
+    """The original scan, checking every keyword against the text."""
+    for keyword, value in mappings.items():
+        if keyword in text:
+            return value
+    return None
+
+
+def per_question_us(func, repeat):
+    """Return the mean time per question in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for question in QUESTIONS:
+            func(question.lower())
+    return (time.perf_counter() - start) / (repeat * len(QUESTIONS)) * 1e6
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    print(
+        f"{'keywords':>9} {'build (ms)':>11} {'linear (us)':>12} "
+        f"{'automaton (us)':>15} {'speedup':>9}"
+    )
+    for size, repeat in [(20, 2000), (2000, 200), (50000, 10)]:
+        mappings = make_mappings(size)
+
+        start = time.perf_counter()
+        matcher = KeywordMatcher(mappings)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        for question in QUESTIONS:
+            assert matcher.match(question.lower()) == linear_match(
+                mappings, question.lower()
+            )
+
+        linear_us = per_question_us(lambda q: linear_match(mappings, q), repeat)
+        automaton_us = per_question_us(matcher.match, repeat)
+        print(
+            f"{size:>9} {build_ms:>11.1f} {linear_us:>12.1f} "
+            f"{automaton_us:>15.1f} {linear_us / automaton_us:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
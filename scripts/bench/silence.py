@@ -0,0 +1,87 @@
+"""Benchmark the vectorized silence trimming against the chunk-by-chunk scan.
+
+Run from the project root:
+
+    python -m scripts.bench.silence
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from pydub import AudioSegment
+
+# Adding the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.voice import detect_leading_silence
+
+
+def loop_trim(audio, silence_threshold=-50.0, chunk_size=10):
+    """The original implementation, slicing and measuring one chunk at a time."""
+    trim_ms = 0
+    while (
+        trim_ms < len(audio)
+        and audio[trim_ms : trim_ms + chunk_size].dBFS < silence_threshold
+    ):
+        trim_ms += chunk_size
+
+    end_trim_ms = len(audio)
+    while (
+        end_trim_ms > 0
+        and audio[end_trim_ms - chunk_size : end_trim_ms].dBFS < silence_threshold
+    ):
+        end_trim_ms -= chunk_size
+
+    return audio[trim_ms:end_trim_ms]
+
+
+def make_clip(seconds, frame_rate=16000):
+    """
+    Build a clip with a third of silence on each side of a noisy middle.
+
+    Args:
+        seconds (float): Clip length in seconds
+        frame_rate (int): Sample rate in Hz
+
+    Returns:
+        AudioSegment: The synthetic clip
+    """
+    frames = int(seconds * frame_rate)
+    samples = np.zeros(frames, dtype=np.int16)
+    rng = np.random.default_rng(0)
+    middle = slice(frames // 3, 2 * frames // 3)
+    samples[middle] = rng.integers(-8000, 8000, middle.stop - middle.start)
+    return AudioSegment(
+        samples.tobytes(), frame_rate=frame_rate, sample_width=2, channels=1
+    )
+
+
+def best_of(func, audio, repeat):
+    """Return the best wall time of several runs in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(audio)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    print(f"{'clip':>8} {'loop (ms)':>12} {'vectorized (ms)':>16} {'speedup':>9}")
+    for label, seconds, repeat in [("30 s", 30, 5), ("5 min", 300, 3)]:
+        audio = make_clip(seconds)
+        assert len(loop_trim(audio)) == len(detect_leading_silence(audio))
+
+        loop_time = best_of(loop_trim, audio, repeat)
+        vectorized_time = best_of(detect_leading_silence, audio, repeat)
+        print(
+            f"{label:>8} {loop_time * 1000:>12.1f} {vectorized_time * 1000:>16.1f} "
+            f"{loop_time / vectorized_time:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
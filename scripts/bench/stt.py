@@ -0,0 +1,143 @@
+"""Compare the latency of the speech-to-text backends.
+
+For each backend the one-off model load is timed separately from the
+transcriptions, so the comparison shows both the startup cost and the
+per-utterance latency. The sphinx backend is also compared with
+Recognizer.recognize_sphinx, which reloads the models on every call. The
+input is a WAV file, or a synthetic clip if none is given. Backends that
+cannot run here (no network for google, no pocketsphinx for sphinx) are
+reported with the error. Run from the project root:
+
+    python -m scripts.bench.stt
+    python -m scripts.bench.stt --wav question.wav --repeat 10
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+import speech_recognition as sr
+
+# Adding the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.stt import BACKENDS
+from scripts.bench.voice import make_clip, to_wav
+
+
+def transcribe(recognize, audio_data):
+    """Record WAV data and transcribe it, treating unintelligible audio as a result."""
+    with sr.AudioFile(io.BytesIO(audio_data)) as source:
+        audio = sr.Recognizer().record(source)
+    try:
+        return recognize(audio)
+    except sr.UnknownValueError:
+        return ""
+
+
+def time_calls(recognize, audio_data, repeat):
+    """
+    Time repeated transcriptions.
+
+    Args:
+        recognize (callable): Transcribes an AudioData
+        audio_data (bytes): WAV data
+        repeat (int): Number of calls
+
+    Returns:
+        dict: First, best and median call time in ms and the last transcript
+    """
+    timings = []
+    text = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = transcribe(recognize, audio_data)
+        timings.append(time.perf_counter() - start)
+    return {
+        "first_ms": timings[0] * 1000,
+        "best_ms": min(timings) * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "text": text,
+    }
+
+
+def benchmark(names, audio_data, repeat):
+    """
+    Run every backend on the same audio.
+
+    Args:
+        names (list): Backend names
+        audio_data (bytes): WAV data
+        repeat (int): Transcriptions per backend
+
+    Returns:
+        list: One result dict per backend, with an error if it could not run
+    """
+    results = []
+    for name in names:
+        backend = BACKENDS[name](engines=1) if name == "sphinx" else BACKENDS[name]()
+        try:
+            start = time.perf_counter()
+            backend.load()
+            load_ms = (time.perf_counter() - start) * 1000
+            results.append(
+                {
+                    "backend": name,
+                    "load_ms": load_ms,
+                    **time_calls(backend.recognize, audio_data, repeat),
+                }
+            )
+        except sr.RequestError as e:
+            results.append({"backend": name, "error": str(e)})
+            continue
+
+        # The model reload the pooled decoders avoid
+        if name == "sphinx":
+            results.append(
+                {
+                    "backend": "sphinx (reload per call)",
+                    "load_ms": 0.0,
+                    **time_calls(
+                        backend.recognizer.recognize_sphinx, audio_data, repeat
+                    ),
+                }
+            )
+    return results
+
+
+def main():
+    """Parse arguments, run the comparison and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--wav", help="WAV file to transcribe")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.wav:
+        with open(args.wav, "rb") as f:
+            audio_data = f.read()
+    else:
+        audio_data = to_wav(make_clip(args.seconds))
+
+    results = benchmark(args.backends.split(","), audio_data, args.repeat)
+
+    print(
+        f"{'backend':<26} {'load (ms)':>10} {'first (ms)':>11} "
+        f"{'best (ms)':>10} {'median (ms)':>12}"
+    )
+    for r in results:
+        if "error" in r:
+            print(f"{r['backend']:<26} unavailable: {r['error']}")
+            continue
+        print(
+            f"{r['backend']:<26} {r['load_ms']:>10.1f} {r['first_ms']:>11.1f} "
+            f"{r['best_ms']:>10.1f} {r['median_ms']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
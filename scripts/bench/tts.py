@@ -0,0 +1,122 @@
+"""Compare the latency of the text-to-speech backends.
+
+For each backend the one-off load is timed separately from synthesis of
+a set of reply-sized sentences, through text_to_speech as the voice
+service calls it. The espeak backend is also timed starting a fresh
+process per sentence, the cost its pool of ready engines hides. Backends
+that cannot run here (no network for gtts, no espeak-ng for espeak) are
+reported with the error. Run from the project root:
+
+    python -m scripts.bench.tts
+    python -m scripts.bench.tts --backends espeak --repeat 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+# Adding the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core import tts
+from app.core.voice import text_to_speech
+
+SENTENCES = [
+    "Pattern recognition is my superpower.",
+    "I like to break big problems into small, testable pieces.",
+    "Sure.",
+    "I grew up curious about how things work, and that never really went away.",
+]
+
+
+def time_calls(synthesize, repeat):
+    """
+    Time synthesis of every sentence, repeatedly.
+
+    Args:
+        synthesize (callable): Converts one sentence to speech
+        repeat (int): Passes over the sentences
+
+    Returns:
+        dict: First, best, median and p95 call time in ms
+    """
+    timings = []
+    for _ in range(repeat):
+        for sentence in SENTENCES:
+            start = time.perf_counter()
+            synthesize(sentence)
+            timings.append(time.perf_counter() - start)
+    ordered = sorted(timings)
+    return {
+        "first_ms": timings[0] * 1000,
+        "best_ms": ordered[0] * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": ordered[int(0.95 * (len(ordered) - 1))] * 1000,
+    }
+
+
+def benchmark(names, repeat):
+    """
+    Run every backend on the same sentences.
+
+    Args:
+        names (list): Backend names
+        repeat (int): Passes over the sentences per backend
+
+    Returns:
+        list: One result dict per backend, with an error if it could not run
+    """
+    results = []
+    for name in names:
+        backend = tts.BACKENDS[name]()
+        try:
+            start = time.perf_counter()
+            backend.load()
+            load_ms = (time.perf_counter() - start) * 1000
+            with patch.object(tts, "_backend", backend):
+                calls = time_calls(text_to_speech, repeat)
+            results.append({"backend": name, "load_ms": load_ms, **calls})
+
+            # The process start the ready engines take off the request path
+            if name == "espeak":
+                calls = time_calls(
+                    lambda text: backend._render(backend._spawn(), text), repeat
+                )
+                results.append(
+                    {"backend": "espeak (spawn per call)", "load_ms": 0.0, **calls}
+                )
+        except Exception as e:
+            results.append({"backend": name, "error": str(e) or type(e).__name__})
+        finally:
+            backend.close()
+    return results
+
+
+def main():
+    """Parse arguments, run the comparison and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", default=",".join(tts.BACKENDS))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = benchmark(args.backends.split(","), args.repeat)
+
+    print(
+        f"{'backend':<24} {'load (ms)':>10} {'first (ms)':>11} "
+        f"{'best (ms)':>10} {'median (ms)':>12} {'p95 (ms)':>9}"
+    )
+    for r in results:
+        if "error" in r:
+            print(f"{r['backend']:<24} unavailable: {r['error']}")
+            continue
+        print(
+            f"{r['backend']:<24} {r['load_ms']:>10.1f} {r['first_ms']:>11.1f} "
+            f"{r['best_ms']:>10.1f} {r['median_ms']:>12.1f} {r['p95_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
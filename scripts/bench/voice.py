@@ -0,0 +1,229 @@
+"""Micro-benchmarks for the audio hot path in app/core/voice.
+
+Times detect_leading_silence, preprocess_audio, streaming voice activity
+detection over 20 ms frames, the WAV export and the TTS_SPEED change in
+text_to_speech on synthetic clips from 1 s to 10 min, and records the peak
+Python heap (tracemalloc, which includes NumPy buffers) of one extra run
+of each. gTTS is replaced with a stub that
+returns a local MP3 fixture, so no network is used. Encoding the fixture
+and decoding it in text_to_speech need ffmpeg and ffprobe, and those cases
+are skipped without them. Memory used inside the ffmpeg subprocess is not
+counted. Run from the project root:
+
+    python -m scripts.bench.voice
+    python -m scripts.bench.voice --durations 1,60 --json voice.json
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.utils import which
+
+# Adding the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.config import settings
+from app.core.vad import VoiceActivityDetector
+from app.core.voice import detect_leading_silence, preprocess_audio, text_to_speech
+
+
+def make_clip(seconds, frame_rate=16000):
+    """
+    Build a speech-like clip: a modulated tone between stretches of silence.
+
+    Args:
+        seconds (float): Clip length in seconds
+        frame_rate (int): Sample rate in Hz
+
+    Returns:
+        AudioSegment: The synthetic clip
+    """
+    frames = int(seconds * frame_rate)
+    t = np.arange(frames) / frame_rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    signal = 6000 * envelope * np.sin(2 * np.pi * 220 * t)
+    signal[: frames // 5] = 0
+    signal[4 * frames // 5 :] = 0
+    samples = signal.astype(np.int16)
+    return AudioSegment(
+        samples.tobytes(), frame_rate=frame_rate, sample_width=2, channels=1
+    )
+
+
+def to_wav(audio):
+    """Encode a clip as WAV bytes."""
+    buffer = io.BytesIO()
+    audio.export(buffer, format="wav")
+    return buffer.getvalue()
+
+
+def make_mp3_fixture(seconds):
+    """
+    Encode a clip the way gTTS delivers speech: 24 kHz mono MP3.
+
+    Args:
+        seconds (float): Clip length in seconds
+
+    Returns:
+        bytes: The MP3 data
+    """
+    buffer = io.BytesIO()
+    make_clip(seconds, frame_rate=24000).export(buffer, format="mp3", bitrate="32k")
+    return buffer.getvalue()
+
+
+class FixtureTTS:
+    """Stands in for gTTS, writing a fixed MP3 instead of calling Google."""
+
+    mp3 = b""
+
+    def __init__(self, text, lang="en", slow=False):
+        self.text = text
+
+    def write_to_fp(self, fp):
+        """Write the fixture MP3."""
+        fp.write(self.mp3)
+
+
+def measure(func, repeat):
+    """
+    Time a function and measure its peak heap use.
+
+    Args:
+        func (callable): The function to run
+        repeat (int): Number of timed runs
+
+    Returns:
+        dict: Best and median time in ms, and peak traced memory in MiB
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    # Measuring memory in a separate run, since tracing slows allocations down
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "best_ms": min(timings) * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "peak_mib": peak / (1024 * 1024),
+    }
+
+
+def run_vad(clip, frame_ms=20):
+    """Feed a clip to the voice activity detector in frames, like a live stream."""
+    data = clip.raw_data
+    step = int(clip.frame_rate * frame_ms / 1000) * clip.frame_width
+
+    def run():
+        detector = VoiceActivityDetector(clip.frame_rate)
+        for offset in range(0, len(data), step):
+            detector.feed(data[offset : offset + step])
+        detector.flush()
+
+    return run
+
+
+def run_with_speed(speed):
+    """Run text_to_speech with TTS_SPEED set for the call."""
+
+    def run():
+        previous = settings.TTS_SPEED
+        settings.TTS_SPEED = speed
+        try:
+            with patch("app.core.tts.gTTS", FixtureTTS):
+                text_to_speech("benchmark")
+        finally:
+            settings.TTS_SPEED = previous
+
+    return run
+
+
+def benchmark(durations, repeat):
+    """
+    Run every case on every clip length.
+
+    Args:
+        durations (list): Clip lengths in seconds
+        repeat (int): Timed runs for 1 s clips, scaled down for longer ones
+
+    Returns:
+        list: One result dict per case and clip length
+    """
+    have_ffmpeg = bool(
+        (which("ffmpeg") or which("avconv")) and (which("ffprobe") or which("avprobe"))
+    )
+    results = []
+    for seconds in durations:
+        runs = max(1, int(repeat / max(1.0, seconds / 10)))
+        clip = make_clip(seconds)
+        upload = to_wav(clip)
+
+        cases = {
+            "detect_leading_silence": lambda: detect_leading_silence(clip),
+            "preprocess_audio": lambda: preprocess_audio(upload),
+            "vad_stream": run_vad(clip),
+            "wav_export": lambda: to_wav(clip),
+        }
+        if have_ffmpeg:
+            FixtureTTS.mp3 = make_mp3_fixture(seconds)
+            cases["text_to_speech"] = run_with_speed(1.0)
+            cases["text_to_speech_speed_1.25"] = run_with_speed(1.25)
+
+        for name, func in cases.items():
+            results.append(
+                {"case": name, "seconds": seconds, "runs": runs, **measure(func, runs)}
+            )
+
+    if not have_ffmpeg:
+        print(
+            "ffmpeg/ffprobe not found, skipping the text_to_speech cases",
+            file=sys.stderr,
+        )
+    return results
+
+
+def main():
+    """Parse arguments, run the benchmarks and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--durations", default="1,10,60,600", help="seconds")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="also write the results to a JSON file")
+    args = parser.parse_args()
+
+    durations = [float(d) for d in args.durations.split(",")]
+    results = benchmark(durations, args.repeat)
+
+    print(
+        f"{'case':<28} {'clip (s)':>8} {'runs':>5} {'best (ms)':>10} "
+        f"{'median (ms)':>12} {'peak (MiB)':>11}"
+    )
+    for r in results:
+        print(
+            f"{r['case']:<28} {r['seconds']:>8g} {r['runs']:>5} {r['best_ms']:>10.2f} "
+            f"{r['median_ms']:>12.2f} {r['peak_mib']:>11.2f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Measure first-request latency with and without connection warm-up.
+
+Starts a local HTTPS stand-in for the OpenAI API with a self-signed
+certificate (generated with openssl), then times the first chat completion
+on a fresh pooled client, either straight away or after warm_up() opened its
+connections. Each new connection is delayed by --setup-ms to stand in for
+the DNS, TCP and TLS round-trips to a remote provider. Run from the project
+root:
+
+    python -m scripts.bench.warmup --setup-ms 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openai import AsyncOpenAI
+
+# Adding the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.core.http import build_http_client, warm_up
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "bench-model",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "Hello."},
+            "finish_reason": "stop",
+        }
+    ],
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers HEAD requests and chat completions."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_HEAD(self):
+        """Answer a warm-up request."""
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        """Answer a chat completion."""
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(COMPLETION).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep the benchmark output clean."""
+
+
+class StandInServer(ThreadingHTTPServer):
+    """An HTTPS server that delays every new connection before its handshake."""
+
+    daemon_threads = True
+
+    def __init__(self, address, context, setup_delay):
+        super().__init__(address, StandInHandler)
+        self.context = context
+        self.setup_delay = setup_delay
+
+    def finish_request(self, request, client_address):
+        """Delay, complete the TLS handshake, then serve the connection."""
+        time.sleep(self.setup_delay)
+        tls = self.context.wrap_socket(request, server_side=True)
+        super().finish_request(tls, client_address)
+
+
+def make_certificate(directory):
+    """
+    Generate a self-signed certificate for localhost.
+
+    Args:
+        directory (str): Where to write the key and certificate
+
+    Returns:
+        tuple: Paths of the certificate and the key
+    """
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-addext",
+            "subjectAltName=DNS:localhost,IP:127.0.0.1",
+            "-keyout",
+            key,
+            "-out",
+            cert,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+async def first_request(base_url, cert, warm):
+    """
+    Time the first and second completions on a fresh pooled client.
+
+    Args:
+        base_url (str): The stand-in API URL
+        cert (str): Certificate to trust
+        warm (bool): Whether to warm up the connections first
+
+    Returns:
+        tuple: First and second request latency in milliseconds
+    """
+    http_client = build_http_client(verify=cert)
+    client = AsyncOpenAI(api_key="bench", base_url=base_url, http_client=http_client)
+    try:
+        if warm:
+            await warm_up(http_client, base_url)
+
+        latencies = []
+        for _ in range(2):
+            start = time.perf_counter()
+            await client.chat.completions.create(
+                model="bench-model", messages=[{"role": "user", "content": "Hi"}]
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+    finally:
+        await http_client.aclose()
+
+
+async def run(setup_ms, trials):
+    """Run the benchmark and print median latencies."""
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_certificate(directory)
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert, key)
+
+        server = StandInServer(("127.0.0.1", 0), context, setup_ms / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"https://localhost:{server.server_address[1]}/v1"
+
+        print(f"{trials} trials, {setup_ms} ms connection setup")
+        print(f"{'client':>8} {'first (ms)':>11} {'second (ms)':>12}")
+        for warm in (False, True):
+            results = [await first_request(base_url, cert, warm) for _ in range(trials)]
+            first = statistics.median(r[0] for r in results)
+            second = statistics.median(r[1] for r in results)
+            print(f"{'warm' if warm else 'cold':>8} {first:>11.1f} {second:>12.1f}")
+
+        server.shutdown()
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--setup-ms", type=float, default=100.0)
+    parser.add_argument("--trials", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.setup_ms, args.trials))
+
+
+if __name__ == "__main__":
+    main()
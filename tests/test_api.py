@@ -2,10 +2,12 @@
 
 import sys
 import os
+import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch
 import json
 import io
+import base64
 import uuid
 
 # Add the project root directory to the Python path
@@ -92,4 +94,341 @@ def test_voice_endpoint(
     mock_generate_response.assert_called_once_with(
         "What's your superpower?", test_conversation_id
     )
-    mock_text_to_speech.assert_called_once_with("Pattern recognition is my superpower.")
+    mock_text_to_speech.assert_called_once_with(
+        "Pattern recognition is my superpower.", audio_format="wav"
+    )
+
+
+@patch("app.services.voice_service.VoiceService.speech_to_text")
+@patch("app.services.chat_service.ChatService.generate_response")
+@patch("app.services.voice_service.VoiceService.text_to_speech")
+def test_voice_endpoint_negotiates_format(
+    mock_text_to_speech, mock_generate_response, mock_speech_to_text
+):
+    """Test that the voice endpoint replies in the format the client accepts."""
+    mock_speech_to_text.return_value = "What's your superpower?"
+    mock_generate_response.return_value = "Pattern recognition."
+    mock_text_to_speech.return_value = b"mp3_data"
+
+    response = client.post(
+        "/api/voice",
+        files={"audio": ("test.wav", io.BytesIO(b"test_audio_data"), "audio/wav")},
+        headers={"Accept": "audio/mpeg, audio/wav;q=0.5"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/mpeg"
+    assert response.headers["Vary"] == "Accept"
+    assert response.content == b"mp3_data"
+    mock_text_to_speech.assert_called_once_with(
+        "Pattern recognition.", audio_format="mp3"
+    )
+
+    # An unsupported format is refused before any speech is recognized
+    mock_speech_to_text.reset_mock()
+    response = client.post(
+        "/api/voice",
+        files={"audio": ("test.wav", io.BytesIO(b"test_audio_data"), "audio/wav")},
+        data={"audio_format": "flac"},
+    )
+    assert response.status_code == 400
+    mock_speech_to_text.assert_not_called()
+
+
+@patch("app.services.chat_service.ChatService.stream_response")
+def test_chat_endpoint_streaming(mock_stream_response):
+    """Test the chat endpoint in streaming mode."""
+
+    # Mock the streamed deltas
+    async def fake_stream(message, conversation_id):
+        for delta in ["Pattern ", "recognition."]:
+            yield delta
+
+    mock_stream_response.side_effect = fake_stream
+
+    # Test payload
+    test_payload = {
+        "message": "What's your superpower?",
+        "conversation_id": str(uuid.uuid4()),
+        "stream": True,
+    }
+
+    # Send request
+    response = client.post("/api/chat", json=test_payload)
+
+    # Check response
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [e for e in response.text.split("\n\n") if e]
+    assert events[0] == 'data: {"delta": "Pattern "}'
+    assert events[1] == 'data: {"delta": "recognition."}'
+    assert events[2].startswith("event: done\n")
+    done = json.loads(events[2].split("data: ", 1)[1])
+    assert done["response"] == "Pattern recognition."
+    assert done["conversation_id"] == test_payload["conversation_id"]
+
+
+@patch("app.services.voice_service.VoiceService.speech_to_text")
+@patch("app.services.chat_service.ChatService.stream_response")
+@patch("app.services.voice_service.VoiceService.text_to_speech")
+def test_voice_endpoint_streaming(
+    mock_text_to_speech, mock_stream_response, mock_speech_to_text
+):
+    """Test the voice endpoint in sentence-pipelined streaming mode."""
+
+    # Mock the responses
+    async def fake_stream(message, conversation_id):
+        for delta in ["Pattern recognition. ", "It helps."]:
+            yield delta
+
+    mock_speech_to_text.return_value = "What's your superpower?"
+    mock_stream_response.side_effect = fake_stream
+    mock_text_to_speech.side_effect = lambda text, audio_format="wav": text.encode()
+
+    # Send request
+    response = client.post(
+        "/api/voice",
+        files={"audio": ("test.wav", io.BytesIO(b"test_audio_data"), "audio/wav")},
+        data={"stream": "true"},
+    )
+
+    # Check response
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line.get("text") for line in lines[:2]] == [
+        "Pattern recognition.",
+        "It helps.",
+    ]
+    assert base64.b64decode(lines[0]["audio"]) == b"Pattern recognition."
+    assert lines[-1]["done"] is True
+    assert lines[-1]["response"] == "Pattern recognition. It helps."
+    assert lines[-1]["conversation_id"] == response.headers["X-Conversation-ID"]
+
+
+def test_stats_endpoint():
+    """Test the stats endpoint."""
+    response = client.get("/api/stats")
+    assert response.status_code == 200
+    assert "evictions" in response.json()["conversations"]
+    assert "hits" in response.json()["response_cache"]
+    assert "disk" in response.json()["tts_cache"]
+
+
+def test_providers_endpoint():
+    """Test that the providers endpoint reports circuit breaker state."""
+    response = client.get("/api/providers")
+    assert response.status_code == 200
+    assert set(response.json()["providers"]) == {"openai", "groq"}
+    assert response.json()["providers"]["openai"]["state"] == "closed"
+    assert response.json()["failovers"] == {"openai": 0, "groq": 0}
+
+
+@patch("app.services.voice_service.VoiceService.speech_to_text")
+def test_voice_endpoint_saturated(mock_speech_to_text):
+    """Test that a saturated voice pool answers 503 right away."""
+    from app.core.executor import ExecutorSaturated
+
+    mock_speech_to_text.side_effect = ExecutorSaturated("full")
+
+    response = client.post(
+        "/api/voice",
+        files={"audio": ("test.wav", io.BytesIO(b"test_audio_data"), "audio/wav")},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+@patch("app.services.voice_service.VoiceService.speech_to_text")
+@patch("app.services.chat_service.ChatService.stream_response")
+@patch("app.services.voice_service.VoiceService.text_to_speech")
+def test_voice_websocket(
+    mock_text_to_speech, mock_stream_response, mock_speech_to_text
+):
+    """Test a voice turn over the WebSocket endpoint."""
+
+    # Mock the responses
+    async def fake_stream(message, conversation_id):
+        for delta in ["Pattern recognition. ", "It helps."]:
+            yield delta
+
+    mock_speech_to_text.return_value = "What's your superpower?"
+    mock_stream_response.side_effect = fake_stream
+    mock_text_to_speech.side_effect = lambda text, audio_format="wav": text.encode()
+
+    silence = bytes(3200)
+    speech = (b"\x00\x40\x00\xc0" * 800) * 5
+
+    with client.websocket_connect("/api/voice/ws") as websocket:
+        websocket.send_json({"type": "start", "sample_rate": 16000})
+        ready = websocket.receive_json()
+        assert ready["type"] == "ready"
+
+        for frame in [silence, silence, speech]:
+            websocket.send_bytes(frame)
+        websocket.send_json({"type": "end"})
+
+        assert websocket.receive_json() == {
+            "type": "transcript",
+            "text": "What's your superpower?",
+        }
+        first = websocket.receive_json()
+        assert first["text"] == "Pattern recognition."
+        assert websocket.receive_bytes() == b"Pattern recognition."
+        second = websocket.receive_json()
+        assert second["index"] == 1
+        assert websocket.receive_bytes() == b"It helps."
+        done = websocket.receive_json()
+        assert done["response"] == "Pattern recognition. It helps."
+        assert done["conversation_id"] == ready["conversation_id"]
+
+        websocket.send_json({"type": "stop"})
+
+    # Leading silence never reaches speech recognition
+    wav = mock_speech_to_text.call_args[0][0]
+    assert len(wav) - 44 == len(speech)
+
+
+@patch("app.services.voice_service.VoiceService.speech_to_text")
+@patch("app.services.chat_service.ChatService.stream_response")
+@patch("app.services.voice_service.VoiceService.text_to_speech")
+def test_voice_websocket_endpoints_on_silence(
+    mock_text_to_speech, mock_stream_response, mock_speech_to_text
+):
+    """Test that a pause after speech ends the utterance without an end message."""
+
+    async def fake_stream(message, conversation_id):
+        yield "Sure."
+
+    mock_speech_to_text.return_value = "Hello"
+    mock_stream_response.side_effect = fake_stream
+    mock_text_to_speech.side_effect = lambda text, audio_format="wav": text.encode()
+
+    speech = (b"\x00\x40\x00\xc0" * 800) * 5
+
+    with client.websocket_connect("/api/voice/ws") as websocket:
+        websocket.send_json({"type": "start"})
+        websocket.receive_json()
+
+        websocket.send_bytes(speech)
+        websocket.send_bytes(bytes(16000))
+
+        assert websocket.receive_json() == {"type": "transcript", "text": "Hello"}
+        assert websocket.receive_json()["text"] == "Sure."
+        assert websocket.receive_bytes() == b"Sure."
+        assert websocket.receive_json()["type"] == "done"
+
+        websocket.send_json({"type": "stop"})
+
+
+def test_voice_websocket_rejects_opus():
+    """Test that an unsupported encoding is refused."""
+    with client.websocket_connect("/api/voice/ws") as websocket:
+        websocket.send_json({"type": "start", "encoding": "opus"})
+        message = websocket.receive_json()
+        assert message["type"] == "error"
+        assert "pcm_s16le" in message["detail"]
+
+
+@pytest.mark.parametrize("sample_rate", ["abc", 0, -16000, None])
+def test_voice_websocket_rejects_bad_sample_rate(sample_rate):
+    """Test that a bad sample rate is refused and the session stays open."""
+    with client.websocket_connect("/api/voice/ws") as websocket:
+        websocket.send_json({"type": "start", "sample_rate": sample_rate})
+        message = websocket.receive_json()
+        assert message["type"] == "error"
+        assert "sample_rate" in message["detail"]
+
+        # A valid start message still works on the same connection
+        websocket.send_json({"type": "start", "sample_rate": 16000})
+        assert websocket.receive_json()["type"] == "ready"
+
+
+@patch("app.services.chat_service.ChatService._generate")
+def test_chat_batch_endpoint(mock_generate):
+    """Test that a batch fans out concurrently and keeps request order."""
+    import asyncio
+    import time
+
+    active = 0
+    peak = 0
+    turns = []
+
+    async def fake_generate(provider, conversation_key, message):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        turns.append(message)
+        try:
+            await asyncio.sleep(0.1 if message == "slow" else 0.05)
+            if message == "fail":
+                raise ValueError("provider exploded")
+            return f"answer to {message}"
+        finally:
+            active -= 1
+
+    mock_generate.side_effect = fake_generate
+
+    # Test payload, with two turns of the same conversation
+    payload = {
+        "items": [
+            {"message": "slow"},
+            {"message": "fail"},
+            {"message": "first turn", "conversation_id": "shared"},
+            {"message": "second turn", "conversation_id": "shared"},
+        ]
+        + [{"message": f"q{i}"} for i in range(6)],
+        "concurrency": 8,
+    }
+
+    start = time.perf_counter()
+    response = client.post("/api/chat/batch", json=payload)
+    elapsed = time.perf_counter() - start
+
+    # Check results come back in order with per-item errors
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == list(range(10))
+    assert results[0]["response"] == "answer to slow"
+    assert results[1]["response"] is None
+    assert results[1]["error"] == "provider exploded"
+    assert results[2]["conversation_id"] == results[3]["conversation_id"] == "shared"
+
+    # Check the fan-out was concurrent but bounded, and turns stayed ordered
+    assert 1 < peak <= 8
+    assert turns.index("first turn") < turns.index("second turn")
+    assert elapsed < 0.45
+
+
+def test_chat_batch_endpoint_reports_provider_errors(monkeypatch):
+    """Test that failed provider calls are reported per item, not as apologies."""
+    from app.api.endpoints import chat_service
+    from app.services.providers import FakeProvider, ProviderRouter
+
+    groq = FakeProvider("groq", error_rate=1.0)
+    openai_provider = FakeProvider("openai", error_rate=1.0)
+    monkeypatch.setitem(
+        chat_service.routers, "groq", ProviderRouter(groq, openai_provider, hedge=False)
+    )
+
+    payload = {
+        "items": [{"message": "Hello", "conversation_id": "batch-errors"}],
+        "provider": "groq",
+    }
+    response = client.post("/api/chat/batch", json=payload)
+
+    # Check the failure surfaced in the item's error field
+    assert response.status_code == 200
+    result = response.json()["results"][0]
+    assert result["response"] is None
+    assert result["error"].endswith("request failed")
+    assert groq.calls == 1
+
+    # Check the turn went to the Groq conversation key
+    assert chat_service.conversations["groq_batch-errors"][-1]["content"] == "Hello"
+
+
+def test_chat_batch_endpoint_validation():
+    """Test that empty batches are rejected."""
+    response = client.post("/api/chat/batch", json={"items": []})
+    assert response.status_code == 422
@@ -0,0 +1,46 @@
+"""Smoke tests for the benchmark scripts."""
+
+import sys
+import os
+import json
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_load_harness_runs_every_endpoint():
+    """Test that one short load run gets a good answer from every endpoint."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "scripts.bench.load",
+            "--endpoints",
+            "chat,chat-groq,voice",
+            "--concurrency",
+            "3",
+            "--duration",
+            "0.2",
+            "--warmup",
+            "0",
+            "--openai-latency",
+            "0.01",
+            "--groq-latency",
+            "0.01",
+            "--stt-latency",
+            "0.01",
+            "--tts-latency",
+            "0.01",
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+
+    # Each worker sends at least one request, so every endpoint is hit
+    report = json.loads(result.stdout)
+    for endpoint, stats in report["endpoints"].items():
+        assert stats["requests"] >= 1, endpoint
+        assert stats["status"] == {"200": stats["requests"]}, (endpoint, stats)
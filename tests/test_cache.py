@@ -0,0 +1,99 @@
+"""Tests for the in-memory caches."""
+
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.cache import AudioCache, TTLCache
+
+
+class FakeClock:
+    """A manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # Touching "a" makes "b" the least recently used
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+        "expirations": 0,
+    }
+
+
+def test_ttl_cache_expiry():
+    """Test that entries expire after the TTL."""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+
+    clock.now = 5.0
+    assert cache.get("a", "missing") == "missing"
+    assert len(cache) == 0
+    assert cache.expirations == 1
+
+
+def test_ttl_cache_disabled():
+    """Test that a zero-sized cache stores nothing."""
+    cache = TTLCache(maxsize=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_audio_cache_disk_tier(tmp_path):
+    """Test that the disk tier persists entries and stays under its byte cap."""
+    cache = AudioCache(maxsize=1, directory=str(tmp_path), max_bytes=10)
+    first, second = AudioCache.key("hello", "en", 1.0), AudioCache.key("bye", "en", 1.0)
+    cache.set(first, b"12345")
+    cache.set(second, b"67890")
+
+    # The first entry fell out of memory but is still on disk
+    assert cache.get(first) is None
+    assert cache.load(first) == b"12345"
+    assert cache.get(first) == b"12345"
+
+    # A restarted cache sees the same entries
+    restarted = AudioCache(maxsize=1, directory=str(tmp_path), max_bytes=10)
+    assert restarted.load(second) == b"67890"
+
+    # Going over the cap deletes the least recently used entry
+    restarted.set(AudioCache.key("again", "en", 1.0), b"abcde")
+    assert restarted.load(first) is None
+    assert restarted.stats()["disk"]["bytes"] == 10
+    assert restarted.stats()["disk"]["evictions"] == 1
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [second, AudioCache.key("again", "en", 1.0)]
+    )
+
+
+def test_audio_cache_key():
+    """Test that every voice parameter changes the content address."""
+    key = AudioCache.key("hello", "en", 1.0, "wav")
+    assert key == AudioCache.key("hello", "en", 1.0, "wav")
+    assert key != AudioCache.key("hello", "en", 1.25, "wav")
+    assert key != AudioCache.key("hello", "en", 1.0, "mp3")
+    assert key != AudioCache.key("hello", "fr", 1.0, "wav")
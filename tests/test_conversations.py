@@ -0,0 +1,132 @@
+"""Tests for the conversation store."""
+
+import sys
+import os
+import time
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.conversations import ConversationStore, message_size
+
+
+class FakeClock:
+    """A manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_store(**kwargs):
+    """Build a store with generous defaults."""
+    options = {"max_conversations": 100, "max_bytes": 10**9, "idle_ttl": 60}
+    options.update(kwargs)
+    return ConversationStore(**options)
+
+
+def test_store_lru_eviction_by_count():
+    """Test that the least recently used conversation is evicted first."""
+    store = make_store(max_conversations=2)
+    store["a"] = [{"role": "system", "content": "a"}]
+    store["b"] = [{"role": "system", "content": "b"}]
+
+    # Touching "a" makes "b" the least recently used
+    assert "a" in store
+    store["c"] = [{"role": "system", "content": "c"}]
+
+    assert "b" not in store
+    assert "a" in store and "c" in store
+    assert store.stats()["evictions"] == 1
+
+
+def test_store_eviction_by_bytes():
+    """Test that the byte cap is enforced as messages are appended."""
+    message = {"role": "user", "content": "x" * 100}
+    store = make_store(max_bytes=3 * message_size(message))
+    store["a"] = [dict(message)]
+    store["b"] = [dict(message)]
+    store.append("b", dict(message))
+    assert store.stats()["bytes"] == 3 * message_size(message)
+
+    # Growing "b" further pushes "a" out, but never "b" itself
+    store.append("b", dict(message))
+    assert "a" not in store
+    store.append("b", dict(message))
+    assert len(store["b"]) == 4
+    assert store.stats()["bytes"] == 4 * message_size(message)
+
+
+def test_store_idle_expiry():
+    """Test that idle conversations expire on lookup and when swept."""
+    clock = FakeClock()
+    store = make_store(idle_ttl=10, clock=clock)
+    store["a"] = [{"role": "system", "content": "a"}]
+    store["b"] = [{"role": "system", "content": "b"}]
+
+    clock.now = 5
+    assert store.get("b") is not None
+
+    clock.now = 12
+    assert store.sweep() == 1
+    assert "a" not in store
+    assert "b" in store
+
+    clock.now = 30
+    assert store.get("b") is None
+    assert store.stats()["expirations"] == 2
+    assert store.stats()["bytes"] == 0
+
+
+def test_store_background_sweeper():
+    """Test that the sweeper thread removes expired conversations."""
+    store = make_store(idle_ttl=0.01, sweep_interval=0.01)
+    store["a"] = [{"role": "system", "content": "a"}]
+    try:
+        deadline = time.monotonic() + 2
+        while len(store) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(store) == 0
+    finally:
+        store.stop_sweeper()
+
+
+def test_store_token_window():
+    """Test that windows keep the system message and the newest turns that fit."""
+    counted = []
+
+    def counter(message):
+        counted.append(message["content"])
+        return len(message["content"])
+
+    store = make_store(token_counter=counter)
+    store["a"] = [{"role": "system", "content": "s" * 10}]
+    for role, content in [
+        ("user", "u" * 5),
+        ("assistant", "a" * 20),
+        ("user", "u" * 5),
+        ("assistant", "a" * 5),
+        ("user", "u" * 5),
+    ]:
+        store.append("a", {"role": role, "content": content})
+
+    # Counts are taken once per message, never again when windowing
+    assert len(counted) == 6
+    window = store.window("a", budget=30)
+    assert [len(m["content"]) for m in window] == [10, 5, 5, 5]
+    assert len(counted) == 6
+
+    # The system message does not count against the budget
+    assert len(store.window("a", budget=40)) == 6
+
+    # The previous user/assistant pair is kept even when it goes over the budget
+    assert [len(m["content"]) for m in store.window("a", budget=1)] == [10, 5, 5, 5]
+
+    # Trimming drops whole turns outside the window from storage
+    bytes_before = store.stats()["bytes"]
+    store.trim("a", budget=30)
+    assert store["a"] == window
+    assert store["a"][1]["role"] == "user"
+    assert store.stats()["bytes"] < bytes_before
@@ -0,0 +1,47 @@
+"""Tests for the bounded executor."""
+
+import sys
+import os
+import asyncio
+import threading
+import pytest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.executor import BoundedExecutor, ExecutorSaturated
+
+
+@pytest.mark.asyncio
+async def test_bounded_executor_rejects_when_full():
+    """Test that work beyond workers + queue is rejected immediately."""
+    executor = BoundedExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    try:
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+
+        # Verify the gauges while one job runs and one waits
+        stats = executor.stats()
+        assert stats["running"] == 1
+        assert stats["queue_depth"] == 1
+
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(lambda: "rejected")
+
+        release.set()
+        assert await running is True
+        assert await queued == "queued"
+
+        # Verify the slots were released
+        assert await executor.run(lambda: "accepted") == "accepted"
+        stats = executor.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 3
+        assert stats["queue_depth"] == 0
+        assert stats["wait_time_max_ms"] > 0
+    finally:
+        release.set()
+        executor.shutdown()
@@ -0,0 +1,63 @@
+"""Tests for the pooled provider HTTP clients."""
+
+import sys
+import os
+import httpx
+import pytest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings
+from app.core.http import build_http_client, warm_up
+from app.services.chat_service import ChatService
+
+
+def test_build_http_client_uses_pool_settings(monkeypatch):
+    """Test that the pooled client picks up the connection settings."""
+    monkeypatch.setattr(settings, "HTTP_TIMEOUT", 12.0)
+    monkeypatch.setattr(settings, "HTTP_CONNECT_TIMEOUT", 3.0)
+
+    client = build_http_client()
+
+    assert client.timeout.read == 12.0
+    assert client.timeout.connect == 3.0
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_requested_connections():
+    """Test that warm-up sends one request per connection and tolerates errors."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(404)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    assert await warm_up(client, "https://api.example.com/v1", connections=3) == 3
+    assert [r.method for r in requests] == ["HEAD"] * 3
+
+    def failing(request):
+        raise httpx.ConnectError("unreachable")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(failing))
+    assert await warm_up(client, "https://api.example.com/v1", connections=2) == 0
+
+
+@pytest.mark.asyncio
+async def test_chat_service_start_uses_pooled_clients(monkeypatch):
+    """Test that start() moves both providers onto pooled clients and close() frees them."""
+    monkeypatch.setattr(settings, "HTTP_WARM_UP", False)
+    monkeypatch.setattr(settings, "GROQ_BASE_URL", "https://groq.example.com")
+
+    chat_service = ChatService()
+    await chat_service.start()
+
+    http_clients = dict(chat_service.http_clients)
+    assert chat_service.openai_client._client is http_clients["openai"]
+    assert chat_service.groq_client._client is http_clients["groq"]
+    assert str(chat_service.groq_client.base_url).startswith("https://groq.example.com")
+
+    await chat_service.close()
+    assert all(client.is_closed for client in http_clients.values())
+    assert chat_service.http_clients == {}
@@ -0,0 +1,131 @@
+"""Tests for the Prometheus metrics."""
+
+import sys
+import os
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.metrics import (
+    LLM_FIRST_TOKEN_SECONDS,
+    LLM_IN_FLIGHT,
+    LLM_SECONDS,
+    TTS_SECONDS,
+    CallbackMetric,
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+)
+from app.main import app
+from app.services.providers import FakeProvider, ProviderRouter
+from app.services.voice_service import VoiceService
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test that histogram buckets are cumulative and include +Inf."""
+    registry = Registry()
+    histogram = registry.register(
+        Histogram("test_seconds", "Test latency", ["stage"], buckets=(0.1, 1.0))
+    )
+    child = histogram.labels("stt")
+    for value in (0.05, 0.1, 0.5, 2.0):
+        child.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE test_seconds histogram" in lines
+    assert 'test_seconds_bucket{stage="stt",le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{stage="stt",le="1"} 3' in lines
+    assert 'test_seconds_bucket{stage="stt",le="+Inf"} 4' in lines
+    assert 'test_seconds_sum{stage="stt"} 2.65' in lines
+    assert 'test_seconds_count{stage="stt"} 4' in lines
+
+
+def test_counter_gauge_and_callback_metrics():
+    """Test counters, gauges, label escaping and scrape-time callbacks."""
+    registry = Registry()
+    counter = registry.register(Counter("test_requests_total", "Requests"))
+    gauge = registry.register(Gauge("test_in_flight", "In flight", ["path"]))
+    registry.register(
+        CallbackMetric("test_queue_depth", "Queue depth", "gauge", lambda: [([], 7)])
+    )
+
+    counter.inc()
+    counter.inc(2)
+    gauge.labels('a"b').inc()
+    gauge.labels('a"b').inc()
+    gauge.labels('a"b').dec()
+
+    lines = registry.render().splitlines()
+
+    assert "test_requests_total 3" in lines
+    assert 'test_in_flight{path="a\\"b"} 1' in lines
+    assert "test_queue_depth 7" in lines
+
+
+@patch("app.services.chat_service.ChatService.generate_response")
+def test_metrics_endpoint(mock_generate_response):
+    """Test that the metrics endpoint reports request and service metrics."""
+    mock_generate_response.return_value = "This is a test response"
+    client.post(
+        "/api/chat",
+        json={"message": "Hello", "conversation_id": str(uuid.uuid4())},
+    )
+
+    response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'voicebot_request_duration_seconds_count{path="/api/chat"}' in body
+    assert 'voicebot_requests_in_flight{path="/api/chat"} 0' in body
+    assert "voicebot_stt_duration_seconds_count " in body
+    assert 'voicebot_cache_hits_total{cache="response"}' in body
+    assert "voicebot_voice_executor_queue_depth 0" in body
+    assert "voicebot_conversations " in body
+
+
+@pytest.mark.asyncio
+async def test_router_records_on_bound_children(monkeypatch):
+    """Test that routed requests use the metric children bound up front."""
+    router = ProviderRouter(FakeProvider("bound"), hedge=False)
+
+    def no_lookup(*values):
+        raise AssertionError("labels() looked up on the hot path")
+
+    for metric in (LLM_IN_FLIGHT, LLM_SECONDS, LLM_FIRST_TOKEN_SECONDS):
+        monkeypatch.setattr(metric, "labels", no_lookup)
+
+    messages = [{"role": "user", "content": "Hello"}]
+    await router.complete(messages, 150, 0.7)
+    assert [delta async for delta in router.stream(messages, 150, 0.7)]
+
+    in_flight, complete_seconds, first_token_seconds = router.metrics["bound"]
+    assert in_flight.value == 0
+    assert complete_seconds.count == 1
+    assert first_token_seconds.count == 1
+
+
+@pytest.mark.asyncio
+async def test_voice_service_records_tts_on_bound_child(monkeypatch):
+    """Test that synthesis time goes to the child bound for the engine."""
+    voice_service = VoiceService()
+    monkeypatch.setattr(
+        "app.services.voice_service.tts", lambda text, audio_format="wav": b"RIFF"
+    )
+
+    def no_lookup(*values):
+        raise AssertionError("labels() looked up on the hot path")
+
+    monkeypatch.setattr(TTS_SECONDS, "labels", no_lookup)
+    count = voice_service.tts_seconds.count
+
+    assert await voice_service.text_to_speech("Bound metrics.") == b"RIFF"
+    assert voice_service.tts_seconds.count == count + 1
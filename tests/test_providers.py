@@ -0,0 +1,274 @@
+"""Tests for the chat providers and the hedging router."""
+
+import sys
+import os
+import asyncio
+import random
+import time
+import pytest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.providers import CircuitBreaker, FakeProvider, ProviderRouter
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+class GatedProvider(FakeProvider):
+    """A fake provider whose stream starts when a gate opens and records closing."""
+
+    def __init__(self, name: str, gate: asyncio.Event):
+        super().__init__(name, reply=f"from {name}")
+        self.gate = gate
+        self.closed = False
+
+    async def stream(self, messages, max_tokens, temperature):
+        try:
+            await self.gate.wait()
+            yield self.reply
+        finally:
+            self.closed = True
+
+
+def long_tail(seed: int):
+    """Latency that is usually 10 ms but 300 ms one time in ten."""
+    rng = random.Random(seed)
+    return lambda: 0.3 if rng.random() < 0.1 else 0.01
+
+
+async def p99_latency(router: ProviderRouter, requests: int = 50) -> float:
+    """Send requests one after another and return their p99 latency."""
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await router.complete(MESSAGES, 150, 0.7)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return latencies[int(0.99 * len(latencies)) - 1]
+
+
+@pytest.mark.asyncio
+async def test_router_without_hedge_uses_primary_only():
+    """Test that an unhedged router only ever calls the primary."""
+    primary = FakeProvider("primary", reply="from primary")
+    secondary = FakeProvider("secondary", reply="from secondary")
+    router = ProviderRouter(primary, secondary, hedge=False)
+
+    assert await router.complete(MESSAGES, 150, 0.7) == "from primary"
+    assert secondary.calls == 0
+    assert router.hedged == 0
+
+
+@pytest.mark.asyncio
+async def test_router_hedges_slow_primary_and_cancels_it():
+    """Test that a late primary is hedged and the losing request cancelled."""
+    primary = FakeProvider("primary", latency=1.0, reply="from primary")
+    secondary = FakeProvider("secondary", latency=0.01, reply="from secondary")
+    router = ProviderRouter(primary, secondary, initial_hedge_delay=0.05)
+
+    started = time.perf_counter()
+    response = await router.complete(MESSAGES, 150, 0.7)
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0)
+
+    assert response == "from secondary"
+    assert elapsed < 0.5
+    assert primary.cancelled == 1
+    assert router.hedged == 1
+    assert router.hedge_wins == 1
+
+
+@pytest.mark.asyncio
+async def test_router_fast_primary_is_not_hedged():
+    """Test that a primary answering within the delay never fires the hedge."""
+    primary = FakeProvider("primary", latency=0.01, reply="from primary")
+    secondary = FakeProvider("secondary", reply="from secondary")
+    router = ProviderRouter(primary, secondary, initial_hedge_delay=0.2)
+
+    assert await router.complete(MESSAGES, 150, 0.7) == "from primary"
+    assert secondary.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_router_hedges_immediately_on_primary_error():
+    """Test that a failing primary falls through to the secondary."""
+    primary = FakeProvider("primary", error_rate=1.0)
+    secondary = FakeProvider("secondary", reply="from secondary")
+    router = ProviderRouter(primary, secondary, initial_hedge_delay=1.0)
+
+    started = time.perf_counter()
+    assert await router.complete(MESSAGES, 150, 0.7) == "from secondary"
+    assert time.perf_counter() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_router_raises_when_every_provider_fails():
+    """Test that the last error is raised if both providers fail."""
+    router = ProviderRouter(
+        FakeProvider("primary", error_rate=1.0),
+        FakeProvider("secondary", error_rate=1.0),
+    )
+
+    with pytest.raises(RuntimeError):
+        await router.complete(MESSAGES, 150, 0.7)
+
+
+@pytest.mark.asyncio
+async def test_router_hedge_delay_tracks_primary_quantile():
+    """Test that the hedge delay follows the primary's latency quantile."""
+    primary = FakeProvider("primary", latency=0.02)
+    router = ProviderRouter(
+        primary, FakeProvider("secondary"), min_hedge_delay=0.001, min_samples=5
+    )
+    assert router.hedge_delay() == router.initial_hedge_delay
+
+    for _ in range(5):
+        await router.complete(MESSAGES, 150, 0.7)
+
+    assert 0.02 <= router.hedge_delay() < 0.1
+
+
+@pytest.mark.asyncio
+async def test_router_hedging_reduces_tail_latency():
+    """Test that hedging cuts the p99 of a long-tailed primary."""
+    unhedged = ProviderRouter(
+        FakeProvider("primary", latency=long_tail(1)),
+        FakeProvider("secondary", latency=0.02),
+        hedge=False,
+    )
+    hedged = ProviderRouter(
+        FakeProvider("primary", latency=long_tail(1)),
+        FakeProvider("secondary", latency=0.02),
+        hedge_quantile=0.8,
+        min_hedge_delay=0.02,
+        initial_hedge_delay=0.05,
+    )
+
+    unhedged_p99 = await p99_latency(unhedged)
+    hedged_p99 = await p99_latency(hedged)
+
+    assert unhedged_p99 >= 0.3
+    assert hedged_p99 < 0.15
+    assert hedged.hedged < 15
+
+
+@pytest.mark.asyncio
+async def test_router_stream_hedges_on_first_token():
+    """Test that a stream whose first token is late switches providers."""
+    primary = FakeProvider("primary", latency=1.0, reply="from primary")
+    secondary = FakeProvider("secondary", latency=0.01, reply="from secondary")
+    router = ProviderRouter(primary, secondary, initial_hedge_delay=0.05)
+
+    deltas = [delta async for delta in router.stream(MESSAGES, 150, 0.7)]
+    await asyncio.sleep(0)
+
+    assert "".join(deltas) == "from secondary"
+    assert primary.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_router_stream_closes_loser_finishing_with_winner():
+    """Test that a hedged stream finishing alongside the winner is closed."""
+    gate = asyncio.Event()
+    primary = GatedProvider("primary", gate)
+    secondary = GatedProvider("secondary", gate)
+    router = ProviderRouter(primary, secondary, initial_hedge_delay=0.01)
+
+    async def consume():
+        return [delta async for delta in router.stream(MESSAGES, 150, 0.7)]
+
+    task = asyncio.ensure_future(consume())
+    await asyncio.sleep(0.05)
+    assert router.hedged == 1
+
+    # Both first tokens arrive in the same loop iteration
+    gate.set()
+    deltas = await task
+
+    assert "".join(deltas) in ("from primary", "from secondary")
+    assert primary.closed and secondary.closed
+
+
+def test_breaker_opens_on_error_rate():
+    """Test that the circuit opens once the error rate crosses its threshold."""
+    breaker = CircuitBreaker(error_threshold=0.5, min_requests=3, alpha=0.5)
+
+    breaker.record_success(0.1)
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure(0.1)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow() is False
+    assert breaker.stats()["reason"].startswith("error rate")
+
+
+def test_breaker_opens_on_latency():
+    """Test that the circuit opens once the latency crosses its threshold."""
+    breaker = CircuitBreaker(latency_threshold=1.0, min_requests=2, alpha=0.5)
+
+    breaker.record_success(0.2)
+    breaker.record_success(3.0)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()["reason"].startswith("latency")
+
+
+def test_breaker_half_open_probe():
+    """Test that an open circuit lets one probe through and closes on success."""
+    breaker = CircuitBreaker(min_requests=1, open_seconds=0.0)
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # One probe at a time once the open period is over
+    assert breaker.allow() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is False
+
+    # A failed probe opens the circuit again, a good one closes it
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow() is True
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.error_rate == 0.0
+
+
+@pytest.mark.asyncio
+async def test_router_fails_over_while_circuit_is_open():
+    """Test that requests skip a primary with an open circuit."""
+    primary = FakeProvider("primary", error_rate=1.0)
+    secondary = FakeProvider("secondary", reply="from secondary")
+    breakers = {
+        "primary": CircuitBreaker(min_requests=2, open_seconds=60),
+        "secondary": CircuitBreaker(),
+    }
+    router = ProviderRouter(primary, secondary, hedge=False, breakers=breakers)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await router.complete(MESSAGES, 150, 0.7)
+    assert breakers["primary"].state == CircuitBreaker.OPEN
+
+    assert await router.complete(MESSAGES, 150, 0.7) == "from secondary"
+    assert primary.calls == 2
+    assert router.failovers == 1
+
+
+@pytest.mark.asyncio
+async def test_router_probes_recovered_primary():
+    """Test that a half-open primary gets a probe and takes traffic back."""
+    primary = FakeProvider("primary", reply="from primary")
+    secondary = FakeProvider("secondary", reply="from secondary")
+    breakers = {
+        "primary": CircuitBreaker(min_requests=1, open_seconds=0.05),
+        "secondary": CircuitBreaker(),
+    }
+    router = ProviderRouter(primary, secondary, hedge=False, breakers=breakers)
+    breakers["primary"].record_failure(0.1)
+
+    assert await router.complete(MESSAGES, 150, 0.7) == "from secondary"
+    await asyncio.sleep(0.06)
+    assert await router.complete(MESSAGES, 150, 0.7) == "from primary"
+    assert breakers["primary"].state == CircuitBreaker.CLOSED
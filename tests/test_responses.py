@@ -8,7 +8,13 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # THEN import from the app module
-from app.core.responses import get_response_context, PERSONAL_INFO, QUESTION_MAPPINGS
+from app.core.matcher import KeywordMatcher
+from app.core.responses import (
+    get_response_context,
+    reload_mappings,
+    PERSONAL_INFO,
+    QUESTION_MAPPINGS,
+)
 
 
 def test_get_response_context_life_story():
@@ -90,3 +96,45 @@ def test_question_mappings_coverage():
         assert (
             info_key in PERSONAL_INFO
         ), f"Key '{info_key}' from QUESTION_MAPPINGS not found in PERSONAL_INFO"
+
+
+def test_keyword_matcher_matches_linear_scan():
+    """Test that the automaton agrees with a first-match linear scan."""
+    import random
+
+    rng = random.Random(0)
+    alphabet = "abc "
+    for _ in range(200):
+        keywords = {
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 5))): i
+            for i in range(rng.randint(1, 12))
+        }
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        expected = next((v for k, v in keywords.items() if k in text), None)
+        assert KeywordMatcher(keywords).match(text) == expected
+
+
+def test_keyword_matcher_priority():
+    """Test that the earliest mapping wins wherever the keywords occur."""
+    matcher = KeywordMatcher({"best at": "superpower", "life story": "life_story"})
+    assert matcher.match("your life story and what you're best at") == "superpower"
+    assert matcher.match("nothing relevant") is None
+
+
+def test_reload_mappings():
+    """Test that the matcher picks up replaced mappings."""
+    original = dict(QUESTION_MAPPINGS)
+    try:
+        reload_mappings({"favorite color": "life_story"})
+        assert get_response_context("What's your favorite color?") == (
+            PERSONAL_INFO["life_story"]
+        )
+        assert get_response_context("What's your superpower?") != (
+            PERSONAL_INFO["superpower"]
+        )
+    finally:
+        reload_mappings(original)
+
+    assert (
+        get_response_context("What's your superpower?") == PERSONAL_INFO["superpower"]
+    )
@@ -99,4 +99,364 @@ async def test_voice_service_text_to_speech(mock_tts):
     assert audio == b"test_audio_data"
 
     # Verify the TTS function was called
-    mock_tts.assert_called_once_with("This is a test message")
+    mock_tts.assert_called_once_with("This is a test message", "wav")
+
+
+@pytest.mark.asyncio
+async def test_chat_service_stream_response():
+    """Test the ChatService.stream_response method."""
+
+    # Mock a streamed completion
+    def make_chunk(content):
+        chunk = MagicMock()
+        chunk.choices = [MagicMock()]
+        chunk.choices[0].delta.content = content
+        return chunk
+
+    async def fake_stream():
+        for content in [" Pattern", " recognition", None, "."]:
+            yield make_chunk(content)
+
+    chat_service = ChatService()
+    chat_service.openai_client = MagicMock()
+    chat_service.openai_client.chat.completions.create = AsyncMock(
+        return_value=fake_stream()
+    )
+
+    conversation_id = str(uuid.uuid4())
+
+    # Collect the deltas
+    deltas = [
+        delta
+        async for delta in chat_service.stream_response(
+            "What's your superpower?", conversation_id
+        )
+    ]
+
+    # Verify the deltas were forwarded and the full response was stored
+    assert deltas == ["Pattern", " recognition", "."]
+    history = chat_service.conversations[conversation_id]
+    assert [m["role"] for m in history] == ["system", "user", "assistant"]
+    assert history[-1]["content"] == "Pattern recognition."
+    assert chat_service.openai_client.chat.completions.create.call_args[1]["stream"]
+
+
+@pytest.mark.asyncio
+async def test_voice_service_stream_text_to_speech():
+    """Test that sentences are synthesized while text is still streaming."""
+    events = []
+
+    async def fake_deltas():
+        for delta in ["Hello there", ". How are", " you? I'm", " fine"]:
+            events.append(f"delta:{delta}")
+            await asyncio.sleep(0.01)
+            yield delta
+
+    async def fake_tts(text, audio_format="wav"):
+        events.append(f"tts:{text}")
+        # The first sentence is the slowest, so ordering must be preserved
+        await asyncio.sleep(0.05 if text == "Hello there." else 0)
+        return text.encode()
+
+    voice_service = VoiceService()
+    voice_service.text_to_speech = fake_tts
+
+    segments = [
+        segment async for segment in voice_service.stream_text_to_speech(fake_deltas())
+    ]
+
+    # Verify segments come back in order
+    assert segments == [
+        ("Hello there.", b"Hello there."),
+        ("How are you?", b"How are you?"),
+        ("I'm fine", b"I'm fine"),
+    ]
+
+    # Verify the first sentence was synthesized before generation finished
+    assert events.index("tts:Hello there.") < events.index("delta: fine")
+
+
+@pytest.mark.asyncio
+@patch("speech_recognition.Recognizer.recognize_google")
+async def test_voice_service_speech_to_text_in_memory(mock_recognize, monkeypatch):
+    """Test that speech to text never goes through temporary files."""
+    import tempfile
+    import numpy as np
+    from pydub import AudioSegment
+
+    mock_recognize.return_value = "This is a test transcription"
+
+    # Fail the test if anything touches the tempfile module
+    def forbidden(*args, **kwargs):
+        raise AssertionError("tempfile must not be used on the voice path")
+
+    for name in [
+        "NamedTemporaryFile",
+        "TemporaryFile",
+        "SpooledTemporaryFile",
+        "mkstemp",
+        "mkdtemp",
+        "gettempdir",
+    ]:
+        monkeypatch.setattr(tempfile, name, forbidden)
+
+    # Build a WAV upload with silence around a burst of noise
+    samples = np.zeros(16000, dtype=np.int16)
+    samples[4000:12000] = np.random.default_rng(0).integers(-8000, 8000, 8000)
+    buffer = io.BytesIO()
+    AudioSegment(
+        samples.tobytes(), frame_rate=16000, sample_width=2, channels=1
+    ).export(buffer, format="wav")
+
+    voice_service = VoiceService()
+    text = await voice_service.speech_to_text(buffer.getvalue())
+
+    # Verify the transcription went through the trimmed audio
+    assert text == "This is a test transcription"
+    audio = mock_recognize.call_args[0][0]
+    assert len(audio.frame_data) < len(samples.tobytes())
+
+
+@pytest.mark.asyncio
+async def test_chat_service_caches_first_turn():
+    """Test that identical first turns are answered from the cache."""
+    mock_completion = MagicMock()
+    mock_completion.choices = [MagicMock()]
+    mock_completion.choices[0].message.content = "Pattern recognition."
+
+    chat_service = ChatService()
+    chat_service.openai_client = MagicMock()
+    chat_service.openai_client.chat.completions.create = AsyncMock(
+        return_value=mock_completion
+    )
+
+    # Two new conversations asking the same question
+    first_id, second_id = str(uuid.uuid4()), str(uuid.uuid4())
+    first = await chat_service.generate_response("What's your superpower?", first_id)
+    second = await chat_service.generate_response(
+        "  what's your SUPERPOWER ", second_id
+    )
+
+    # Verify only the first one reached the provider
+    assert first == second == "Pattern recognition."
+    chat_service.openai_client.chat.completions.create.assert_called_once()
+    assert chat_service.response_cache.stats()["hits"] == 1
+    assert chat_service.conversations[second_id][-1] == {
+        "role": "assistant",
+        "content": "Pattern recognition.",
+    }
+
+    # Follow-up turns always go to the provider
+    await chat_service.generate_response("What's your superpower?", second_id)
+    assert chat_service.openai_client.chat.completions.create.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("app.services.voice_service.tts")
+async def test_voice_service_text_to_speech_cache(mock_tts):
+    """Test that repeated text is synthesized only once."""
+    mock_tts.return_value = b"test_audio_data"
+
+    voice_service = VoiceService()
+    first = await voice_service.text_to_speech("This is a test message")
+    second = await voice_service.text_to_speech("This is a test message")
+
+    # Verify the second call came from the memory tier
+    assert first == second == b"test_audio_data"
+    mock_tts.assert_called_once_with("This is a test message", "wav")
+    assert voice_service.tts_cache.stats()["memory"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_service_windows_history_by_tokens(monkeypatch):
+    """Test that prompts are windowed to the model's token budget."""
+    from app.core.config import settings
+    from app.core.tokens import message_tokens
+
+    mock_completion = MagicMock()
+    mock_completion.choices = [MagicMock()]
+    mock_completion.choices[0].message.content = "Sure."
+
+    chat_service = ChatService()
+    chat_service.openai_client = MagicMock()
+    chat_service.openai_client.chat.completions.create = AsyncMock(
+        return_value=mock_completion
+    )
+
+    conversation_id = str(uuid.uuid4())
+    await chat_service.generate_response("Tell me about yourself", conversation_id)
+    system_tokens = message_tokens(chat_service.conversations[conversation_id][0])
+
+    # Allow roughly one more exchange on top of the system prompt
+    monkeypatch.setattr(settings, "PROMPT_TOKEN_BUDGETS", {settings.OPENAI_MODEL: 40})
+    for i in range(5):
+        await chat_service.generate_response(
+            f"Follow-up question {i}?", conversation_id
+        )
+
+    # Verify the last prompt was the system message plus the newest whole turns
+    messages = chat_service.openai_client.chat.completions.create.call_args[1][
+        "messages"
+    ]
+    assert messages[0]["role"] == "system"
+    assert message_tokens(messages[0]) == system_tokens
+    assert messages[1]["role"] == "user"
+    assert messages[-1]["content"] == "Follow-up question 4?"
+    assert messages[-3]["content"] == "Follow-up question 3?"
+    assert len(messages) < 12
+
+
+@pytest.mark.asyncio
+async def test_chat_service_keeps_previous_answer_in_default_context():
+    """Test that multi-turn chats on the default persona prompt keep their context."""
+    answers = iter(f"Answer number {i}." for i in range(10))
+
+    async def create(**kwargs):
+        completion = MagicMock()
+        completion.choices = [MagicMock()]
+        completion.choices[0].message.content = next(answers)
+        return completion
+
+    chat_service = ChatService()
+    chat_service.openai_client = MagicMock()
+    chat_service.openai_client.chat.completions.create = AsyncMock(side_effect=create)
+
+    # A question that matches no keyword starts on the long default context
+    conversation_id = str(uuid.uuid4())
+    await chat_service.generate_response("What's the weather like?", conversation_id)
+    for i in range(1, 6):
+        await chat_service.generate_response(f"And tomorrow {i}?", conversation_id)
+
+        # Verify the previous exchange made it into the prompt
+        messages = chat_service.openai_client.chat.completions.create.call_args[1][
+            "messages"
+        ]
+        assert messages[-1]["content"] == f"And tomorrow {i}?"
+        assert messages[-2] == {
+            "role": "assistant",
+            "content": f"Answer number {i - 1}.",
+        }
+        assert messages[1]["role"] == "user"
+
+    # Verify trimming never leaves an assistant message without its question
+    history = chat_service.conversations[conversation_id]
+    assert history[1]["role"] == "user"
+    assert history[-1]["content"] == "Answer number 5."
+
+
+@pytest.mark.asyncio
+async def test_chat_service_coalesces_identical_first_turns():
+    """Test that concurrent identical first turns share one provider call."""
+    mock_completion = MagicMock()
+    mock_completion.choices = [MagicMock()]
+    mock_completion.choices[0].message.content = "Pattern recognition."
+
+    async def slow_create(**kwargs):
+        await asyncio.sleep(0.05)
+        return mock_completion
+
+    chat_service = ChatService()
+    chat_service.openai_client = MagicMock()
+    chat_service.openai_client.chat.completions.create = AsyncMock(
+        side_effect=slow_create
+    )
+
+    # Ten users click the same example question at once
+    conversation_ids = [str(uuid.uuid4()) for _ in range(10)]
+    responses = await asyncio.gather(
+        *[
+            chat_service.generate_response("What's your #1 superpower?", cid)
+            for cid in conversation_ids
+        ]
+    )
+
+    # Verify one upstream call served everyone, each with their own history
+    assert responses == ["Pattern recognition."] * 10
+    chat_service.openai_client.chat.completions.create.assert_called_once()
+    assert chat_service.in_flight.stats() == {
+        "in_flight": 0,
+        "leaders": 1,
+        "coalesced": 9,
+    }
+    for cid in conversation_ids:
+        assert [m["role"] for m in chat_service.conversations[cid]] == [
+            "system",
+            "user",
+            "assistant",
+        ]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_cancelled_caller():
+    """Test that cancelling one caller does not cancel the shared call."""
+    from app.core.singleflight import SingleFlight
+
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    flight = SingleFlight()
+    first = asyncio.ensure_future(flight.do("key", call))
+    second = asyncio.ensure_future(flight.do("key", call))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "result"
+    assert calls == 1
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_chat_service_hedges_groq_to_openai():
+    """Test that a slow Groq request is answered by the hedged OpenAI request."""
+    from app.services.providers import FakeProvider, ProviderRouter
+
+    chat_service = ChatService()
+    groq = FakeProvider("groq", latency=1.0, reply="From Groq.")
+    openai_provider = FakeProvider("openai", latency=0.01, reply="From OpenAI.")
+    chat_service.routers["groq"] = ProviderRouter(
+        groq, openai_provider, initial_hedge_delay=0.05
+    )
+
+    conversation_id = str(uuid.uuid4())
+    response = await chat_service.generate_response_groq("Hello", conversation_id)
+
+    # Verify the hedge answered and the Groq conversation key is kept
+    assert response == "From OpenAI."
+    assert chat_service.routers["groq"].stats()["hedge_wins"] == 1
+    history = chat_service.get_conversation_history(f"groq_{conversation_id}")
+    assert history[-1] == {"role": "assistant", "content": "From OpenAI."}
+
+
+@pytest.mark.asyncio
+async def test_chat_service_caches_hedged_answer_under_answering_provider():
+    """Test that a first turn won by the hedge is not cached as the primary's."""
+    from app.services.providers import FakeProvider, ProviderRouter
+
+    chat_service = ChatService()
+    openai_provider = FakeProvider(
+        "openai", model="gpt", latency=1.0, reply="From OpenAI."
+    )
+    groq = FakeProvider("groq", model="llama", latency=0.01, reply="From Groq.")
+    chat_service.routers["openai"] = ProviderRouter(
+        openai_provider, groq, initial_hedge_delay=0.05
+    )
+    chat_service.routers["groq"] = ProviderRouter(groq, openai_provider, hedge=False)
+
+    first = await chat_service.generate_response("Hello", str(uuid.uuid4()))
+    assert first == "From Groq."
+
+    # The primary answers the same question itself rather than from the cache
+    openai_provider.latency = lambda: 0.0
+    second = await chat_service.generate_response("Hello", str(uuid.uuid4()))
+    assert second == "From OpenAI."
+
+    # The hedged answer is served to Groq's own first turns
+    calls = groq.calls
+    third = await chat_service.generate_response_groq("Hello", str(uuid.uuid4()))
+    assert third == "From Groq."
+    assert groq.calls == calls
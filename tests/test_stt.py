@@ -0,0 +1,121 @@
+"""Tests for the speech-to-text backends and the engine pool."""
+
+import sys
+import os
+import io
+import threading
+import time
+import pytest
+import speech_recognition as sr
+from pydub import AudioSegment
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core import stt
+from app.core.config import settings
+from app.core.engines import EnginePool
+from app.core.voice import speech_to_text
+
+
+class FakeDecoder:
+    """Records the audio it decodes, like a PocketSphinx decoder."""
+
+    def __init__(self, hypothesis="hello world"):
+        self.hypothesis = hypothesis
+        self.decoded = []
+
+    def start_utt(self):
+        pass
+
+    def process_raw(self, raw_data, no_search, full_utt):
+        self.decoded.append(raw_data)
+
+    def end_utt(self):
+        pass
+
+    def hyp(self):
+        if self.hypothesis is None:
+            return None
+        return type("Hypothesis", (), {"hypstr": self.hypothesis})()
+
+
+def make_wav(frame_rate=8000):
+    """Build a short silent WAV upload."""
+    buffer = io.BytesIO()
+    AudioSegment.silent(duration=200, frame_rate=frame_rate).export(
+        buffer, format="wav"
+    )
+    return buffer.getvalue()
+
+
+def test_engine_pool_reuses_engines_across_threads():
+    """Test that the pool loads at most its size and threads wait for an engine."""
+    loads = []
+    pool = EnginePool(lambda: loads.append(1) or object(), size=2)
+    seen = set()
+
+    def work():
+        with pool.acquire() as engine:
+            seen.add(id(engine))
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 2
+    assert len(seen) == 2
+    assert pool.stats()["idle"] == 2
+    assert pool.stats()["waits"] == 2
+
+    # Filling a full pool loads nothing more
+    pool.fill()
+    assert len(loads) == 2
+
+
+def test_sphinx_backend_loads_decoders_once(monkeypatch):
+    """Test that the offline backend decodes with preloaded, pooled decoders."""
+    decoder = FakeDecoder()
+    backend = stt.SphinxSTT(engines=1)
+    builds = []
+    monkeypatch.setattr(backend.pool, "_factory", lambda: builds.append(1) or decoder)
+    monkeypatch.setattr(stt, "_backend", backend)
+
+    stt.load_stt_backend()
+    assert speech_to_text(make_wav()) == "hello world"
+    assert speech_to_text(make_wav()) == "hello world"
+
+    # Decoding 16-bit audio resampled to 16 kHz with the decoder built at startup
+    assert builds == [1]
+    assert len(decoder.decoded) == 2
+    assert abs(len(decoder.decoded[0]) - 200 * 16 * 2) <= 4
+
+    decoder.hypothesis = None
+    assert speech_to_text(make_wav()) == "Sorry, I could not understand the audio."
+
+
+def test_sphinx_backend_without_pocketsphinx(monkeypatch):
+    """Test that a missing engine is reported as a recognition service error."""
+    monkeypatch.setitem(sys.modules, "pocketsphinx", None)
+    monkeypatch.setattr(stt, "_backend", stt.SphinxSTT(engines=1))
+
+    with pytest.raises(sr.RequestError):
+        stt.load_stt_backend()
+    assert speech_to_text(make_wav()).startswith(
+        "Speech recognition service error: missing PocketSphinx module"
+    )
+
+
+def test_get_stt_backend_from_settings(monkeypatch):
+    """Test that STT_BACKEND picks the backend."""
+    monkeypatch.setattr(stt, "_backend", None)
+    monkeypatch.setattr(settings, "STT_BACKEND", "google")
+    assert isinstance(stt.get_stt_backend(), stt.GoogleSTT)
+
+    monkeypatch.setattr(stt, "_backend", None)
+    monkeypatch.setattr(settings, "STT_BACKEND", "whisper")
+    with pytest.raises(ValueError):
+        stt.get_stt_backend()
@@ -0,0 +1,96 @@
+"""Tests for request tracing and Server-Timing headers."""
+
+import sys
+import os
+import io
+import uuid
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.tracing import SLOW_TRACES, SlowTraceBuffer, Trace, record_stage
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_trace_server_timing_and_buffer():
+    """Test stage accumulation, header formatting and the slow trace threshold."""
+    trace = Trace("/api/voice", "bad id with spaces")
+    trace.add("tts", 0.1)
+    trace.add("tts", 0.05)
+
+    assert trace.trace_id != "bad id with spaces"
+    assert trace.server_timing().startswith("tts;dur=150.0, total;dur=")
+
+    buffer = SlowTraceBuffer(maxlen=2, threshold=0.5)
+    trace.finish()
+    assert buffer.add(trace) is False
+
+    for i in range(3):
+        slow = Trace("/api/chat", f"trace-{i}")
+        slow.duration = 1.0
+        buffer.add(slow)
+    assert [t["trace_id"] for t in buffer.list()] == ["trace-2", "trace-1"]
+    assert buffer.list(trace_id="trace-1")[0]["total_ms"] == 1000.0
+
+
+def test_record_stage_without_trace_is_a_no_op():
+    """Test that untraced code paths can record stages safely."""
+    record_stage("llm", 0.1)
+
+
+@patch("app.services.chat_service.ChatService.generate_response")
+def test_chat_endpoint_server_timing(mock_generate_response):
+    """Test that /chat returns Server-Timing with its stages and echoes the trace ID."""
+
+    async def generate(message, conversation_id):
+        record_stage("llm", 0.25)
+        return "This is a test response"
+
+    mock_generate_response.side_effect = generate
+
+    response = client.post(
+        "/api/chat",
+        json={"message": "Hello", "conversation_id": str(uuid.uuid4())},
+        headers={"X-Trace-ID": "trace-chat-1"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Trace-ID"] == "trace-chat-1"
+    assert response.headers["Server-Timing"].startswith("llm;dur=250.0, total;dur=")
+
+
+@patch("app.services.voice_service.VoiceService.text_to_speech")
+@patch("app.services.chat_service.ChatService.generate_response")
+@patch("app.services.voice_service.VoiceService.speech_to_text")
+def test_voice_endpoint_slow_trace(mock_stt, mock_generate, mock_tts, monkeypatch):
+    """Test that slow /voice requests are kept and served by the debug endpoint."""
+
+    async def stt(audio_data):
+        record_stage("stt", 0.4)
+        return "Hello"
+
+    async def tts(text, audio_format="wav"):
+        record_stage("tts", 0.3)
+        return b"RIFF"
+
+    mock_stt.side_effect = stt
+    mock_generate.return_value = "Hi there"
+    mock_tts.side_effect = tts
+    monkeypatch.setattr(SLOW_TRACES, "threshold", 0.0)
+
+    response = client.post(
+        "/api/voice",
+        files={"audio": ("test.wav", io.BytesIO(b"audio"), "audio/wav")},
+        headers={"X-Trace-ID": "trace-voice-1"},
+    )
+    assert "stt;dur=400.0, tts;dur=300.0" in response.headers["Server-Timing"]
+
+    traces = client.get("/api/debug/traces", params={"trace_id": "trace-voice-1"})
+    assert traces.status_code == 200
+    trace = traces.json()["traces"][0]
+    assert trace["path"] == "/api/voice"
+    assert trace["stages_ms"] == {"stt": 400.0, "tts": 300.0}
@@ -0,0 +1,147 @@
+"""Tests for the text-to-speech backends."""
+
+import sys
+import os
+import io
+import stat
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pydub import AudioSegment
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core import tts
+from app.core.config import settings
+from app.core.voice import negotiate_audio_format, text_to_speech, tts_cache_key
+
+# Stands in for espeak-ng: reads text on stdin and writes a streamed WAV
+# header (unknown sizes) and 10 ms of audio per character to stdout
+FAKE_ESPEAK = """#!{python}
+import struct, sys
+text = sys.stdin.buffer.read()
+if b"fail" in text:
+    sys.stderr.write("no voice")
+    sys.exit(1)
+header = b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVEfmt "
+header += struct.pack("<IHHIIHH", 16, 1, 1, 22050, 44100, 2, 16)
+header += b"data" + struct.pack("<I", 0xFFFFFFFF)
+sys.stdout.buffer.write(header + b"\\x10\\x00" * 220 * len(text))
+"""
+
+
+class FakeGTTS:
+    """Stands in for gTTS, writing fixed bytes instead of calling Google."""
+
+    def __init__(self, text, lang, slow):
+        self.text = text
+
+    def write_to_fp(self, fp):
+        fp.write(b"ID3 mp3 " + self.text.encode())
+
+
+@pytest.fixture
+def fake_espeak(tmp_path):
+    """Write the fake espeak-ng executable."""
+    path = tmp_path / "espeak-ng"
+    path.write_text(FAKE_ESPEAK.format(python=sys.executable))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def test_espeak_backend_renders_with_ready_engines(fake_espeak):
+    """Test that espeak-ng output is read from the pipe by pooled processes."""
+    backend = tts.EspeakBackend(command=fake_espeak, engines=2)
+    backend.load()
+    assert backend.stats()["idle"] == 2
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        segments = list(pool.map(backend.synthesize, ["Hello.", "Hi there."]))
+
+    assert [len(segment) for segment in segments] == [60, 90]
+    assert segments[0].frame_rate == 22050
+
+    # Every engine taken was replaced
+    assert backend.stats()["idle"] == 2
+    assert backend.cold_starts == 0
+
+    with pytest.raises(RuntimeError, match="no voice"):
+        backend.synthesize("fail")
+    backend.close()
+    assert backend.stats()["idle"] == 0
+
+
+def test_espeak_backend_sets_speed_natively(fake_espeak, monkeypatch):
+    """Test that espeak-ng gets the speed in words per minute instead of resampling."""
+    monkeypatch.setattr(settings, "TTS_SPEED", 1.2)
+    backend = tts.EspeakBackend(command=fake_espeak, engines=1)
+    monkeypatch.setattr(tts, "_backend", backend)
+
+    audio = AudioSegment.from_file(io.BytesIO(text_to_speech("Hello.")), format="wav")
+
+    assert backend._argv[-2:] == ["-s", "210"]
+    assert audio.frame_rate == 22050
+    assert len(audio) == 60
+    backend.close()
+
+
+def test_espeak_backend_without_espeak(monkeypatch):
+    """Test that a missing espeak-ng fails when the backend loads."""
+    monkeypatch.setenv("PATH", "")
+    backend = tts.EspeakBackend(engines=1)
+
+    with pytest.raises(RuntimeError, match="missing espeak-ng"):
+        backend.load()
+
+
+def test_tts_cache_key_covers_backend(monkeypatch):
+    """Test that speech from different engines is cached apart."""
+    key = tts_cache_key("Hello.")
+    monkeypatch.setattr(settings, "TTS_BACKEND", "espeak")
+    assert tts_cache_key("Hello.") != key
+
+
+@pytest.mark.parametrize(
+    "accept, requested, expected",
+    [
+        (None, None, "wav"),
+        ("*/*", None, "wav"),
+        ("audio/mpeg", None, "mp3"),
+        ("audio/ogg;q=0.9, audio/mpeg;q=0.5", None, "opus"),
+        ("audio/wav;q=0.2, audio/mp3", None, "mp3"),
+        ("audio/mpeg", "WAV", "wav"),
+    ],
+)
+def test_negotiate_audio_format(accept, requested, expected):
+    """Test that the form field wins over the Accept header, with WAV as the fallback."""
+    assert negotiate_audio_format(accept, requested) == expected
+
+
+def test_negotiate_audio_format_rejects_unknown():
+    """Test that an unsupported format is an error rather than a silent fallback."""
+    with pytest.raises(ValueError, match="Unsupported audio format"):
+        negotiate_audio_format(requested="flac")
+
+
+def test_gtts_mp3_passed_through(monkeypatch):
+    """Test that MP3 from gTTS reaches the client untouched."""
+    monkeypatch.setattr(tts, "gTTS", FakeGTTS)
+    monkeypatch.setattr(tts, "_backend", tts.GTTSBackend())
+    monkeypatch.setattr(settings, "TTS_SPEED", 1.0)
+
+    # The fake bytes are not decodable, so any transcode would fail
+    assert text_to_speech("Hello.", "mp3") == b"ID3 mp3 Hello."
+
+
+def test_espeak_wav_passed_through(fake_espeak, monkeypatch):
+    """Test that WAV from espeak-ng is not decoded and encoded again."""
+    backend = tts.EspeakBackend(command=fake_espeak, engines=1)
+    backend.load()
+    monkeypatch.setattr(tts, "_backend", backend)
+    monkeypatch.setattr(AudioSegment, "from_file", None)
+
+    audio_data = text_to_speech("Hello.")
+
+    assert audio_data[:4] == b"RIFF"
+    assert len(audio_data) == 44 + 2 * 220 * len("Hello.")
+    backend.close()
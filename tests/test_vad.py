@@ -0,0 +1,123 @@
+"""Tests for the streaming voice activity detector."""
+
+import sys
+import os
+import pytest
+import numpy as np
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.vad import VoiceActivityDetector, speech_segments
+
+
+def amplitude(dbfs):
+    """Get the uniform noise amplitude whose loudness is the given dBFS."""
+    return np.sqrt(3) * 10 ** (dbfs / 20)
+
+
+def make_pcm(layout, frame_rate=16000, seed=0):
+    """Build 16-bit mono PCM from (milliseconds, amplitude) sections."""
+    rng = np.random.default_rng(seed)
+    sections = []
+    for ms, amplitude in layout:
+        frames = int(ms * frame_rate / 1000)
+        sections.append(rng.uniform(-1, 1, frames) * amplitude * 32767)
+    return np.concatenate(sections).astype(np.int16)
+
+
+def stream(detector, pcm, chunk=641):
+    """Feed PCM in chunks split at odd bytes, noting where each utterance ended."""
+    data = pcm.tobytes()
+    utterances = []
+    for offset in range(0, len(data), chunk):
+        for utterance in detector.feed(data[offset : offset + chunk]):
+            utterances.append((utterance, (offset + chunk) // 32))
+    return utterances
+
+
+def test_vad_endpoints_each_utterance():
+    """Test that utterances come out trimmed, within the hangover of ending."""
+    pcm = make_pcm([(500, 0.0), (600, 0.3), (500, 0.0), (400, 0.3), (400, 0.0)])
+    detector = VoiceActivityDetector(16000)
+
+    utterances = stream(detector, pcm)
+
+    assert [len(utterance) // 32 for utterance, _ in utterances] == [600, 400]
+    assert utterances[0][0] == pcm[8000:17600].tobytes()
+
+    # The end of speech is noticed within the hangover plus one chunk
+    assert 1100 + 300 <= utterances[0][1] <= 1100 + 300 + 21
+    assert 2000 + 300 <= utterances[1][1] <= 2000 + 300 + 21
+    assert not detector.in_speech
+    assert detector.flush() is None
+
+
+def test_vad_flush_returns_utterance_in_progress():
+    """Test that ending the stream returns speech that is still going."""
+    pcm = make_pcm([(200, 0.0), (300, 0.3), (100, 0.0)])
+    detector = VoiceActivityDetector(16000)
+
+    assert stream(detector, pcm) == []
+    assert detector.in_speech
+    assert detector.duration == 0.3
+
+    assert detector.flush() == pcm[3200:8000].tobytes()
+    assert not detector.in_speech
+
+
+def test_vad_ignores_background_noise():
+    """Test that steady noise above the silence threshold is never an utterance."""
+    pcm = make_pcm([(8000, 0.02), (500, 0.5), (1000, 0.02)])
+    detector = VoiceActivityDetector(16000)
+
+    utterances = stream(detector, pcm)
+
+    # Only the burst is speech, not the noise before it
+    assert [len(utterance) // 32 for utterance, _ in utterances] == [500]
+    assert utterances[0][0] == pcm[128000:136000].tobytes()
+    assert -50 < detector.noise_floor <= detector.max_noise_floor
+
+
+def test_vad_keeps_sustained_speech():
+    """Test that a long utterance is not worn away by the noise floor."""
+    pcm = make_pcm([(1000, 0.02), (12000, 0.1), (1000, 0.02)])
+    detector = VoiceActivityDetector(16000)
+
+    utterances = stream(detector, pcm)
+
+    assert [len(utterance) // 32 for utterance, _ in utterances] == [12000]
+    assert speech_segments(pcm, 16000) == [(16000, 208000)]
+
+
+@pytest.mark.parametrize("dbfs", [-45, -35, -32])
+@pytest.mark.parametrize("leading_ms", [0, 500])
+def test_vad_hears_quiet_speech_before_any_noise(dbfs, leading_ms):
+    """Test that quiet speech at stream start or after digital silence is heard."""
+    pcm = make_pcm([(leading_ms, 0.0), (600, amplitude(dbfs)), (500, 0.0)])
+    detector = VoiceActivityDetector(16000)
+
+    utterances = stream(detector, pcm)
+
+    # The gate starts at the silence threshold, not the noise floor cap
+    assert [len(utterance) // 32 for utterance, _ in utterances] == [600]
+    start = leading_ms * 16
+    assert utterances[0][0] == pcm[start : start + 9600].tobytes()
+    assert speech_segments(pcm, 16000) == [(start, start + 9600)]
+
+
+def test_vad_cuts_long_utterances():
+    """Test that an utterance past the length limit is cut."""
+    pcm = make_pcm([(2500, 0.3)])
+    detector = VoiceActivityDetector(16000, max_seconds=1.0)
+
+    utterances = stream(detector, pcm)
+
+    assert [len(utterance) // 32 for utterance, _ in utterances] == [1000, 1000]
+
+
+def test_speech_segments_on_a_clip():
+    """Test that a whole clip gives the same utterances as streaming it."""
+    pcm = make_pcm([(300, 0.0), (400, 0.3), (800, 0.0), (250, 0.3)])
+
+    assert speech_segments(pcm, 16000) == [(4800, 11200), (24000, 28000)]
@@ -0,0 +1,153 @@
+"""Tests for the voice processing utilities."""
+
+import sys
+import os
+import io
+import threading
+import pytest
+import numpy as np
+from pydub import AudioSegment
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings
+from app.core.dsp import (
+    SAMPLE_DTYPES,
+    get_process_pool,
+    normalize_samples,
+    shutdown_process_pool,
+)
+from app.core.voice import detect_leading_silence, preprocess_audio
+
+
+def make_audio(layout, frame_rate=16000, sample_width=2, channels=1):
+    """Build an audio segment from (milliseconds, amplitude) sections."""
+    rng = np.random.default_rng(0)
+    max_amplitude = 2 ** (sample_width * 8 - 1) - 1
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}[sample_width]
+    sections = []
+    for ms, amplitude in layout:
+        frames = int(ms * frame_rate / 1000)
+        noise = rng.uniform(-1, 1, frames * channels) * amplitude * max_amplitude
+        sections.append(noise.astype(dtype))
+    return AudioSegment(
+        np.concatenate(sections).tobytes(),
+        frame_rate=frame_rate,
+        sample_width=sample_width,
+        channels=channels,
+    )
+
+
+def reference_trim(audio, silence_threshold=-50.0, chunk_size=10):
+    """The original chunk-by-chunk implementation."""
+    trim_ms = 0
+    while (
+        trim_ms < len(audio)
+        and audio[trim_ms : trim_ms + chunk_size].dBFS < silence_threshold
+    ):
+        trim_ms += chunk_size
+
+    end_trim_ms = len(audio)
+    while (
+        end_trim_ms > 0
+        and audio[max(end_trim_ms - chunk_size, 0) : end_trim_ms].dBFS
+        < silence_threshold
+    ):
+        end_trim_ms -= chunk_size
+
+    return audio[trim_ms:end_trim_ms]
+
+
+@pytest.mark.parametrize(
+    "layout, kwargs",
+    [
+        ([(500, 0.0), (1000, 0.5), (700, 0.0)], {}),
+        ([(333, 0.001), (1234, 0.3), (257, 0.002)], {}),
+        ([(1000, 0.2)], {}),
+        ([(95, 0.0), (400, 0.5), (95, 0.0)], {"chunk_size": 20}),
+        ([(500, 0.01), (500, 0.4), (500, 0.01)], {"silence_threshold": -30.0}),
+    ],
+)
+def test_detect_leading_silence_matches_reference(layout, kwargs):
+    """Test that the vectorized trim matches the chunk-by-chunk scan."""
+    for audio_kwargs in [
+        {},
+        {"frame_rate": 22050},
+        {"channels": 2},
+        {"sample_width": 1},
+        {"sample_width": 4},
+    ]:
+        audio = make_audio(layout, **audio_kwargs)
+        expected = reference_trim(audio, **kwargs)
+        trimmed = detect_leading_silence(audio, **kwargs)
+        assert len(trimmed) == len(expected)
+        assert trimmed.raw_data == expected.raw_data
+
+
+def test_detect_leading_silence_all_silent():
+    """Test that fully silent audio is trimmed to nothing."""
+    audio = make_audio([(500, 0.0)])
+    assert len(detect_leading_silence(audio)) == 0
+    assert len(detect_leading_silence(audio[0:0])) == 0
+
+
+@pytest.mark.parametrize("audio_kwargs", [{}, {"channels": 2}, {"sample_width": 1}])
+def test_normalize_samples_matches_pydub(audio_kwargs):
+    """Test that NumPy normalization is bit-identical to AudioSegment.normalize."""
+    audio = make_audio([(100, 0.0), (300, 0.2), (100, 0.01)], **audio_kwargs)
+    samples = np.frombuffer(audio.raw_data, dtype=SAMPLE_DTYPES[audio.sample_width])
+    samples = samples.copy()
+
+    normalize_samples(samples, audio.max_possible_amplitude)
+
+    assert samples.tobytes() == audio.normalize().raw_data
+
+
+def test_preprocess_audio_process_mode(monkeypatch):
+    """Test that the process-pool DSP mode gives the same audio as the thread mode."""
+    buffer = io.BytesIO()
+    make_audio([(300, 0.0), (600, 0.1), (200, 0.0)]).export(buffer, format="wav")
+
+    expected = preprocess_audio(buffer.getvalue())
+    monkeypatch.setattr(settings, "DSP_MODE", "process")
+    monkeypatch.setattr(settings, "DSP_PROCESSES", 1)
+    try:
+        assert preprocess_audio(buffer.getvalue()) == expected
+    finally:
+        shutdown_process_pool()
+
+
+def test_process_pool_started_once_under_concurrency():
+    """Test that threads racing to start the DSP process pool share one pool."""
+    barrier = threading.Barrier(8)
+    pools = []
+
+    def start():
+        barrier.wait()
+        pools.append(get_process_pool(1))
+
+    threads = [threading.Thread(target=start) for _ in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(pools) == 8
+        assert all(pool is pools[0] for pool in pools)
+    finally:
+        shutdown_process_pool()
+
+
+def test_preprocess_audio_drops_pauses_between_utterances():
+    """Test that only the speech, joined by short gaps, reaches recognition."""
+    buffer = io.BytesIO()
+    make_audio([(300, 0.0), (400, 0.3), (800, 0.0), (400, 0.3), (300, 0.0)]).export(
+        buffer, format="wav"
+    )
+
+    processed = AudioSegment.from_file(
+        io.BytesIO(preprocess_audio(buffer.getvalue())), format="wav"
+    )
+
+    assert len(processed) == 400 + 100 + 400